@@ -0,0 +1 @@
+"""Benchmarks for tema's core paths against local provider stand-ins."""
@@ -0,0 +1,233 @@
+"""
+Run the benchmark suite and write comparable JSON results.
+
+    python -m benchmarks.run -o results.json
+    python -m benchmarks.run --compare baseline.json   # exit 1 on regression
+
+Every provider is exercised against the in-process fake server (see
+:mod:`tema.testing`), so numbers measure tema's own overhead:
+latency per call, HTTP requests per call, and peak traced allocations.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, Callable
+
+import tema
+from tema import cache, core, ratelimit, state
+from tema.providers import PROVIDERS
+from tema.testing import FakeProviderServer, make_body, make_inbox
+from tema.utils import HAS_CURL_CFFI, extract_links, find_code, find_verification_link
+
+__all__ = ["PROFILES", "compare", "main", "run_suite"]
+
+# name -> (messages per inbox, body bytes)
+PROFILES = {"small": (5, 4 * 1024), "large": (20, 100 * 1024)}
+
+
+def measure(
+    fn: Callable[[Any], Any],
+    rounds: int,
+    setup: Callable[[], Any] | None = None,
+    server: FakeProviderServer | None = None,
+) -> dict[str, Any]:
+    """Time `fn(setup())` over `rounds`, then trace one extra call's allocations."""
+    fn(setup() if setup else None)  # warm-up: sessions, imports, caches
+    times = []
+    sent = sum(server.requests.values()) if server else 0
+    for _ in range(rounds):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        fn(arg)
+        times.append((time.perf_counter() - start) * 1000)
+    requests = (sum(server.requests.values()) - sent) / rounds if server else 0
+    arg = setup() if setup else None
+    tracemalloc.start()
+    try:
+        fn(arg)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    times.sort()
+    return {
+        "rounds": rounds,
+        "median_ms": round(statistics.median(times), 3),
+        "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))], 3),
+        "min_ms": round(times[0], 3),
+        "requests": round(requests, 2),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+@contextlib.contextmanager
+def _isolated() -> Iterator[None]:
+    """
+    Fresh state store and body cache in a temp dir; provider logs muted.
+    Rate limits are lifted: the stand-ins have no tolerance to respect.
+    """
+    saved = (state.STATE_DB, state.STATE_FILE, cache.CACHE_DIR, cache.CACHE_ENABLED)
+    saved_limits = (ratelimit.RATE_DB, ratelimit.RATE_LIMITS)
+    with tempfile.TemporaryDirectory() as tmp:
+        state.STATE_DB = Path(tmp) / "state.db"
+        state.STATE_FILE = Path(tmp) / "state.json"
+        cache.CACHE_DIR = Path(tmp) / "cache"
+        ratelimit.RATE_DB, ratelimit.RATE_LIMITS = Path(tmp) / "rate.db", {}
+        try:
+            with contextlib.redirect_stderr(io.StringIO()):
+                yield
+        finally:
+            state.STATE_DB, state.STATE_FILE, cache.CACHE_DIR, cache.CACHE_ENABLED = (
+                saved
+            )
+            ratelimit.RATE_DB, ratelimit.RATE_LIMITS = saved_limits
+
+
+def _provider_benchmarks(
+    server: FakeProviderServer, name: str, rounds: int
+) -> dict[str, dict[str, Any]]:
+    domain = PROVIDERS[name].domains[0]
+    results = {}
+
+    def create(_: Any) -> dict[str, Any]:
+        return core.create_email(domain=domain, provider_name=name)
+
+    results[f"create_email[{name}]"] = measure(create, rounds, server=server)
+
+    for profile, (count, size) in PROFILES.items():
+        server.inbox = make_inbox(count, size)
+        st = create(None)
+        msg_id = server.inbox[0]["id"]
+        results[f"get_inbox[{name},{profile}]"] = measure(
+            lambda _: core.get_inbox(st["email"]), rounds, server=server
+        )
+        cache.CACHE_ENABLED = False
+        results[f"get_message_body[{name},{profile}]"] = measure(
+            lambda _: core.get_message_body(msg_id, st), rounds, server=server
+        )
+        cache.CACHE_ENABLED = True
+
+    server.inbox = make_inbox(*PROFILES["small"])
+    st = create(None)
+    seq = iter(range(10**9))
+
+    def deliver() -> None:
+        msg = {"id": f"w{next(seq)}", "from": "a@example.com", "subject": "Code"}
+        msg.update(date="", html=make_body(2048))
+        server.deliver(st["email"], msg, after_polls=1)
+
+    def wait(_: Any) -> None:
+        if core.wait_for_message(5, 0.001, st["email"]) is None:
+            raise RuntimeError(f"{name}: wait_for_message timed out")
+
+    results[f"wait_for_message[{name}]"] = measure(wait, rounds, deliver, server)
+    return results
+
+
+def run_suite(
+    providers: list[str] | None = None, rounds: int = 20
+) -> dict[str, dict[str, Any]]:
+    """Run every benchmark; returns {benchmark: metrics}."""
+    results: dict[str, dict[str, Any]] = {}
+    for profile, (_, size) in PROFILES.items():
+        html = make_body(size)
+        results[f"extract_links[{profile}]"] = measure(
+            lambda _: extract_links(html), rounds
+        )
+        results[f"find_verification_link[{profile}]"] = measure(
+            lambda _: find_verification_link(html), rounds
+        )
+        results[f"find_code[{profile}]"] = measure(lambda _: find_code(html), rounds)
+
+    names = providers or [
+        n for n, p in PROVIDERS.items() if HAS_CURL_CFFI or not p.requires_curl_cffi
+    ]
+    with _isolated(), FakeProviderServer() as server, server.patched():
+        for name in names:
+            results.update(_provider_benchmarks(server, name, rounds))
+        domain = PROVIDERS[names[0]].domains[0]
+        st = core.create_email(domain=domain, provider_name=names[0])
+        msg_id = core.get_inbox(st["email"])[0][0]["id"]
+        results["get_message_body[cached]"] = measure(
+            lambda _: core.get_message_body(msg_id, st), rounds, server=server
+        )
+    return results
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float = 0.25
+) -> list[str]:
+    """Regressions of `current` against `baseline` (both `run` outputs)."""
+    problems = []
+    for name, new in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            continue
+        if new["median_ms"] > old["median_ms"] * (1 + threshold):
+            problems.append(
+                f"{name}: median {old['median_ms']}ms -> {new['median_ms']}ms"
+            )
+        if new["requests"] > old["requests"]:
+            problems.append(f"{name}: requests {old['requests']} -> {new['requests']}")
+        if new["peak_kib"] > old["peak_kib"] * (1 + threshold):
+            problems.append(
+                f"{name}: peak {old['peak_kib']}KiB -> {new['peak_kib']}KiB"
+            )
+    return problems
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="tema benchmark suite")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument(
+        "--provider", action="append", default=None, help="Limit to provider(s)"
+    )
+    parser.add_argument("--output", "-o", default=None, help="Write JSON here")
+    parser.add_argument(
+        "--compare", default=None, help="Baseline JSON; exit 1 on regression"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown/growth before flagging (default: 0.25)",
+    )
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "tema": tema.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": int(time.time()),
+            "rounds": args.rounds,
+        },
+        "results": run_suite(args.provider, args.rounds),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        problems = compare(baseline, report, args.threshold)
+        for line in problems:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,62 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING, Any
+
 __version__ = "0.1.0"
 __all__ = [
     "create_email",
+    "create_emails",
     "get_inbox",
     "get_message_body",
+    "message_stream",
     "wait_for_message",
+    "watch",
+    "create_email_async",
+    "get_inbox_async",
+    "get_message_body_async",
+    "wait_for_message_async",
+    "wait_for_messages_async",
     "PROVIDERS",
     "DOMAIN_PROVIDERS",
+    "DeadlineExceeded",
+    "Policy",
 ]
 
-from tema.core import create_email, get_inbox, get_message_body, wait_for_message
-from tema.providers import DOMAIN_PROVIDERS, PROVIDERS
+# Public names resolve lazily (PEP 562) so `import tema` — and every CLI
+# invocation — stays cheap until something is actually used.
+_LAZY = {
+    "PROVIDERS": "tema.providers",
+    "DOMAIN_PROVIDERS": "tema.providers",
+    "DeadlineExceeded": "tema.policy",
+    "Policy": "tema.policy",
+}
+
+if TYPE_CHECKING:
+    from tema.core import (
+        create_email,
+        create_email_async,
+        create_emails,
+        get_inbox,
+        get_inbox_async,
+        get_message_body,
+        get_message_body_async,
+        message_stream,
+        wait_for_message,
+        wait_for_message_async,
+        wait_for_messages_async,
+        watch,
+    )
+    from tema.policy import DeadlineExceeded, Policy
+    from tema.providers import DOMAIN_PROVIDERS, PROVIDERS
+
+
+def __getattr__(name: str) -> Any:
+    if name not in __all__:
+        raise AttributeError(f"module 'tema' has no attribute {name!r}")
+    import importlib
+
+    module = importlib.import_module(_LAZY.get(name, "tema.core"))
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
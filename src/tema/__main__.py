@@ -1,5 +1,5 @@
 from __future__ import annotations
 
-from tema.cli import main
+from tema.client import main
 
 main()
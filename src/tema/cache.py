@@ -0,0 +1,150 @@
+"""On-disk cache of message bodies (messages never change once received)."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import zlib
+from pathlib import Path
+
+__all__ = ["CACHE_DIR", "CACHE_MAX_BYTES", "BodyCache", "get_cache"]
+
+
+def _resolve_cache_dir() -> Path:
+    env = os.environ.get("TEMA_CACHE_DIR")
+    if env:
+        return Path(env)
+    return Path.cwd() / ".tema_cache"
+
+
+CACHE_DIR = _resolve_cache_dir()
+CACHE_MAX_BYTES = int(os.environ.get("TEMA_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_COMPRESS = os.environ.get("TEMA_CACHE_COMPRESS", "1") != "0"
+CACHE_ENABLED = os.environ.get("TEMA_CACHE", "1") != "0"
+
+
+class BodyCache:
+    """
+    Message bodies keyed by (provider, email, msg_id), one file each.
+    File mtime doubles as the LRU clock: hits touch the file, and writes
+    evict the least recently used files once the directory exceeds
+    `max_bytes`. Bodies are zlib-compressed when `compress` is set.
+    Unreadable entries (e.g. cut short by a crash) are dropped as misses.
+    """
+
+    # Puts between full directory scans; in between, a running size total
+    # (which misses other processes' writes) decides when to evict
+    RESCAN_EVERY = 256
+
+    def __init__(
+        self, directory: Path, max_bytes: int = CACHE_MAX_BYTES, compress: bool = True
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self._lock = threading.Lock()
+        self._size: int | None = None  # bytes on disk as of the last scan, plus puts
+        self._puts = 0
+
+    def _path(self, provider: str, email: str, msg_id: str) -> Path:
+        key = hashlib.sha256(f"{provider}\0{email}\0{msg_id}".encode()).hexdigest()
+        return self.directory / key[:2] / key
+
+    def get(self, provider: str, email: str, msg_id: str) -> str | None:
+        path = self._path(provider, email, msg_id)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        try:
+            if data[:1] == b"z":
+                body = zlib.decompress(data[1:]).decode("utf-8")
+            elif data[:1] == b"r":
+                body = data[1:].decode("utf-8")
+            else:
+                raise ValueError(f"unknown header {data[:1]!r}")
+        except (zlib.error, UnicodeDecodeError, ValueError):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return body
+
+    def put(self, provider: str, email: str, msg_id: str, body: str) -> None:
+        path = self._path(provider, email, msg_id)
+        data = body.encode("utf-8")
+        # One-byte header: "z" = zlib, "r" = raw
+        data = b"z" + zlib.compress(data, 6) if self.compress else b"r" + data
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._puts += 1
+            rescan = self._size is None or self._puts % self.RESCAN_EVERY == 0
+            if not rescan:
+                self._size = (self._size or 0) + len(data)
+                rescan = self._size > self.max_bytes
+        if rescan:
+            self.evict()
+
+    def has(self, provider: str, email: str, msg_id: str) -> bool:
+        """Whether a body is cached, without reading it."""
+        return self._path(provider, email, msg_id).exists()
+
+    def evict(self) -> int:
+        """Delete least recently used bodies until under `max_bytes`."""
+        with self._lock:
+            entries = []
+            total = 0
+            for path in self.directory.glob("*/*"):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+            removed = 0
+            if total <= self.max_bytes:
+                self._size = total
+                return removed
+            for _, size, path in sorted(entries):
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+                if total <= self.max_bytes:
+                    break
+            self._size = total
+            return removed
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*/*"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        self._size = None
+
+
+_caches: dict[Path, BodyCache] = {}
+
+
+def get_cache() -> BodyCache | None:
+    """Body cache at CACHE_DIR, or None when TEMA_CACHE=0."""
+    if not CACHE_ENABLED:
+        return None
+    cache = _caches.get(CACHE_DIR)
+    if cache is None:
+        cache = _caches[CACHE_DIR] = BodyCache(
+            CACHE_DIR, CACHE_MAX_BYTES, CACHE_COMPRESS
+        )
+    return cache
@@ -0,0 +1,78 @@
+"""Cloudflare clearance cache: reuse homepage cookies across mailbox creations."""
+
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Iterable
+from typing import Any
+
+from tema.state import get_store
+
+__all__ = [
+    "CLEARANCE_TTL",
+    "drop_clearance",
+    "load_clearance",
+    "restore_clearance",
+    "save_clearance",
+]
+
+# Seconds homepage cookies are reused for; 0 disables the cache
+CLEARANCE_TTL = float(os.environ.get("TEMA_CLEARANCE_TTL", "900"))
+
+
+def load_clearance(
+    provider: str, required: Iterable[str] = ()
+) -> list[dict[str, str]] | None:
+    """
+    Cached homepage cookies for `provider` ({name, value, domain, path}
+    each), or None when there are none, they expired, or any of the
+    `required` cookies is missing.
+    """
+    if CLEARANCE_TTL <= 0:
+        return None
+    cookies = get_store().clearance(provider, time.time())
+    if not isinstance(cookies, list):  # none, or a name->value dict from 0.x
+        return None
+    names = {c["name"] for c in cookies if c.get("value")}
+    if not all(name in names for name in required):
+        return None
+    return cookies
+
+
+def save_clearance(provider: str, session: Any) -> None:
+    """
+    Cache `session`'s cookies for `provider` for CLEARANCE_TTL seconds,
+    or until the first of them expires if that is sooner. Domain and path
+    are kept, so same-named cookies of different hosts stay apart.
+    """
+    if CLEARANCE_TTL <= 0:
+        return
+    now = time.time()
+    expires_at = now + CLEARANCE_TTL
+    cookies = []
+    # curl_cffi wraps its CookieJar; a requests jar is one itself
+    for cookie in getattr(session.cookies, "jar", session.cookies):
+        if cookie.expires:
+            expires_at = min(expires_at, float(cookie.expires))
+        cookies.append(
+            {
+                "name": cookie.name,
+                "value": cookie.value,
+                "domain": cookie.domain,
+                "path": cookie.path,
+            }
+        )
+    if cookies and expires_at > now:
+        get_store().save_clearance(provider, cookies, expires_at)
+
+
+def restore_clearance(session: Any, cookies: list[dict[str, str]]) -> None:
+    """Put cookies from :func:`load_clearance` into `session`."""
+    for c in cookies:
+        session.cookies.set(c["name"], c["value"], domain=c["domain"], path=c["path"])
+
+
+def drop_clearance(provider: str) -> None:
+    """Forget `provider`'s cookies, e.g. after the site rejected them."""
+    get_store().drop_clearance(provider)
@@ -6,23 +6,63 @@ __all__ = ["main"]
 
 import argparse
 import json
-import re
+import subprocess
 import sys
 
-from tema.core import create_email, get_inbox, get_message_body, wait_for_message
+from tema.core import (
+    create_email,
+    create_emails,
+    get_inbox,
+    get_message_body,
+    message_stream,
+    wait_for_message,
+    watch,
+)
+from tema.health import provider_health
+from tema.hooks import Profile
+from tema.policy import Policy, apply_policy
+from tema.pool import fill_pool, pool_stats, prune_pool, take_from_pool
 from tema.providers import DOMAIN_PROVIDERS, PROVIDERS
+from tema.state import list_states, use_state
 from tema.utils import (
     HAS_CURL_CFFI,
-    extract_links,
+    find_code,
     find_verification_link,
     gmail_alias,
+    iter_links,
+    rank_codes,
+    rank_verification_links,
 )
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser(
         description="Temp Mail — multi-provider temporary email CLI with real domains"
     )
+    parser.add_argument(
+        "--email",
+        "-e",
+        default=None,
+        help="Stored mailbox to use instead of the active one",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print a JSON timing breakdown of every HTTP call to stderr",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Fail (or stop waiting) once the command has run this long",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=0,
+        help="Retry failed provider HTTP calls with jittered backoff",
+    )
     sub = parser.add_subparsers(dest="command", help="Command")
 
     # create
@@ -41,10 +81,67 @@ def main() -> None:
         choices=list(PROVIDERS.keys()),
         help="Force specific provider (default: auto-fallback)",
     )
+    p_create.add_argument(
+        "--hedge",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Start the next fallback provider after SECONDS instead of waiting "
+        "for failure; first success wins (0 = race all)",
+    )
+    p_create.add_argument(
+        "-n",
+        type=int,
+        default=1,
+        help="Create N mailboxes, one JSON line each as they are ready; "
+        "none becomes active",
+    )
+    p_create.add_argument(
+        "--concurrency", type=int, default=8, help="Parallel creates with -n"
+    )
+    p_create.add_argument(
+        "--max-per-provider",
+        type=int,
+        default=4,
+        help="Concurrent creates allowed against one provider with -n",
+    )
 
     # wait
     p_wait = sub.add_parser("wait", help="Wait for new message")
     p_wait.add_argument("--timeout", type=int, default=120)
+    p_wait.add_argument(
+        "--sender",
+        default=None,
+        help="Expected sender address or domain; tunes polling to its history",
+    )
+    p_wait.add_argument(
+        "--interval",
+        type=float,
+        default=None,
+        help="Fixed initial poll interval instead of the learned schedule",
+    )
+    p_wait.add_argument(
+        "--extract",
+        choices=["code", "link"],
+        default=None,
+        help="Print only the verification code or link instead of a preview",
+    )
+
+    # watch
+    p_watch = sub.add_parser(
+        "watch", help="Stream new messages as NDJSON, resuming where the last stopped"
+    )
+    p_watch.add_argument(
+        "--timeout",
+        type=int,
+        default=None,
+        help="Stop after N seconds (default: never)",
+    )
+    p_watch.add_argument(
+        "--all",
+        action="store_true",
+        help="On the first watch, also emit messages already in the inbox",
+    )
 
     # read
     p_read = sub.add_parser("read", help="Read message")
@@ -56,7 +153,23 @@ def main() -> None:
     sub.add_parser("links", help="Extract links from latest message")
 
     # verify
-    sub.add_parser("verify", help="Find verification link")
+    p_verify = sub.add_parser("verify", help="Find verification link")
+    p_verify.add_argument(
+        "--all",
+        action="store_true",
+        help="Print every candidate link with its score, best first",
+    )
+
+    # code
+    p_code = sub.add_parser("code", help="Find verification code (OTP)")
+    p_code.add_argument(
+        "msg_id", nargs="?", default=None, help="Message ID (default: latest)"
+    )
+    p_code.add_argument(
+        "--all",
+        action="store_true",
+        help="Print every candidate code with its score, best first",
+    )
 
     # gmail-alias
     p_gmail = sub.add_parser("gmail-alias", help="Generate Gmail +alias")
@@ -65,28 +178,131 @@ def main() -> None:
     # list
     sub.add_parser("list", help="List all messages")
 
+    # mailboxes
+    p_boxes = sub.add_parser("mailboxes", help="List stored mailboxes")
+    p_boxes.add_argument("--provider", "-p", default=None)
+    p_boxes.add_argument("--domain", "-d", default=None)
+    p_boxes.add_argument("--limit", type=int, default=None)
+
+    # use
+    p_use = sub.add_parser("use", help="Make a stored mailbox the active one")
+    p_use.add_argument("email", help="Mailbox address")
+
     # domains
     sub.add_parser("domains", help="List available domains with providers")
 
     # providers
     sub.add_parser("providers", help="List all providers and status")
 
-    args = parser.parse_args()
+    # pool
+    p_pool = sub.add_parser("pool", help="Pre-warmed mailbox pool")
+    pool_sub = p_pool.add_subparsers(dest="pool_command", required=True)
+    p_fill = pool_sub.add_parser("fill", help="Create mailboxes into the pool")
+    p_fill.add_argument(
+        "--domain", "-d", default="gmail", choices=list(DOMAIN_PROVIDERS.keys())
+    )
+    p_fill.add_argument("-n", type=int, default=10, help="Mailboxes to create")
+    p_fill.add_argument(
+        "--provider", "-p", default=None, choices=list(PROVIDERS.keys())
+    )
+    p_fill.add_argument(
+        "--exclusive",
+        action="store_true",
+        help="Do nothing while another exclusive fill of the domain runs",
+    )
+    p_take = pool_sub.add_parser("take", help="Take a pooled mailbox as active")
+    p_take.add_argument(
+        "--domain", "-d", default="gmail", choices=list(DOMAIN_PROVIDERS.keys())
+    )
+    p_take.add_argument(
+        "--max-age", type=int, default=None, help="Skip mailboxes older than this"
+    )
+    p_take.add_argument(
+        "--low",
+        type=int,
+        default=None,
+        help="Refill in the background when fewer than LOW remain",
+    )
+    p_take.add_argument(
+        "--target", type=int, default=None, help="Refill up to TARGET (default: LOW)"
+    )
+    p_stats = pool_sub.add_parser("stats", help="Show pool contents")
+    p_stats.add_argument("--max-age", type=int, default=None)
+    p_prune = pool_sub.add_parser("prune", help="Drop stale pooled mailboxes")
+    p_prune.add_argument("--max-age", type=int, default=None)
+
+    # serve
+    p_serve = sub.add_parser(
+        "serve", help="Run a daemon that keeps sessions warm between commands"
+    )
+    p_serve.add_argument(
+        "--socket", default=None, help="Unix socket path (default: $TEMA_SOCKET)"
+    )
+    p_serve.add_argument(
+        "--http",
+        type=int,
+        default=None,
+        metavar="PORT",
+        help="Also serve 127.0.0.1:PORT",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "create" and args.n != 1 and args.hedge is not None:
+        parser.error("--hedge cannot be combined with -n")
 
     if not args.command:
         parser.print_help()
         sys.exit(1)
 
+    profile = Profile().__enter__() if args.profile else None
+    policy = None
+    if args.deadline is not None or args.retries:
+        policy = Policy(deadline=args.deadline, retries=args.retries)
     try:
-        _dispatch(args)
+        with apply_policy(policy):
+            _dispatch(args)
     except (ValueError, RuntimeError) as e:
         print(json.dumps({"error": str(e)}), file=sys.stderr)
         sys.exit(1)
+    finally:
+        if profile is not None:
+            profile.__exit__()
+            print(json.dumps({"profile": profile.summary()}, indent=2), file=sys.stderr)
 
 
 def _dispatch(args: argparse.Namespace) -> None:
-    if args.command == "create":
-        state = create_email(domain=args.domain, provider_name=args.provider)
+    if args.command == "create" and args.n != 1:
+        created = 0
+        for state in create_emails(
+            args.n,
+            domain=args.domain,
+            provider_name=args.provider,
+            concurrency=args.concurrency,
+            max_per_provider=args.max_per_provider,
+        ):
+            created += 1
+            print(
+                json.dumps(
+                    {
+                        "email": state["email"],
+                        "provider": state["provider"],
+                        "domain": state["domain"],
+                    }
+                ),
+                flush=True,
+            )
+        if created < args.n:
+            print(
+                json.dumps({"error": f"created {created} of {args.n} mailboxes"}),
+                file=sys.stderr,
+            )
+            sys.exit(1)
+
+    elif args.command == "create":
+        state = create_email(
+            domain=args.domain, provider_name=args.provider, hedge=args.hedge
+        )
         print(
             json.dumps(
                 {
@@ -99,8 +315,28 @@ def _dispatch(args: argparse.Namespace) -> None:
         )
 
     elif args.command == "wait":
-        msg = wait_for_message(timeout=args.timeout)
-        if msg:
+        msg = wait_for_message(
+            timeout=args.timeout,
+            poll_interval=args.interval,
+            email=args.email,
+            sender=args.sender,
+            extract=args.extract,
+        )
+        if msg and args.extract:
+            print(
+                json.dumps(
+                    {
+                        "id": msg.get("id", ""),
+                        "from": msg.get("from", ""),
+                        "subject": msg.get("subject", ""),
+                        args.extract: msg.get(args.extract),
+                    },
+                    indent=2,
+                )
+            )
+            if not msg.get(args.extract):
+                sys.exit(1)
+        elif msg:
             print(
                 json.dumps(
                     {
@@ -117,9 +353,29 @@ def _dispatch(args: argparse.Namespace) -> None:
             print(json.dumps({"error": "timeout"}))
             sys.exit(1)
 
+    elif args.command == "watch":
+        try:
+            for msg in watch(
+                timeout=args.timeout, email=args.email, include_existing=args.all
+            ):
+                print(
+                    json.dumps(
+                        {
+                            "id": msg.get("id", ""),
+                            "from": msg.get("from", ""),
+                            "subject": msg.get("subject", ""),
+                            "has_html": bool(msg.get("html")),
+                            "text_preview": (msg.get("html", "") or "")[:500],
+                        }
+                    ),
+                    flush=True,
+                )
+        except KeyboardInterrupt:
+            pass
+
     elif args.command == "read":
         if args.msg_id:
-            html = get_message_body(args.msg_id)
+            html = get_message_body(args.msg_id, email=args.email)
             print(
                 json.dumps(
                     {"id": args.msg_id, "html": html},
@@ -128,7 +384,7 @@ def _dispatch(args: argparse.Namespace) -> None:
                 )
             )
         else:
-            messages, state = get_inbox()
+            messages, state = get_inbox(args.email)
             if not messages:
                 print(json.dumps({"error": "no messages"}))
                 sys.exit(1)
@@ -148,23 +404,26 @@ def _dispatch(args: argparse.Namespace) -> None:
             )
 
     elif args.command == "links":
-        messages, state = get_inbox()
+        messages, state = get_inbox(args.email)
         if not messages:
             print(json.dumps({"error": "no messages"}))
             sys.exit(1)
-        html = get_message_body(messages[0]["id"], state)
-        links = extract_links(html or "")
-        text_links = re.findall(r"https?://[^\s<>\"')\]]+", html or "")
-        all_links = list(dict.fromkeys(links + text_links))
-        print(json.dumps({"links": all_links}, indent=2))
+        links = list(iter_links(message_stream(messages[0]["id"], state)))
+        print(json.dumps({"links": links}, indent=2))
 
     elif args.command == "verify":
-        messages, state = get_inbox()
+        messages, state = get_inbox(args.email)
         if not messages:
             print(json.dumps({"error": "no messages"}))
             sys.exit(1)
-        html = get_message_body(messages[0]["id"], state)
-        link = find_verification_link(html or "")
+        body = message_stream(messages[0]["id"], state)
+        if args.all:
+            ranked = rank_verification_links(body)
+            ranked_links = [{"url": url, "score": score} for url, score in ranked]
+            print(json.dumps({"links": ranked_links}, indent=2))
+            return
+        # Stops downloading as soon as a confident link shows up
+        link = find_verification_link(body)
         if link:
             print(json.dumps({"verification_link": link}))
         else:
@@ -178,18 +437,86 @@ def _dispatch(args: argparse.Namespace) -> None:
             )
             sys.exit(1)
 
+    elif args.command == "code":
+        if args.msg_id:
+            msg = {"id": args.msg_id, "subject": ""}
+            html = get_message_body(args.msg_id, email=args.email)
+        else:
+            messages, state = get_inbox(args.email)
+            if not messages:
+                print(json.dumps({"error": "no messages"}))
+                sys.exit(1)
+            msg = messages[0]
+            html = get_message_body(msg["id"], state)
+        if args.all:
+            ranked = rank_codes(html or "", msg.get("subject", ""))
+            codes = [{"code": code, "score": score} for code, score in ranked]
+            print(json.dumps({"codes": codes}, indent=2))
+            return
+        code = find_code(html or "", msg.get("subject", ""))
+        if code:
+            print(json.dumps({"code": code}))
+        else:
+            print(
+                json.dumps(
+                    {"error": "no code found", "subject": msg.get("subject", "")}
+                )
+            )
+            sys.exit(1)
+
+    elif args.command == "pool":
+        _dispatch_pool(args)
+
     elif args.command == "gmail-alias":
         alias = gmail_alias(args.email)
         print(json.dumps({"alias": alias}))
 
     elif args.command == "list":
-        messages, _ = get_inbox()
+        messages, _ = get_inbox(args.email)
         print(json.dumps(messages, indent=2))
 
+    elif args.command == "mailboxes":
+        states = list_states(
+            provider=args.provider, domain=args.domain, limit=args.limit
+        )
+        print(
+            json.dumps(
+                [
+                    {
+                        "email": st["email"],
+                        "provider": st["provider"],
+                        "domain": st.get("domain", ""),
+                        "created_at": st.get("created_at", 0),
+                    }
+                    for st in states
+                ],
+                indent=2,
+            )
+        )
+
+    elif args.command == "use":
+        state = use_state(args.email)
+        print(
+            json.dumps(
+                {
+                    "email": state["email"],
+                    "provider": state["provider"],
+                    "domain": state["domain"],
+                },
+                indent=2,
+            )
+        )
+
     elif args.command == "domains":
         print(json.dumps(DOMAIN_PROVIDERS, indent=2))
 
+    elif args.command == "serve":
+        from tema.server import serve
+
+        serve(args.socket, args.http)
+
     elif args.command == "providers":
+        health = provider_health()
         result = []
         for name, p in PROVIDERS.items():
             result.append(
@@ -198,6 +525,57 @@ def _dispatch(args: argparse.Namespace) -> None:
                     "domains": p.domains,
                     "needs_curl_cffi": p.requires_curl_cffi,
                     "available": HAS_CURL_CFFI if p.requires_curl_cffi else True,
+                    "health": health.get(name, {"state": "closed"}),
                 }
             )
         print(json.dumps(result, indent=2))
+
+
+def _dispatch_pool(args: argparse.Namespace) -> None:
+    if args.pool_command == "fill":
+        added = fill_pool(
+            domain=args.domain,
+            count=args.n,
+            provider_name=args.provider,
+            exclusive=args.exclusive,
+        )
+        print(json.dumps({"added": added, "requested": args.n}))
+        if not added:
+            sys.exit(1)
+
+    elif args.pool_command == "take":
+        state = take_from_pool(domain=args.domain, max_age=args.max_age)
+        if args.low is not None:
+            ready = (
+                pool_stats(args.max_age)["domains"].get(args.domain, {}).get("ready", 0)
+            )
+            missing = (args.target or args.low) - ready
+            if ready < args.low and missing > 0:
+                # Detached refill so this command returns immediately; it
+                # exits at once if an earlier take's refill is still running
+                subprocess.Popen(
+                    [sys.executable, "-m", "tema", "pool", "fill", "--exclusive"]
+                    + ["-d", args.domain, "-n", str(missing)],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    start_new_session=True,
+                )
+        if state is None:
+            print(json.dumps({"error": f"pool empty for '{args.domain}'"}))
+            sys.exit(1)
+        print(
+            json.dumps(
+                {
+                    "email": state["email"],
+                    "provider": state["provider"],
+                    "domain": state["domain"],
+                },
+                indent=2,
+            )
+        )
+
+    elif args.pool_command == "stats":
+        print(json.dumps(pool_stats(args.max_age), indent=2))
+
+    elif args.pool_command == "prune":
+        print(json.dumps({"removed": prune_pool(args.max_age)}))
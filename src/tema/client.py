@@ -0,0 +1,91 @@
+"""Thin CLI entry point: hand the command to a running `tema serve` daemon."""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import Any
+
+__all__ = ["SOCKET_PATH", "main", "run_remote"]
+
+# Relative by default, like the state store: one daemon per working directory
+SOCKET_PATH = Path(os.environ.get("TEMA_SOCKET", ".tema.sock"))
+DAEMON_ENABLED = os.environ.get("TEMA_DAEMON", "1") != "0"
+# Commands that must run in this process
+_LOCAL = {"serve", "--profile"}
+# Global options of tema.cli that take a value
+_VALUED = {"--email", "-e", "--deadline", "--retries"}
+# Settings that only pick the daemon, not what a command does
+_ROUTING = {"TEMA_SOCKET", "TEMA_DAEMON"}
+
+
+def _context() -> dict[str, Any]:
+    """Working directory and TEMA_* settings a command's behavior depends on."""
+    env = {
+        k: v
+        for k, v in os.environ.items()
+        if k.startswith("TEMA_") and k not in _ROUTING
+    }
+    return {"cwd": os.path.realpath(os.getcwd()), "env": env}
+
+
+def run_remote(argv: list[str], path: Path | None = None) -> int | None:
+    """
+    Run a CLI command in the daemon, relaying its output as it streams in.
+    Returns the exit code, or None when no daemon is listening or it runs
+    in another directory or with other TEMA_* settings than this process.
+    """
+    path = SOCKET_PATH if path is None else path
+    if not path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:  # stale socket file
+        sock.close()
+        return None
+    with sock, sock.makefile("rwb") as f:
+        f.write(json.dumps({"argv": argv, **_context()}).encode() + b"\n")
+        f.flush()
+        for line in f:
+            frame = json.loads(line)
+            if "declined" in frame:
+                return None
+            if "exit" in frame:
+                return int(frame["exit"])
+            for stream in ("stdout", "stderr"):
+                if stream in frame:
+                    out = getattr(sys, stream)
+                    out.write(frame[stream])
+                    out.flush()
+    return 1  # daemon went away mid-command
+
+
+def _command(argv: list[str]) -> str | None:
+    """The subcommand in `argv`, without importing the CLI parser."""
+    it = iter(argv)
+    for arg in it:
+        if arg in _VALUED:
+            next(it, None)
+        elif not arg.startswith("-"):
+            return arg
+    return None
+
+
+def main() -> None:
+    argv = sys.argv[1:]
+    if DAEMON_ENABLED and not _LOCAL.intersection(argv):
+        try:
+            code = run_remote(argv)
+        except KeyboardInterrupt:
+            # Like the in-process CLI: Ctrl-C ends `watch` normally; anything
+            # else exits as interrupted, without a traceback
+            sys.exit(0 if _command(argv) == "watch" else 130)
+        if code is not None:
+            sys.exit(code)
+    from tema.cli import main as cli_main
+
+    cli_main(argv)
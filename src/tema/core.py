@@ -2,104 +2,820 @@
 
 from __future__ import annotations
 
+import contextvars
+import queue
+import threading
 import time
-from typing import Any
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, TypeVar
 
-from tema.providers import DOMAIN_PROVIDERS, get_provider
-from tema.state import load_state, save_state
-from tema.utils import _log
+from tema.cache import get_cache
+from tema.health import admit, order_providers, record_failure, record_success
+from tema.hooks import span, traced
+from tema.policy import (
+    DeadlineExceeded,
+    Policy,
+    apply_policy,
+    cancelled,
+    pause,
+    remaining,
+)
+from tema.providers import DOMAIN_PROVIDERS, Provider, get_provider
+from tema.schedule import poll_schedule, record_arrival
+from tema.state import get_store, load_state, save_state
+from tema.utils import _log, find_code, find_verification_link
 
-__all__ = ["create_email", "get_inbox", "get_message_body", "wait_for_message"]
+if TYPE_CHECKING:
+    import asyncio
 
+__all__ = [
+    "create_email",
+    "create_emails",
+    "get_inbox",
+    "get_message_body",
+    "message_stream",
+    "wait_for_message",
+    "watch",
+    "create_email_async",
+    "get_inbox_async",
+    "get_message_body_async",
+    "wait_for_message_async",
+    "wait_for_messages_async",
+]
 
+T = TypeVar("T")
+
+
+@traced("create_email")
 def create_email(
-    domain: str = "gmail", provider_name: str | None = None
+    domain: str = "gmail",
+    provider_name: str | None = None,
+    hedge: float | None = None,
+    policy: Policy | None = None,
 ) -> dict[str, Any]:
-    """Create temp email with auto-fallback across providers."""
-    if provider_name:
-        p = get_provider(provider_name)
-        if domain not in p.domains:
-            supported = ", ".join(p.domains)
-            raise ValueError(
-                f"{provider_name} doesn't support '{domain}'. Supported: {supported}"
-            )
-        state = p.create(domain)
+    """
+    Create temp email with auto-fallback across providers.
+    With `hedge` set, the next provider is started after `hedge` seconds
+    (or as soon as the running ones fail) and the first success wins;
+    `hedge=0` races every provider at once. `policy` bounds the whole
+    fallback chain (see :class:`tema.policy.Policy`).
+    """
+    with apply_policy(policy):
+        state = _create_mailbox(domain, provider_name, hedge)
+    save_state(state)
+    return state
+
+
+def _create_mailbox(
+    domain: str, provider_name: str | None = None, hedge: float | None = None
+) -> dict[str, Any]:
+    """Create a mailbox without making it the active one."""
+    if hedge is not None and hedge < 0:
+        raise ValueError(f"hedge must be at least 0 seconds, got {hedge}")
+    if hedge is not None and not provider_name:
+        return _create_hedged(domain, _healthy_order(domain), hedge)
+    chain = _Fallback(domain, provider_name)
+    for p in chain:
+        try:
+            state = _tracked_create(p, domain)
+        except Exception as e:
+            chain.failed(p, e)
+        else:
+            return chain.succeeded(p, state)
+    raise chain.exhausted()
+
+
+def _forced_provider(domain: str, provider_name: str) -> Provider:
+    """Provider `provider_name`, checked to serve `domain`."""
+    p = get_provider(provider_name)
+    if domain not in p.domains:
+        supported = ", ".join(p.domains)
+        raise ValueError(
+            f"{provider_name} doesn't support '{domain}'. Supported: {supported}"
+        )
+    return p
+
+
+class _Fallback:
+    """
+    One walk down a domain's provider chain, shared by the sync and async
+    creates: iterate for the providers to try and report each outcome.
+    A forced provider is the whole chain and its errors propagate as is.
+    """
+
+    def __init__(self, domain: str, provider_name: str | None) -> None:
+        self.domain = domain
+        self.forced = bool(provider_name)
+        if provider_name:
+            self.order = [_forced_provider(domain, provider_name).name]
+        else:
+            self.order = _healthy_order(domain)
+        self.errors: list[str] = []
+
+    def __iter__(self) -> Iterator[Provider]:
+        for pname in self.order:
+            if not self.forced:
+                if not admit(pname):
+                    _log(f"SKIP: {pname} (circuit open)")
+                    continue
+                _log(f"Trying {pname}...")
+            yield get_provider(pname)
+
+    def succeeded(self, p: Provider, state: dict[str, Any]) -> dict[str, Any]:
         state["created_at"] = int(time.time())
-        save_state(state)
+        if not self.forced:
+            _log(f"OK: {p.name} -> {state['email']}")
         return state
 
+    def failed(self, p: Provider, e: Exception) -> None:
+        """Note a failed create; re-raises what must not fall through."""
+        if self.forced or isinstance(e, DeadlineExceeded):
+            raise e
+        self.errors.append(f"{p.name}: {e}")
+        _log(f"FAIL: {p.name}: {e}")
+
+    def exhausted(self) -> RuntimeError:
+        return RuntimeError(
+            f"All providers failed for '{self.domain}':\n" + "\n".join(self.errors)
+        )
+
+
+def _domain_chain(domain: str) -> list[str]:
+    """DOMAIN_PROVIDERS chain for `domain`; ValueError if there is none."""
     provider_order = DOMAIN_PROVIDERS.get(domain)
     if not provider_order:
         raise ValueError(
             f"Unknown domain: {domain}. Available: {', '.join(DOMAIN_PROVIDERS)}"
         )
+    return provider_order
 
-    errors = []
+
+def _healthy_order(domain: str) -> list[str]:
+    """
+    DOMAIN_PROVIDERS chain for `domain`, reordered by provider health.
+    Half-open providers lead; :func:`tema.health.admit` each one before use.
+    """
+    provider_order = _domain_chain(domain)
+    ordered = order_providers(provider_order)
     for pname in provider_order:
-        p = get_provider(pname)
+        if pname not in ordered:
+            _log(f"SKIP: {pname} (circuit open)")
+    return ordered
+
+
+def _tracked_create(p: Provider, domain: str) -> dict[str, Any]:
+    """p.create() with its outcome and latency fed into provider health."""
+    return _tracked(p, lambda: p.create(domain))
+
+
+def _tracked_create_many(p: Provider, domain: str, count: int) -> list[dict[str, Any]]:
+    """p.create_many(), tracked like :func:`_tracked_create`."""
+    return _tracked(p, lambda: p.create_many(domain, count), count=count)
+
+
+def _tracked(p: Provider, call: Callable[[], T], **fields: Any) -> T:
+    start = time.monotonic()
+    try:
+        with span("provider_create", provider=p.name, **fields):
+            result = call()
+    except DeadlineExceeded:
+        raise  # our budget ran out, not the provider's fault
+    except Exception:
+        record_failure(p.name, time.monotonic() - start)
+        raise
+    record_success(p.name, time.monotonic() - start)
+    return result
+
+
+def _create_hedged(
+    domain: str, provider_order: list[str], hedge: float
+) -> dict[str, Any]:
+    results: queue.Queue[tuple[str, dict[str, Any] | None, Exception | None]] = (
+        queue.Queue()
+    )
+
+    def run(pname: str) -> None:
         try:
+            results.put((pname, _tracked_create(get_provider(pname), domain), None))
+        except Exception as e:
+            results.put((pname, None, e))
+
+    waiting = list(provider_order)
+
+    def launch() -> int:
+        """Start the next admitted provider; 1 if one was started, else 0."""
+        while waiting:
+            pname = waiting.pop(0)
+            if not admit(pname):
+                _log(f"SKIP: {pname} (circuit open)")
+                continue
             _log(f"Trying {pname}...")
-            state = p.create(domain)
+            # Daemon threads: losers are abandoned, not awaited at exit. The
+            # copied context keeps their HTTP events attributed to this create.
+            ctx = contextvars.copy_context()
+            threading.Thread(target=ctx.run, args=(run, pname), daemon=True).start()
+            return 1
+        return 0
+
+    errors = []
+    launched = launch()
+    finished = 0
+    while finished < launched:
+        more = bool(waiting)
+        try:
+            pname, state, err = results.get(timeout=hedge if more else None)
+        except queue.Empty:
+            launched += launch()
+            continue
+        finished += 1
+        if state is not None:
             state["created_at"] = int(time.time())
-            save_state(state)
             _log(f"OK: {pname} -> {state['email']}")
             return state
-        except Exception as e:
-            errors.append(f"{pname}: {e}")
-            _log(f"FAIL: {pname}: {e}")
+        if isinstance(err, DeadlineExceeded):
+            raise err
+        errors.append(f"{pname}: {err}")
+        _log(f"FAIL: {pname}: {err}")
+        launched += launch()
 
     raise RuntimeError(f"All providers failed for '{domain}':\n" + "\n".join(errors))
 
 
-def get_inbox() -> tuple[list[dict[str, str]], dict[str, Any]]:
-    """Get inbox messages for active mailbox."""
-    state = load_state()
+def create_emails(
+    count: int,
+    domain: str = "gmail",
+    provider_name: str | None = None,
+    concurrency: int = 8,
+    max_per_provider: int | dict[str, int] = 4,
+) -> Iterator[dict[str, Any]]:
+    """
+    Create `count` mailboxes on `concurrency` threads, yielding each state
+    as soon as it is ready (completion order). Each creation walks the
+    fallback chain like :func:`create_email`, but starts with the first
+    provider that has fewer than `max_per_provider` creates in flight, so
+    load spreads across the chain instead of queueing on its head.
+    Providers that hand out several addresses per call (`batch_size`)
+    are asked for as many as are still needed.
+    Every mailbox is stored; none becomes the active one. Failed creations
+    are logged and skipped, so fewer than `count` states may be yielded.
+    """
+    if count < 1:
+        raise ValueError(f"count must be at least 1, got {count}")
+    _check_limits(concurrency, max_per_provider)
+    store = get_store()
+    return _harvest(
+        count,
+        domain,
+        provider_name,
+        concurrency,
+        max_per_provider,
+        lambda state: store.save(state, active=False),
+    )
+
+
+def _check_limits(concurrency: int, max_per_provider: int | dict[str, int]) -> None:
+    """Reject limits that would leave creates waiting for a slot forever."""
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+    limits = (
+        max_per_provider.values()
+        if isinstance(max_per_provider, dict)
+        else [max_per_provider]
+    )
+    if any(limit < 1 for limit in limits):
+        raise ValueError(f"max_per_provider must be at least 1, got {max_per_provider}")
+
+
+def _harvest(
+    count: int,
+    domain: str,
+    provider_name: str | None,
+    concurrency: int,
+    max_per_provider: int | dict[str, int],
+    keep: Callable[[dict[str, Any]], None],
+) -> Iterator[dict[str, Any]]:
+    """Create up to `count` mailboxes in parallel, `keep` each, yield as ready."""
+    if provider_name:
+        _forced_provider(domain, provider_name)
+    else:
+        _domain_chain(domain)  # fail fast on an unknown domain
+    if count > 1:
+        for name in [provider_name] if provider_name else DOMAIN_PROVIDERS[domain]:
+            get_provider(name).prefetch()
+    slots = _ProviderSlots(max_per_provider)
+    results: queue.Queue[dict[str, Any] | Exception | None] = queue.Queue()
+    lock = threading.Lock()
+    pending = count
+
+    def claim(n: int) -> int:
+        nonlocal pending
+        with lock:
+            n = max(0, min(n, pending))
+            pending -= n
+            return n
+
+    def unclaim(n: int) -> None:
+        nonlocal pending
+        with lock:
+            pending += n
+
+    def create_batch() -> list[dict[str, Any]]:
+        tried: list[str] = []
+        errors: list[str] = []
+        while True:
+            order = [provider_name] if provider_name else _healthy_order(domain)
+            order = [n for n in order if n not in tried]
+            if not order:
+                raise RuntimeError(
+                    f"All providers failed for '{domain}': " + "; ".join(errors)
+                )
+            pname = slots.acquire(order)
+            if not provider_name and not admit(pname):
+                slots.release(pname)
+                tried.append(pname)
+                _log(f"SKIP: {pname} (circuit open)")
+                continue
+            p = get_provider(pname)
+            extra = claim(p.batch_size - 1)
+            try:
+                states = _tracked_create_many(p, domain, 1 + extra)[: 1 + extra]
+            except Exception as e:
+                unclaim(extra)
+                tried.append(pname)
+                errors.append(f"{pname}: {e}")
+                continue
+            finally:
+                slots.release(pname)
+            unclaim(1 + extra - len(states))
+            return states
+
+    def work() -> None:
+        try:
+            while claim(1):
+                try:
+                    states = create_batch()
+                except Exception as e:
+                    results.put(e)
+                    continue
+                now = int(time.time())
+                for state in states:
+                    state["created_at"] = now
+                    keep(state)
+                    results.put(state)
+        finally:
+            results.put(None)
+
+    workers = max(1, min(concurrency, count))
+    executor = ThreadPoolExecutor(workers, thread_name_prefix="tema-create")
+    try:
+        # A copied context per worker keeps HTTP events attributed to this call
+        for _ in range(workers):
+            executor.submit(contextvars.copy_context().run, work)
+        done = failed = 0
+        while done < workers:
+            result = results.get()
+            if result is None:
+                done += 1
+            elif isinstance(result, Exception):
+                failed += 1
+                _log(f"FAIL: mailbox {failed} of {count}: {result}")
+            else:
+                yield result
+    finally:
+        claim(count)  # stop workers from starting new creates
+        executor.shutdown(wait=False)
+
+
+class _ProviderSlots:
+    """Per-provider caps on concurrent creates, shared by worker threads."""
+
+    def __init__(self, limit: int | dict[str, int]) -> None:
+        self.limit = limit
+        self._active: dict[str, int] = {}
+        self._cond = threading.Condition()
+
+    def _limit(self, provider: str) -> int:
+        if isinstance(self.limit, dict):
+            return self.limit.get(provider, 4)
+        return self.limit
+
+    def acquire(self, order: list[str]) -> str:
+        """Claim the first provider in `order` with a free slot, waiting if none."""
+        with self._cond:
+            while True:
+                for pname in order:
+                    if self._active.get(pname, 0) < self._limit(pname):
+                        self._active[pname] = self._active.get(pname, 0) + 1
+                        return pname
+                self._cond.wait()
+
+    def release(self, provider: str) -> None:
+        with self._cond:
+            self._active[provider] -= 1
+            self._cond.notify_all()
+
+
+def _require_state(
+    state: dict[str, Any] | None = None, email: str | None = None
+) -> dict[str, Any]:
+    if state is None:
+        state = load_state(email)
+        if email and state is None:
+            raise RuntimeError(f"Unknown mailbox: {email}")
     if not state or "provider" not in state:
         raise RuntimeError("No active mailbox. Run 'create' first.")
+    return state
+
+
+@traced("get_inbox")
+def get_inbox(
+    email: str | None = None, policy: Policy | None = None
+) -> tuple[list[dict[str, str]], dict[str, Any]]:
+    """Get inbox messages for `email` (default: active mailbox)."""
+    state = _require_state(email=email)
     p = get_provider(state["provider"])
-    return p.inbox(state), state
+    with apply_policy(policy):
+        messages = _list_messages(p, state)
+    for m in messages:
+        m.pop("html", None)
+    return messages, state
+
+
+def _list_messages(p: Provider, state: dict[str, Any]) -> list[dict[str, str]]:
+    """
+    Inbox listing. For `bulk_bodies` providers the bodies that came with
+    the listing are kept under "html" and stored in the body cache.
+    """
+    if not p.bulk_bodies:
+        return p.inbox(state)
+    messages = p.inbox_with_bodies(state)
+    _cache_listed(p, state, messages)
+    return messages
 
 
-def get_message_body(msg_id: str, state: dict[str, Any] | None = None) -> str:
+def _cache_listed(
+    p: Provider, state: dict[str, Any], messages: list[dict[str, str]]
+) -> None:
+    """Store listed bodies that are not cached yet (polls repeat old ones)."""
+    cache = get_cache()
+    if cache is None:
+        return
+    for m in messages:
+        if m.get("html") and not cache.has(p.name, state["email"], m["id"]):
+            cache.put(p.name, state["email"], m["id"], m["html"])
+
+
+@traced("get_message_body")
+def get_message_body(
+    msg_id: str,
+    state: dict[str, Any] | None = None,
+    email: str | None = None,
+    policy: Policy | None = None,
+) -> str:
     """Get full message HTML body."""
-    if state is None:
-        state = load_state()
-    if not state or "provider" not in state:
-        raise RuntimeError("No active mailbox. Run 'create' first.")
+    state = _require_state(state, email)
     p = get_provider(state["provider"])
-    return p.message(state, msg_id)
+    with apply_policy(policy):
+        return _fetch_body(p, state, msg_id)
+
+
+def _fetch_body(p: Provider, state: dict[str, Any], msg_id: str) -> str:
+    """Message body from the local cache, else from the provider (then cached)."""
+    cache = get_cache()
+    if cache is not None:
+        body = cache.get(p.name, state["email"], msg_id)
+        if body is not None:
+            return body
+    body = p.message(state, msg_id)
+    if cache is not None and body:
+        cache.put(p.name, state["email"], msg_id, body)
+    return body
+
+
+def message_stream(
+    msg_id: str, state: dict[str, Any] | None = None, email: str | None = None
+) -> Iterator[str]:
+    """
+    Message HTML body as an iterator of chunks, streamed from the provider
+    where it supports it. Closing the iterator early stops the download;
+    only fully read bodies are cached.
+    """
+    state = _require_state(state, email)
+    return _stream_body(get_provider(state["provider"]), state, msg_id)
 
 
+def _stream_body(p: Provider, state: dict[str, Any], msg_id: str) -> Iterator[str]:
+    cache = get_cache()
+    if cache is not None:
+        body = cache.get(p.name, state["email"], msg_id)
+        if body is not None:
+            yield body
+            return
+    chunks = []
+    for chunk in p.message_stream(state, msg_id):
+        chunks.append(chunk)
+        yield chunk
+    body = "".join(chunks)
+    if cache is not None and body:
+        cache.put(p.name, state["email"], msg_id, body)
+
+
+@traced("wait_for_message")
 def wait_for_message(
-    timeout: int = 120, poll_interval: float = 5
+    timeout: float = 120,
+    poll_interval: float | None = None,
+    email: str | None = None,
+    sender: str | None = None,
+    extract: str | None = None,
+    policy: Policy | None = None,
 ) -> dict[str, str] | None:
-    """Poll for new messages with exponential backoff."""
-    state = load_state()
-    if not state or "provider" not in state:
-        raise RuntimeError("No active mailbox. Run 'create' first.")
+    """
+    Poll for a new message.
+    Poll timing adapts to past delivery latency for this provider (and
+    `sender` domain, if given); a fixed `poll_interval` restores plain
+    exponential backoff. `extract="code"` (or "link") adds the message's
+    verification code (or link) under that key, None if none was found.
+    A `policy` deadline shorter than `timeout` ends the wait early.
+    """
+    with apply_policy(policy):
+        left = remaining()
+        if left is not None:
+            timeout = min(timeout, max(left, 0))
+        return _wait(timeout, poll_interval, email, sender, extract)
 
+
+def _wait(
+    timeout: float,
+    poll_interval: float | None,
+    email: str | None,
+    sender: str | None,
+    extract: str | None,
+) -> dict[str, str] | None:
+    _check_extract(extract)
+    state = _require_state(email=email)
     p = get_provider(state["provider"])
     start = time.time()
     initial_msgs = p.inbox(state)
     initial_ids = {m["id"] for m in initial_msgs}
-    interval = poll_interval
+    delays = poll_schedule(p.name, sender, poll_interval)
+    last_poll = start
 
     _log(f"Waiting for new message at {state['email']} (timeout={timeout}s)...")
 
     while time.time() - start < timeout:
-        time.sleep(interval)
-        messages = p.inbox(state)
+        left = max(timeout - (time.time() - start), 0)
+        if pause(min(next(delays), left)):
+            _log("Wait cancelled")
+            return None
+        try:
+            messages = _list_messages(p, state)
+        except DeadlineExceeded:
+            break  # the policy's budget is the wait's timeout
+        now = time.time()
         new_msgs = [m for m in messages if m["id"] not in initial_ids]
         if new_msgs:
             msg = new_msgs[0]
-            try:
-                msg["html"] = p.message(state, msg["id"])
-            except Exception:
-                msg["html"] = ""
-            return msg
-        interval = min(interval * 1.3, 15)
-        elapsed = int(time.time() - start)
+            # Arrived somewhere between the last two polls
+            record_arrival(p.name, msg.get("from", ""), (last_poll + now) / 2 - start)
+            if "html" not in msg:
+                try:
+                    msg["html"] = _fetch_body(p, state, msg["id"])
+                except Exception:
+                    msg["html"] = ""
+            return _extract(msg, extract)
+        last_poll = now
+        elapsed = int(now - start)
         _log(f"  ... {elapsed}s elapsed, {len(messages)} messages")
 
     _log("ERROR: Timeout waiting for message")
     return None
+
+
+_EXTRACTORS = {
+    "code": lambda m: find_code(m.get("html", ""), m.get("subject", "")),
+    "link": lambda m: find_verification_link(m.get("html", "")),
+}
+
+
+def _check_extract(extract: str | None) -> None:
+    if extract is not None and extract not in _EXTRACTORS:
+        raise ValueError(f"Unknown extract {extract!r}; use one of {list(_EXTRACTORS)}")
+
+
+def _extract(msg: dict[str, Any], extract: str | None) -> dict[str, Any]:
+    if extract is not None:
+        msg[extract] = _EXTRACTORS[extract](msg)
+    return msg
+
+
+def watch(
+    timeout: float | None = None,
+    poll_interval: float = 5,
+    email: str | None = None,
+    include_existing: bool = False,
+) -> Iterator[dict[str, str]]:
+    """
+    Yield each new message (with "html"), oldest first.
+    Delivered ids are persisted per mailbox once the consumer asks for the
+    next message, so a later watch() resumes where this one stopped and a
+    message the consumer failed to handle is delivered again. On the first
+    watch of a mailbox, messages already present are skipped unless
+    `include_existing` is set. Runs until `timeout` seconds pass (forever
+    when None) or the operation is cancelled (see :func:`tema.policy.cancel_on`).
+    """
+    state = _require_state(email=email)
+    p = get_provider(state["provider"])
+    store = get_store()
+    addr = state["email"]
+    if not store.has_cursor(addr):
+        initial = [] if include_existing else [m["id"] for m in p.inbox(state)]
+        store.mark_seen(addr, initial)
+    seen = store.seen_ids(addr)
+    start = time.time()
+    interval = poll_interval
+
+    _log(f"Watching {addr} (timeout={timeout}s)...")
+
+    while not cancelled():
+        messages = _list_messages(p, state)
+        # Providers list newest first
+        new_msgs = [m for m in reversed(messages) if m["id"] not in seen]
+        for msg in new_msgs:
+            if "html" not in msg:
+                try:
+                    msg["html"] = _fetch_body(p, state, msg["id"])
+                except Exception:
+                    msg["html"] = ""
+            seen.add(msg["id"])
+            yield msg
+            store.mark_seen(addr, [msg["id"]])
+        interval = poll_interval if new_msgs else min(interval * 1.3, 15)
+        if timeout is not None:
+            left = timeout - (time.time() - start)
+            if left <= 0:
+                return
+            interval = min(interval, left)
+        if pause(interval):
+            return
+
+
+# --- asyncio API ---
+# asyncio is imported inside the functions that need it: it is the single
+# most expensive stdlib import and sync callers never touch it.
+
+
+@traced("create_email")
+async def create_email_async(
+    domain: str = "gmail", provider_name: str | None = None
+) -> dict[str, Any]:
+    """Async :func:`create_email`."""
+    chain = _Fallback(domain, provider_name)
+    for p in chain:
+        try:
+            state = await _tracked_create_async(p, domain)
+        except Exception as e:
+            chain.failed(p, e)
+        else:
+            save_state(chain.succeeded(p, state))
+            return state
+    raise chain.exhausted()
+
+
+async def _tracked_create_async(p: Provider, domain: str) -> dict[str, Any]:
+    start = time.monotonic()
+    try:
+        with span("provider_create", provider=p.name):
+            state = await p.create_async(domain)
+    except DeadlineExceeded:
+        raise
+    except Exception:
+        record_failure(p.name, time.monotonic() - start)
+        raise
+    record_success(p.name, time.monotonic() - start)
+    return state
+
+
+@traced("get_inbox")
+async def get_inbox_async(
+    state: dict[str, Any] | None = None,
+) -> tuple[list[dict[str, str]], dict[str, Any]]:
+    """Async :func:`get_inbox`; `state` defaults to the active mailbox."""
+    state = _require_state(state)
+    p = get_provider(state["provider"])
+    messages = await _list_messages_async(p, state)
+    for m in messages:
+        m.pop("html", None)
+    return messages, state
+
+
+async def _list_messages_async(
+    p: Provider, state: dict[str, Any]
+) -> list[dict[str, str]]:
+    if not p.bulk_bodies:
+        return await p.inbox_async(state)
+    messages = await p.inbox_with_bodies_async(state)
+    _cache_listed(p, state, messages)
+    return messages
+
+
+@traced("get_message_body")
+async def get_message_body_async(
+    msg_id: str, state: dict[str, Any] | None = None
+) -> str:
+    """Async :func:`get_message_body`."""
+    state = _require_state(state)
+    p = get_provider(state["provider"])
+    return await _fetch_body_async(p, state, msg_id)
+
+
+async def _fetch_body_async(p: Provider, state: dict[str, Any], msg_id: str) -> str:
+    cache = get_cache()
+    if cache is not None:
+        body = cache.get(p.name, state["email"], msg_id)
+        if body is not None:
+            return body
+    body = await p.message_async(state, msg_id)
+    if cache is not None and body:
+        cache.put(p.name, state["email"], msg_id, body)
+    return body
+
+
+@traced("wait_for_message")
+async def wait_for_message_async(
+    timeout: int = 120,
+    poll_interval: float | None = None,
+    state: dict[str, Any] | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+    sender: str | None = None,
+    extract: str | None = None,
+) -> dict[str, str] | None:
+    """
+    Async :func:`wait_for_message` for one mailbox.
+    `semaphore`, when given, bounds concurrent provider requests.
+    """
+    import asyncio
+
+    _check_extract(extract)
+    state = _require_state(state)
+    p = get_provider(state["provider"])
+    sem = semaphore or asyncio.Semaphore(1)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    async with sem:
+        initial_msgs = await p.inbox_async(state)
+    initial_ids = {m["id"] for m in initial_msgs}
+    delays = poll_schedule(p.name, sender, poll_interval)
+    last_poll = start
+
+    while loop.time() - start < timeout:
+        left = max(timeout - (loop.time() - start), 0)
+        await asyncio.sleep(min(next(delays), left))
+        async with sem:
+            messages = await _list_messages_async(p, state)
+        now = loop.time()
+        new_msgs = [m for m in messages if m["id"] not in initial_ids]
+        if new_msgs:
+            msg = new_msgs[0]
+            record_arrival(p.name, msg.get("from", ""), (last_poll + now) / 2 - start)
+            if "html" not in msg:
+                try:
+                    async with sem:
+                        msg["html"] = await _fetch_body_async(p, state, msg["id"])
+                except Exception:
+                    msg["html"] = ""
+            return _extract(msg, extract)
+        last_poll = now
+
+    return None
+
+
+async def wait_for_messages_async(
+    states: list[dict[str, Any]],
+    timeout: int = 120,
+    poll_interval: float | None = None,
+    concurrency: int = 50,
+) -> list[dict[str, str] | None]:
+    """
+    Wait on many mailboxes from one event loop.
+    At most `concurrency` provider requests are in flight at once.
+    Results are returned in the order of `states`; a mailbox whose wait
+    fails gets None (the error is logged) without affecting the others.
+    """
+    import asyncio
+
+    sem = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(
+        *(wait_for_message_async(timeout, poll_interval, st, sem) for st in states),
+        return_exceptions=True,
+    )
+    messages: list[dict[str, str] | None] = []
+    for st, result in zip(states, results):
+        if isinstance(result, Exception):
+            _log(f"FAIL: {st.get('email')}: {result}")
+            messages.append(None)
+        elif isinstance(result, BaseException):
+            raise result  # cancellation, KeyboardInterrupt: not per-mailbox
+        else:
+            messages.append(result)
+    return messages
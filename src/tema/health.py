@@ -0,0 +1,116 @@
+"""Provider health: success/latency tracking, circuit breakers, ordering."""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Any
+
+from tema.state import get_store
+
+__all__ = [
+    "BREAKER_COOLDOWN",
+    "BREAKER_THRESHOLD",
+    "admit",
+    "breaker_state",
+    "order_providers",
+    "provider_health",
+    "record_failure",
+    "record_success",
+]
+
+# Consecutive failures that open a provider's breaker
+BREAKER_THRESHOLD = int(os.environ.get("TEMA_BREAKER_THRESHOLD", "3"))
+# Seconds an open breaker waits before letting a probe through (half-open)
+BREAKER_COOLDOWN = float(os.environ.get("TEMA_BREAKER_COOLDOWN", "300"))
+# Weight of the newest outcome in the moving averages
+_ALPHA = 0.3
+# Seconds of average latency that cost as much as 100% failure rate
+_LATENCY_SCALE = 60.0
+
+
+def record_success(provider: str, latency: float) -> None:
+    """Record a successful call; closes the provider's breaker."""
+    get_store().record_outcome(provider, True, latency, _ALPHA, BREAKER_THRESHOLD)
+
+
+def record_failure(provider: str, latency: float) -> None:
+    """Record a failed call; may open the provider's breaker."""
+    get_store().record_outcome(provider, False, latency, _ALPHA, BREAKER_THRESHOLD)
+
+
+def breaker_state(h: dict[str, Any] | None, now: float | None = None) -> str:
+    """
+    'closed', 'open', or 'half-open' (cooldown over and no probe in flight;
+    the caller that claims the probe with :func:`admit` sends it).
+    """
+    if not h or h.get("opened_at") is None:
+        return "closed"
+    now = time.time() if now is None else now
+    if now - h["opened_at"] < BREAKER_COOLDOWN:
+        return "open"
+    probing_at = h.get("probing_at")
+    if probing_at is not None and now - probing_at < BREAKER_COOLDOWN:
+        return "open"
+    return "half-open"
+
+
+def _score(h: dict[str, Any] | None) -> float:
+    if not h:
+        return 1.0
+    return float(h["success_rate"]) - (h["latency"] or 0.0) / _LATENCY_SCALE
+
+
+def order_providers(names: list[str]) -> list[str]:
+    """
+    Fallback chain reordered by health. Providers with an open breaker are
+    dropped (unless every one is open). Half-open providers come first, so
+    their probe is actually sent rather than skipped whenever a fallback
+    succeeds; callers :func:`admit` each provider right before calling it.
+    The rest are sorted by recent success rate minus a latency penalty, in
+    coarse buckets so the static priority still decides between similarly
+    healthy providers.
+    """
+    health = get_store().health()
+    now = time.time()
+    probes, usable = [], []
+    for n in names:
+        state = breaker_state(health.get(n), now)
+        if state == "half-open":
+            probes.append(n)
+        elif state == "closed":
+            usable.append(n)
+    if not probes and not usable:
+        return list(names)
+    return probes + sorted(usable, key=lambda n: -round(_score(health.get(n)) * 10))
+
+
+def admit(name: str) -> bool:
+    """
+    Whether to call `name` now, right before doing so. Past its cooldown a
+    breaker admits one caller, the one that claims the probe; concurrent
+    callers are refused until the probe's outcome is recorded. Closed (and
+    still cooling, when the whole chain is open) providers are admitted.
+    """
+    store = get_store()
+    h = store.health().get(name)
+    now = time.time()
+    if not h or h.get("opened_at") is None or now - h["opened_at"] < BREAKER_COOLDOWN:
+        return True
+    return store.claim_probe(name, now, BREAKER_COOLDOWN)
+
+
+def provider_health() -> dict[str, dict[str, Any]]:
+    """Health summary per provider that has any recorded calls."""
+    now = time.time()
+    return {
+        name: {
+            "state": breaker_state(h, now),
+            "success_rate": round(h["success_rate"], 3),
+            "latency": round(h["latency"], 2) if h["latency"] is not None else None,
+            "successes": h["successes"],
+            "failures": h["failures"],
+            "consecutive_failures": h["consecutive_failures"],
+        }
+        for name, h in get_store().health().items()
+    }
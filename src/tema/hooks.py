@@ -0,0 +1,260 @@
+"""Instrumentation hooks: timings for provider HTTP calls and core operations."""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import inspect
+import threading
+import time
+import urllib.parse
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Callable, TypeVar
+
+__all__ = [
+    "Profile",
+    "add_hook",
+    "remove_hook",
+    "request",
+    "request_async",
+    "span",
+    "traced",
+]
+
+Event = dict[str, Any]
+Hook = Callable[[Event], None]
+F = TypeVar("F", bound=Callable[..., Any])
+
+_hooks: list[Hook] = []
+_lock = threading.Lock()
+# Innermost running operation, so HTTP events know what they belong to
+_current_op: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "tema_op", default=None
+)
+
+
+def add_hook(hook: Hook) -> Hook:
+    """
+    Call `hook(event)` for every provider HTTP request ("http" events) and
+    every traced core operation ("op" events). Hooks run inline on the
+    calling thread and must not raise; returns `hook` for later removal.
+    """
+    with _lock:
+        _hooks.append(hook)
+    return hook
+
+
+def remove_hook(hook: Hook) -> None:
+    with _lock:
+        if hook in _hooks:
+            _hooks.remove(hook)
+
+
+def _emit(event: Event) -> None:
+    for hook in list(_hooks):
+        try:
+            hook(event)
+        except Exception:  # a broken tracer must not break mail
+            pass
+
+
+@contextmanager
+def span(name: str, **fields: Any) -> Iterator[None]:
+    """Time a block as an "op" event; free when no hook is registered."""
+    if not _hooks:
+        yield
+        return
+    parent = _current_op.get()
+    token = _current_op.set(name)
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_op.reset(token)
+        _emit(
+            {
+                "type": "op",
+                "name": name,
+                "parent": parent,
+                "elapsed": time.perf_counter() - start,
+                "error": error,
+                **fields,
+            }
+        )
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator: run a function (sync or async) inside :func:`span`."""
+
+    def decorate(fn: F) -> F:
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def run_async(*args: Any, **kwargs: Any) -> Any:
+                with span(name):
+                    return await fn(*args, **kwargs)
+
+            return run_async  # type: ignore[return-value]
+
+        @functools.wraps(fn)
+        def run(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return run  # type: ignore[return-value]
+
+    return decorate
+
+
+def _http_event(
+    provider: str,
+    method: str,
+    url: str,
+    start: float,
+    response: Any,
+    error: BaseException | None,
+    attempt: int,
+) -> Event:
+    size = None
+    if response is not None:
+        length = response.headers.get("Content-Length")
+        if length is not None:
+            size = int(length)
+        else:
+            # requests keeps a read body in _content (False while streaming;
+            # its .content property would download the stream first),
+            # curl_cffi in a plain content attribute (empty while streaming)
+            body = getattr(response, "_content", None)
+            if body is None:
+                body = getattr(response, "__dict__", {}).get("content") or None
+            size = len(body) if isinstance(body, bytes) else None
+    return {
+        "type": "http",
+        "provider": provider,
+        "op": _current_op.get(),
+        "method": method,
+        "phase": urllib.parse.urlsplit(url).path or "/",
+        "url": url,
+        "status": getattr(response, "status_code", None),
+        "bytes": size,
+        "elapsed": time.perf_counter() - start,
+        "attempt": attempt,
+        "error": None if error is None else f"{type(error).__name__}: {error}",
+    }
+
+
+def request(
+    provider: str, session: Any, method: str, url: str, attempt: int = 1, **kw: Any
+) -> Any:
+    """`session.request(...)`, reported to the hooks as an "http" event."""
+    if not _hooks:
+        return session.request(method, url, **kw)
+    start = time.perf_counter()
+    response = error = None
+    try:
+        response = session.request(method, url, **kw)
+        return response
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _emit(_http_event(provider, method, url, start, response, error, attempt))
+
+
+async def request_async(
+    provider: str, session: Any, method: str, url: str, attempt: int = 1, **kw: Any
+) -> Any:
+    """Async :func:`request` for curl_cffi AsyncSession."""
+    if not _hooks:
+        return await session.request(method, url, **kw)
+    start = time.perf_counter()
+    response = error = None
+    try:
+        response = await session.request(method, url, **kw)
+        return response
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _emit(_http_event(provider, method, url, start, response, error, attempt))
+
+
+class Profile:
+    """
+    Hook that collects events and summarizes them per operation and per
+    provider endpoint ("phase"). Use as a context manager::
+
+        with Profile() as prof:
+            create_email(domain="gmail")
+        print(prof.summary())
+    """
+
+    def __init__(self) -> None:
+        self.events: list[Event] = []
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def __call__(self, event: Event) -> None:
+        with self._lock:
+            self.events.append(event)
+
+    def __enter__(self) -> Profile:
+        self._start = time.perf_counter()
+        add_hook(self)
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        remove_hook(self)
+
+    def summary(self) -> dict[str, Any]:
+        """JSON-ready breakdown: ops, HTTP calls, and totals per phase."""
+        with self._lock:
+            events = list(self.events)
+        phases: dict[str, dict[str, Any]] = {}
+        for e in events:
+            if e["type"] != "http":
+                continue
+            key = f"{e['provider']} {e['method']} {e['phase']}"
+            p = phases.setdefault(
+                key, {"count": 0, "ms": 0.0, "bytes": 0, "errors": 0, "retries": 0}
+            )
+            p["count"] += 1
+            p["ms"] += e["elapsed"] * 1000
+            p["bytes"] += e["bytes"] or 0
+            bad = e["error"] or (e["status"] or 0) >= 400
+            p["errors"] += 1 if bad else 0
+            p["retries"] += 1 if e["attempt"] > 1 else 0
+        for p in phases.values():
+            p["ms"] = round(p["ms"], 1)
+        return {
+            "total_ms": round((time.perf_counter() - self._start) * 1000, 1),
+            "ops": [
+                {
+                    **{k: v for k, v in e.items() if k not in ("type", "elapsed")},
+                    "ms": round(e["elapsed"] * 1000, 1),
+                }
+                for e in events
+                if e["type"] == "op"
+            ],
+            "http": [
+                {
+                    "provider": e["provider"],
+                    "op": e["op"],
+                    "method": e["method"],
+                    "phase": e["phase"],
+                    "status": e["status"],
+                    "bytes": e["bytes"],
+                    "ms": round(e["elapsed"] * 1000, 1),
+                    "attempt": e["attempt"],
+                    "error": e["error"],
+                }
+                for e in events
+                if e["type"] == "http"
+            ],
+            "phases": dict(sorted(phases.items(), key=lambda kv: -kv[1]["ms"])),
+        }
@@ -0,0 +1,257 @@
+"""Deadlines, cancellation, timeouts, retries and rate limits for provider calls."""
+
+from __future__ import annotations
+
+import contextvars
+import random
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from tema import hooks
+from tema.ratelimit import get_limiter
+
+__all__ = [
+    "DeadlineExceeded",
+    "Policy",
+    "apply_policy",
+    "cancel_on",
+    "cancelled",
+    "pause",
+    "remaining",
+    "send",
+    "send_async",
+]
+
+
+class DeadlineExceeded(RuntimeError):
+    """The operation's overall time budget ran out."""
+
+
+class Policy:
+    """
+    Time budget and retry rules for everything a core call sends.
+
+    `deadline` is the overall budget in seconds (None: unbounded). Each
+    HTTP call gets `timeout` seconds to read, or the provider's own
+    default, and `connect_timeout` to connect, never more than what is
+    left of the deadline. Calls failing with one of `retry_on` or
+    answering one of `retry_statuses` are retried up to `retries` times
+    with full-jitter exponential backoff (`backoff` * 2^n, at most
+    `max_backoff`), as long as the deadline allows.
+    """
+
+    def __init__(
+        self,
+        deadline: float | None = None,
+        timeout: float | None = None,
+        connect_timeout: float | None = None,
+        retries: int = 0,
+        backoff: float = 0.5,
+        max_backoff: float = 5.0,
+        retry_on: tuple[type[BaseException], ...] = (OSError,),
+        retry_statuses: tuple[int, ...] = (429, 500, 502, 503, 504),
+    ) -> None:
+        self.deadline = deadline
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_on = retry_on
+        self.retry_statuses = retry_statuses
+
+    def delay(self, attempt: int) -> float:
+        """Backoff before retry number `attempt` (1-based)."""
+        return random.uniform(
+            0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        )
+
+
+# Active policy and its absolute deadline (time.monotonic()), if any
+_active: contextvars.ContextVar[tuple[Policy, float | None] | None] = (
+    contextvars.ContextVar("tema_policy", default=None)
+)
+
+
+@contextmanager
+def apply_policy(policy: Policy | None) -> Iterator[None]:
+    """
+    Make `policy` govern provider calls in this block (and threads started
+    from a copy of its context). A nested policy can only shorten an
+    enclosing deadline; None keeps whatever is active.
+    """
+    if policy is None:
+        yield
+        return
+    outer = _active.get()
+    deadline = None
+    if policy.deadline is not None:
+        deadline = time.monotonic() + policy.deadline
+    if outer is not None and outer[1] is not None:
+        deadline = outer[1] if deadline is None else min(deadline, outer[1])
+    token = _active.set((policy, deadline))
+    try:
+        yield
+    finally:
+        _active.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left of the active deadline, or None when unbounded."""
+    active = _active.get()
+    if active is None or active[1] is None:
+        return None
+    return active[1] - time.monotonic()
+
+
+# Set when whoever asked for the running operation has gone away
+_cancel: contextvars.ContextVar[threading.Event | None] = contextvars.ContextVar(
+    "tema_cancel", default=None
+)
+
+
+@contextmanager
+def cancel_on(event: threading.Event) -> Iterator[None]:
+    """
+    Let polling loops in this block (:func:`tema.core.watch`, waits) stop
+    early once `event` is set, e.g. when a daemon client disconnects.
+    """
+    token = _cancel.set(event)
+    try:
+        yield
+    finally:
+        _cancel.reset(token)
+
+
+def cancelled() -> bool:
+    """Whether the active cancel event (see :func:`cancel_on`) is set."""
+    event = _cancel.get()
+    return event is not None and event.is_set()
+
+
+def pause(seconds: float) -> bool:
+    """Sleep `seconds`, waking early on cancellation; True if cancelled."""
+    event = _cancel.get()
+    if event is None:
+        time.sleep(seconds)
+        return False
+    return event.wait(seconds)
+
+
+def _timeout(policy: Policy, deadline: float | None, default: Any) -> Any:
+    read = policy.timeout if policy.timeout is not None else default
+    connect = policy.connect_timeout
+    if deadline is not None:
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise DeadlineExceeded("deadline exceeded")
+        read = left if read is None else min(read, left)
+        connect = None if connect is None else min(connect, left)
+    return read if connect is None else (connect, read)
+
+
+def _pause(policy: Policy, deadline: float | None, attempt: int) -> float | None:
+    """Backoff before another attempt, or None if retries or budget ran out."""
+    if attempt > policy.retries:
+        return None
+    pause = policy.delay(attempt)
+    if deadline is not None and time.monotonic() + pause >= deadline:
+        return None
+    return pause
+
+
+def _expired(deadline: float | None) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def _throttle(provider: str, deadline: float | None) -> float:
+    """Seconds to wait for `provider`'s rate limit, within the deadline."""
+    max_wait = None if deadline is None else deadline - time.monotonic()
+    wait = get_limiter().reserve(provider, max_wait)
+    if wait == float("inf"):
+        raise DeadlineExceeded(f"{provider}: rate limit wait exceeds deadline")
+    return wait
+
+
+def send(provider: str, session: Any, method: str, url: str, **kw: Any) -> Any:
+    """
+    :func:`tema.hooks.request` under the active policy, after waiting for
+    the provider's rate limit (see :mod:`tema.ratelimit`).
+    """
+    active = _active.get()
+    if active is None:
+        wait = _throttle(provider, None)
+        if wait:
+            time.sleep(wait)
+        return hooks.request(provider, session, method, url, **kw)
+    policy, deadline = active
+    default = kw.pop("timeout", None)
+    attempt = 1
+    while True:
+        wait = _throttle(provider, deadline)
+        if wait:
+            time.sleep(wait)
+        timeout = _timeout(policy, deadline, default)
+        try:
+            r = hooks.request(
+                provider, session, method, url, attempt, timeout=timeout, **kw
+            )
+        except policy.retry_on as e:
+            if _expired(deadline):
+                raise DeadlineExceeded(f"deadline exceeded: {e}") from e
+            pause = _pause(policy, deadline, attempt)
+            if pause is None:
+                raise
+        else:
+            pause = None
+            if r.status_code in policy.retry_statuses:
+                pause = _pause(policy, deadline, attempt)
+            if pause is None:
+                return r
+            r.close()
+        time.sleep(pause)
+        attempt += 1
+
+
+async def send_async(
+    provider: str, session: Any, method: str, url: str, **kw: Any
+) -> Any:
+    """Async :func:`send` (backoff sleeps without blocking the loop)."""
+    import asyncio
+
+    active = _active.get()
+    if active is None:
+        wait = _throttle(provider, None)
+        if wait:
+            await asyncio.sleep(wait)
+        return await hooks.request_async(provider, session, method, url, **kw)
+    policy, deadline = active
+    default = kw.pop("timeout", None)
+    attempt = 1
+    while True:
+        wait = _throttle(provider, deadline)
+        if wait:
+            await asyncio.sleep(wait)
+        timeout = _timeout(policy, deadline, default)
+        try:
+            r = await hooks.request_async(
+                provider, session, method, url, attempt, timeout=timeout, **kw
+            )
+        except policy.retry_on as e:
+            if _expired(deadline):
+                raise DeadlineExceeded(f"deadline exceeded: {e}") from e
+            pause = _pause(policy, deadline, attempt)
+            if pause is None:
+                raise
+        else:
+            pause = None
+            if r.status_code in policy.retry_statuses:
+                pause = _pause(policy, deadline, attempt)
+            if pause is None:
+                return r
+            r.close()
+        await asyncio.sleep(pause)
+        attempt += 1
@@ -0,0 +1,237 @@
+"""Multiplexed poller: one scheduler for waiting on many mailboxes."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from tema.core import _fetch_body, _list_messages
+from tema.providers import get_provider
+from tema.schedule import poll_schedule, record_arrival
+from tema.utils import _log
+
+__all__ = ["Poller", "wait_for_messages"]
+
+Predicate = Callable[[dict[str, str]], bool]
+
+
+class _Watch:
+    __slots__ = (
+        "state",
+        "deadline",
+        "predicate",
+        "future",
+        "seen",
+        "delays",
+        "started",
+        "last_poll",
+    )
+
+    def __init__(
+        self,
+        state: dict[str, Any],
+        timeout: float,
+        predicate: Predicate | None,
+        seen: set[str] | None,
+        delays: Iterator[float],
+    ) -> None:
+        self.state = state
+        self.started = self.last_poll = time.monotonic()
+        self.deadline = self.started + timeout
+        self.predicate = predicate
+        self.future: Future[dict[str, str] | None] = Future()
+        self.seen = seen
+        self.delays = delays
+
+
+class Poller:
+    """
+    Waits on many mailboxes from one scheduler thread.
+    Registrations sit on a timer heap ordered by next due poll; due polls
+    run on a small worker pool, never more than `max_per_provider`
+    concurrently against one provider (due polls for a saturated provider
+    are parked until one of its polls finishes). Each registration resolves its
+    future with the first new message matching its predicate (body in
+    "html"), or None at its deadline.
+    """
+
+    def __init__(
+        self,
+        max_per_provider: int | dict[str, int] = 4,
+        workers: int = 16,
+        poll_interval: float | None = None,
+    ) -> None:
+        self.max_per_provider = max_per_provider
+        self.poll_interval = poll_interval
+        self._heap: list[tuple[float, int, _Watch]] = []
+        self._seq = itertools.count()
+        self._active: dict[str, int] = {}
+        self._parked: dict[str, list[tuple[float, int, _Watch]]] = {}
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="tema-poll")
+        self._thread: threading.Thread | None = None
+        self._stopped = False
+
+    def __enter__(self) -> Poller:
+        self.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="tema-poller", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self) -> None:
+        """Stop scheduling; pending registrations resolve to None."""
+        with self._cond:
+            self._stopped = True
+            pending = [w for _, _, w in self._heap]
+            pending += [w for parked in self._parked.values() for _, _, w in parked]
+            self._heap.clear()
+            self._parked.clear()
+            self._cond.notify_all()
+        for w in pending:
+            _resolve(w, None)
+        self._executor.shutdown(wait=False)
+
+    def register(
+        self,
+        state: dict[str, Any],
+        timeout: float = 120,
+        predicate: Predicate | None = None,
+        callback: Callable[[dict[str, str] | None], None] | None = None,
+        seen_ids: set[str] | None = None,
+        sender: str | None = None,
+    ) -> Future[dict[str, str] | None]:
+        """
+        Wait for a new message in `state`'s mailbox.
+        Messages in `seen_ids` (default: whatever the first poll finds)
+        are ignored. Poll timing follows :func:`tema.schedule.poll_schedule`
+        for the provider and `sender` hint. `callback`, if given, is
+        called with the result.
+        """
+        w = _Watch(
+            state,
+            timeout,
+            predicate,
+            set(seen_ids) if seen_ids is not None else None,
+            poll_schedule(state["provider"], sender, self.poll_interval),
+        )
+        if callback is not None:
+            w.future.add_done_callback(
+                lambda f: None if f.cancelled() else callback(f.result())
+            )
+        # First poll right away when it has to take the baseline snapshot
+        self._schedule(w, 0 if seen_ids is None else next(w.delays))
+        self.start()
+        return w.future
+
+    def _cap(self, provider: str) -> int:
+        if isinstance(self.max_per_provider, dict):
+            return self.max_per_provider.get(provider, 4)
+        return self.max_per_provider
+
+    def _schedule(self, w: _Watch, delay: float) -> None:
+        due = min(time.monotonic() + delay, w.deadline)
+        with self._cond:
+            if self._stopped:
+                _resolve(w, None)
+                return
+            heapq.heappush(self._heap, (due, next(self._seq), w))
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    now = time.monotonic()
+                    if self._heap and self._heap[0][0] <= now:
+                        break
+                    wait = self._heap[0][0] - now if self._heap else None
+                    self._cond.wait(wait)
+                if self._stopped:
+                    return
+                entry = heapq.heappop(self._heap)
+                w = entry[2]
+                if w.future.cancelled():
+                    continue
+                pname = w.state["provider"]
+                if self._active.get(pname, 0) >= self._cap(pname):
+                    # Provider saturated: park until one of its polls finishes
+                    self._parked.setdefault(pname, []).append(entry)
+                    continue
+                self._active[pname] = self._active.get(pname, 0) + 1
+                # Under the lock, so stop() cannot shut the executor down first
+                self._executor.submit(self._poll, w)
+
+    def _poll(self, w: _Watch) -> None:
+        pname = w.state["provider"]
+        try:
+            p = get_provider(pname)
+            messages = _list_messages(p, w.state)
+            now = time.monotonic()
+            if w.seen is None:
+                w.seen = {m["id"] for m in messages}
+            else:
+                for m in reversed(messages):
+                    if m["id"] in w.seen:
+                        continue
+                    w.seen.add(m["id"])
+                    record_arrival(
+                        pname, m.get("from", ""), (w.last_poll + now) / 2 - w.started
+                    )
+                    if w.predicate is not None and not w.predicate(m):
+                        continue
+                    if "html" not in m:
+                        try:
+                            m["html"] = _fetch_body(p, w.state, m["id"])
+                        except Exception:
+                            m["html"] = ""
+                    _resolve(w, m)
+                    return
+        except Exception as e:
+            _log(f"Poll failed for {w.state.get('email', '?')}: {e}")
+        else:
+            w.last_poll = now
+        finally:
+            with self._cond:
+                self._active[pname] -= 1
+                for entry in self._parked.pop(pname, []):
+                    heapq.heappush(self._heap, entry)
+                self._cond.notify()
+        if time.monotonic() >= w.deadline:
+            _resolve(w, None)
+            return
+        self._schedule(w, next(w.delays))
+
+
+def _resolve(w: _Watch, result: dict[str, str] | None) -> None:
+    if not w.future.done():
+        try:
+            w.future.set_result(result)
+        except Exception:  # cancelled concurrently
+            pass
+
+
+def wait_for_messages(
+    states: list[dict[str, Any]],
+    timeout: float = 120,
+    predicate: Predicate | None = None,
+    max_per_provider: int = 4,
+    poll_interval: float | None = None,
+) -> list[dict[str, str] | None]:
+    """Wait on many mailboxes with one poller; results follow `states` order."""
+    with Poller(max_per_provider=max_per_provider, poll_interval=poll_interval) as p:
+        futures = [p.register(st, timeout, predicate) for st in states]
+        return [f.result() for f in futures]
@@ -0,0 +1,108 @@
+"""Pre-warmed mailbox pool: create ahead of time, hand out instantly."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any
+
+from tema.core import _harvest
+from tema.state import get_store
+from tema.utils import _log
+
+__all__ = [
+    "POOL_MAX_AGE",
+    "fill_pool",
+    "take_from_pool",
+    "pool_stats",
+    "prune_pool",
+]
+
+POOL_MAX_AGE = int(os.environ.get("TEMA_POOL_MAX_AGE", "3600"))
+# Seconds an exclusive fill blocks others, should it die without releasing
+_FILL_LEASE = 600.0
+
+
+def fill_pool(
+    domain: str = "gmail",
+    count: int = 10,
+    provider_name: str | None = None,
+    exclusive: bool = False,
+) -> int:
+    """
+    Create `count` mailboxes and add them to the pool. Returns number added.
+    Providers that return several addresses per call fill it in batches.
+    With `exclusive`, nothing is done while another exclusive fill of
+    `domain` runs (in any process), so refills triggered by back-to-back
+    takes don't overlap and overshoot their target.
+    """
+    store = get_store()
+    if exclusive and not store.pool_claim_fill(domain, time.time(), _FILL_LEASE):
+        _log(f"Pool fill: '{domain}' is already being filled")
+        return 0
+    added = 0
+    try:
+        for _ in _harvest(count, domain, provider_name, 1, 1, store.pool_add):
+            added += 1
+    finally:
+        if exclusive:
+            store.pool_release_fill(domain)
+    if added < count:
+        _log(f"Pool fill: {count - added}/{count} failed")
+    return added
+
+
+def take_from_pool(
+    domain: str = "gmail",
+    max_age: int | None = None,
+    refill_below: int | None = None,
+    refill_to: int | None = None,
+) -> dict[str, Any] | None:
+    """
+    Pop the oldest fresh mailbox for `domain` and make it the active one.
+    Stale entries are dropped on the way. When fewer than `refill_below`
+    remain, a background thread tops the pool back up to `refill_to`
+    (unless a refill is already running).
+    Returns None if the pool has nothing for `domain`.
+    """
+    max_age = POOL_MAX_AGE if max_age is None else max_age
+    state = get_store().pool_take(domain, int(time.time()) - max_age)
+    if refill_below is not None:
+        left = pool_stats(max_age)["domains"].get(domain, {}).get("ready", 0)
+        if left < refill_below:
+            missing = (refill_to or refill_below) - left
+            threading.Thread(
+                target=fill_pool,
+                args=(domain, missing),
+                kwargs={"exclusive": True},
+                daemon=True,
+            ).start()
+    return state
+
+
+def prune_pool(max_age: int | None = None) -> int:
+    """Drop mailboxes older than `max_age` seconds. Returns number removed."""
+    max_age = POOL_MAX_AGE if max_age is None else max_age
+    return get_store().pool_prune(int(time.time()) - max_age)
+
+
+def pool_stats(max_age: int | None = None) -> dict[str, Any]:
+    """Per-domain counts of fresh and stale pooled mailboxes."""
+    max_age = POOL_MAX_AGE if max_age is None else max_age
+    now = time.time()
+    entries = get_store().pool_entries()
+    domains: dict[str, dict[str, Any]] = {}
+    for m in entries:
+        d = domains.setdefault(
+            m.get("domain", ""),
+            {"ready": 0, "expired": 0, "providers": {}, "oldest_age": 0},
+        )
+        if now - m.get("created_at", 0) > max_age:
+            d["expired"] += 1
+            continue
+        d["ready"] += 1
+        pname = m.get("provider", "")
+        d["providers"][pname] = d["providers"].get(pname, 0) + 1
+        d["oldest_age"] = max(d["oldest_age"], int(now - m.get("created_at", now)))
+    return {"total": len(entries), "max_age": max_age, "domains": domains}
@@ -2,14 +2,11 @@
 
 from __future__ import annotations
 
+import importlib
+import threading
+from collections.abc import Iterator, MutableMapping
+
 from tema.providers.base import Provider
-from tema.providers.burner import BurnerMailboxProvider
-from tema.providers.emailmux import EmailMuxProvider
-from tema.providers.emailnator import EmailnatorProvider
-from tema.providers.etempmail import EtempMailProvider
-from tema.providers.privatix import PrivatixProvider
-from tema.providers.smailpro import SmailProProvider
-from tema.providers.tempmaili import TempMailiProvider
 
 __all__ = ["Provider", "PROVIDERS", "DOMAIN_PROVIDERS", "get_provider"]
 
@@ -24,15 +21,60 @@ DOMAIN_PROVIDERS: dict[str, list[str]] = {
     "temp": ["privatix", "burner"],
 }
 
-PROVIDERS: dict[str, Provider] = {
-    "emailmux": EmailMuxProvider(),
-    "emailnator": EmailnatorProvider(),
-    "smailpro": SmailProProvider(),
-    "privatix": PrivatixProvider(),
-    "burner": BurnerMailboxProvider(),
-    "tempmaili": TempMailiProvider(),
-    "etempmail": EtempMailProvider(),
-}
+
+class _LazyProviders(MutableMapping[str, Provider]):
+    """
+    Name -> provider instance, importing each provider module (and with it
+    requests / curl_cffi) only on first lookup.
+    """
+
+    def __init__(self, specs: dict[str, str]) -> None:
+        self._specs: dict[str, str | None] = dict(specs)
+        self._loaded: dict[str, Provider] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> Provider:
+        p = self._loaded.get(name)
+        if p is not None:
+            return p
+        spec = self._specs[name]
+        if spec is None:
+            raise KeyError(name)
+        with self._lock:
+            if name not in self._loaded:
+                module, _, cls = spec.partition(":")
+                self._loaded[name] = getattr(importlib.import_module(module), cls)()
+            return self._loaded[name]
+
+    def __setitem__(self, name: str, provider: Provider) -> None:
+        self._specs.setdefault(name, None)
+        self._loaded[name] = provider
+
+    def __delitem__(self, name: str) -> None:
+        del self._specs[name]
+        self._loaded.pop(name, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._specs)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self._specs)})"
+
+
+PROVIDERS: MutableMapping[str, Provider] = _LazyProviders(
+    {
+        "emailmux": "tema.providers.emailmux:EmailMuxProvider",
+        "emailnator": "tema.providers.emailnator:EmailnatorProvider",
+        "smailpro": "tema.providers.smailpro:SmailProProvider",
+        "privatix": "tema.providers.privatix:PrivatixProvider",
+        "burner": "tema.providers.burner:BurnerMailboxProvider",
+        "tempmaili": "tema.providers.tempmaili:TempMailiProvider",
+        "etempmail": "tema.providers.etempmail:EtempMailProvider",
+    }
+)
 
 
 def get_provider(name: str) -> Provider:
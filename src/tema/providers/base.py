@@ -2,11 +2,26 @@
 
 from __future__ import annotations
 
+import codecs
 from abc import ABC, abstractmethod
-from typing import Any
+from collections.abc import Iterator
+from contextlib import AbstractContextManager
+from typing import Any, Callable, TypeVar
+
+from tema import policy
+from tema.clearance import (
+    drop_clearance,
+    load_clearance,
+    restore_clearance,
+    save_clearance,
+)
+from tema.sessions import SESSION_POOL
+from tema.utils import _cf_session, _log
 
 __all__ = ["Provider"]
 
+T = TypeVar("T")
+
 
 class Provider(ABC):
     """Base class for all email providers."""
@@ -14,11 +29,32 @@ class Provider(ABC):
     name: str
     domains: list[str]
     requires_curl_cffi: bool = False
+    # True when the inbox listing already carries full bodies
+    bulk_bodies: bool = False
+    # Most mailboxes one create_many() call can return
+    batch_size: int = 1
+    # Cookies a cached homepage clearance must carry to be reused
+    clearance_cookies: tuple[str, ...] = ()
 
     @abstractmethod
     def create(self, domain: str) -> dict[str, Any]:
         """Create email. Returns {email, provider, domain, cookies, metadata}."""
 
+    def create_many(self, domain: str, count: int) -> list[dict[str, Any]]:
+        """
+        Create up to `count` mailboxes (at least one) in as few round trips
+        as the provider allows. Default is a single :meth:`create`;
+        providers that return several addresses per call set `batch_size`.
+        """
+        return [self.create(domain)]
+
+    def prefetch(self) -> None:
+        """
+        Keep work for later creates (e.g. minting tokens) going in the
+        background. Long-lived callers opt in, so a one-shot create never
+        pays for requests nobody uses. Default does nothing.
+        """
+
     @abstractmethod
     def inbox(self, state: dict[str, Any]) -> list[dict[str, str]]:
         """Get messages. Returns [{id, from, subject, date}]."""
@@ -26,3 +62,115 @@ class Provider(ABC):
     @abstractmethod
     def message(self, state: dict[str, Any], msg_id: str) -> str:
         """Get full message HTML body."""
+
+    def message_stream(
+        self, state: dict[str, Any], msg_id: str, chunk_size: int = 16384
+    ) -> Iterator[str]:
+        """
+        Message HTML body in chunks. Default slices :meth:`message`;
+        providers that serve raw HTML override it to stream from the wire,
+        so consumers can stop reading early.
+        """
+        body = self.message(state, msg_id)
+        for i in range(0, len(body), chunk_size):
+            yield body[i : i + chunk_size]
+
+    def inbox_with_bodies(self, state: dict[str, Any]) -> list[dict[str, str]]:
+        """
+        Get messages with bodies. Returns [{id, from, subject, date, html}].
+        Default fetches each body separately; providers with `bulk_bodies`
+        override this with a single listing call.
+        """
+        messages = self.inbox(state)
+        for m in messages:
+            m["html"] = self.message(state, m["id"])
+        return messages
+
+    # Async API. Defaults run the sync methods in a worker thread; providers
+    # with an async HTTP client override them with native coroutines.
+    # (asyncio is imported lazily: it dominates import time for sync users.)
+
+    async def create_async(self, domain: str) -> dict[str, Any]:
+        """Async :meth:`create`."""
+        import asyncio
+
+        return await asyncio.to_thread(self.create, domain)
+
+    async def inbox_async(self, state: dict[str, Any]) -> list[dict[str, str]]:
+        """Async :meth:`inbox`."""
+        import asyncio
+
+        return await asyncio.to_thread(self.inbox, state)
+
+    async def message_async(self, state: dict[str, Any], msg_id: str) -> str:
+        """Async :meth:`message`."""
+        import asyncio
+
+        return await asyncio.to_thread(self.message, state, msg_id)
+
+    async def inbox_with_bodies_async(
+        self, state: dict[str, Any]
+    ) -> list[dict[str, str]]:
+        """Async :meth:`inbox_with_bodies`."""
+        import asyncio
+
+        return await asyncio.to_thread(self.inbox_with_bodies, state)
+
+    @abstractmethod
+    def _restore(self, state: dict[str, Any]) -> Any:
+        """Build a fresh HTTP session for a mailbox."""
+
+    def _pooled(self, state: dict[str, Any]) -> AbstractContextManager[Any]:
+        """Lease the pooled session for a mailbox, restoring it on first use."""
+        key = (self.name, state.get("email", ""))
+        return SESSION_POOL.lease(key, lambda: self._restore(state))
+
+    def _keep(self, state: dict[str, Any], session: Any) -> None:
+        """Seed the pool with the session that created a mailbox."""
+        SESSION_POOL.put((self.name, state["email"]), session)
+
+    def _cleared(self, load: Callable[[], Any], create: Callable[[Any], T]) -> T:
+        """
+        Run `create(session)` with the provider's Cloudflare/XSRF cookies.
+        Cached cookies (see :mod:`tema.clearance`) skip the homepage load;
+        otherwise, or when the site rejects them, `load()` fetches the
+        homepage into a fresh session and its cookies are cached.
+        """
+        cookies = load_clearance(self.name, self.clearance_cookies)
+        if cookies is not None:
+            s = _cf_session()
+            restore_clearance(s, cookies)
+            try:
+                return create(s)
+            except (RuntimeError, ValueError) as e:
+                _log(f"{self.name}: cached clearance rejected ({e}), reloading")
+                drop_clearance(self.name)
+        s = load()
+        save_clearance(self.name, s)
+        return create(s)
+
+    def _request(self, s: Any, method: str, url: str, **kwargs: Any) -> Any:
+        """Send one HTTP request through `s`; every provider call goes here."""
+        return policy.send(self.name, s, method, url, **kwargs)
+
+    async def _request_async(self, s: Any, method: str, url: str, **kwargs: Any) -> Any:
+        """Async :meth:`_request` for curl_cffi AsyncSession."""
+        return await policy.send_async(self.name, s, method, url, **kwargs)
+
+    def _stream_text(self, r: Any, chunk_size: int) -> Iterator[str]:
+        """Decode a streamed response (requests or curl_cffi) chunk by chunk."""
+        try:
+            if r.status_code != 200:
+                raise RuntimeError(
+                    f"{self.name}: message fetch failed ({r.status_code})"
+                )
+            decoder = codecs.getincrementaldecoder(r.encoding or "utf-8")("replace")
+            for chunk in r.iter_content(chunk_size):
+                text = decoder.decode(chunk)
+                if text:
+                    yield text
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+        finally:
+            r.close()
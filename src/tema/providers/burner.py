@@ -17,27 +17,41 @@ class BurnerMailboxProvider(Provider):
 
     name = "burner"
     domains = ["temp"]
+    bulk_bodies = True
     BASE = "https://burnermailbox.com/api"
     _KEY = "he4PQF6bnGHvYu7Jx3cU"
 
     def create(self, domain: str) -> dict[str, Any]:
-        r = requests.get(f"{self.BASE}/email/kihasl.com/{self._KEY}", timeout=15)
+        s = requests.Session()
+        r = self._request(
+            s, "GET", f"{self.BASE}/email/kihasl.com/{self._KEY}", timeout=15
+        )
         if r.status_code != 200:
             raise RuntimeError(f"Burner: create failed ({r.status_code})")
         email = r.text.strip()
         if not email or "@" not in email:
             raise RuntimeError(f"Burner: invalid email: {email!r}")
-        return {
+        state = {
             "email": email,
             "provider": self.name,
             "domain": domain,
             "cookies": {},
             "metadata": {},
         }
+        self._keep(state, s)
+        return state
+
+    def _restore(self, state: dict[str, Any]) -> requests.Session:
+        return requests.Session()
 
     def inbox(self, state: dict[str, Any]) -> list[dict[str, str]]:
-        email = state["email"]
-        r = requests.get(f"{self.BASE}/messages/{email}/{self._KEY}", timeout=15)
+        messages = self.inbox_with_bodies(state)
+        for m in messages:
+            del m["html"]
+        return messages
+
+    def inbox_with_bodies(self, state: dict[str, Any]) -> list[dict[str, str]]:
+        r = self._listing(state)
         if r.status_code != 200:
             return []
         try:
@@ -52,13 +66,13 @@ class BurnerMailboxProvider(Provider):
                 "from": m.get("sender_email", m.get("sender_name", "")),
                 "subject": m.get("subject", ""),
                 "date": m.get("datediff", m.get("date", "")),
+                "html": str(m.get("content", "")),
             }
             for m in data
         ]
 
     def message(self, state: dict[str, Any], msg_id: str) -> str:
-        email = state["email"]
-        r = requests.get(f"{self.BASE}/messages/{email}/{self._KEY}", timeout=15)
+        r = self._listing(state)
         if r.status_code != 200:
             raise RuntimeError(f"Burner: message fetch failed ({r.status_code})")
         data = r.json()
@@ -66,3 +80,11 @@ class BurnerMailboxProvider(Provider):
             if str(m.get("id", "")) == msg_id:
                 return str(m.get("content", ""))
         raise RuntimeError(f"Burner: message {msg_id!r} not found")
+
+    def _listing(self, state: dict[str, Any]) -> requests.Response:
+        # The listing carries every message's full content
+        email = state["email"]
+        with self._pooled(state) as s:
+            return self._request(
+                s, "GET", f"{self.BASE}/messages/{email}/{self._KEY}", timeout=15
+            )
@@ -7,7 +7,7 @@ import time
 from typing import Any
 
 from tema.providers.base import Provider
-from tema.utils import _cf_session
+from tema.utils import _cf_async_session, _cf_session
 
 
 class EmailMuxProvider(Provider):
@@ -34,15 +34,21 @@ class EmailMuxProvider(Provider):
 
     def _init_session(self) -> Any:
         s = _cf_session()
-        r = s.get(self.BASE, timeout=40)
+        r = self._request(s, "GET", self.BASE, timeout=40)
         if r.status_code != 200:
             raise RuntimeError(f"EmailMux: page load failed ({r.status_code})")
         return s
 
     def create(self, domain: str) -> dict[str, Any]:
-        s = self._init_session()
-        r = s.post(
-            f"{self.BASE}/generate-email", json={"domains": [domain]}, timeout=15
+        return self._cleared(self._init_session, lambda s: self._generate(s, domain))
+
+    def _generate(self, s: Any, domain: str) -> dict[str, Any]:
+        r = self._request(
+            s,
+            "POST",
+            f"{self.BASE}/generate-email",
+            json={"domains": [domain]},
+            timeout=15,
         )
         data = r.json()
         if data.get("status") != "success":
@@ -50,7 +56,9 @@ class EmailMuxProvider(Provider):
         email = data["email"]
         # Activate inbox with signed request
         ts, sig = self._sign(email)
-        r2 = s.get(
+        r2 = self._request(
+            s,
+            "GET",
             f"{self.BASE}/use-email",
             params={"email": email},
             headers={"X-API-Timestamp": ts, "X-API-Signature": sig},
@@ -60,13 +68,15 @@ class EmailMuxProvider(Provider):
         if d2.get("status") != "success":
             raise RuntimeError(f"EmailMux: use-email failed: {d2}")
         cookies = {k: v for k, v in s.cookies.items()}
-        return {
+        state = {
             "email": email,
             "provider": self.name,
             "domain": domain,
             "cookies": cookies,
             "metadata": {},
         }
+        self._keep(state, s)
+        return state
 
     def _restore(self, state: dict[str, Any]) -> Any:
         s = _cf_session()
@@ -75,16 +85,26 @@ class EmailMuxProvider(Provider):
         return s
 
     def inbox(self, state: dict[str, Any]) -> list[dict[str, str]]:
-        s = self._restore(state)
         email = state["email"]
         ts, sig = self._sign(email)
-        r = s.get(
-            f"{self.BASE}/emails",
-            params={"email": email},
-            headers={"X-API-Timestamp": ts, "X-API-Signature": sig},
-            timeout=15,
-        )
-        data = r.json()
+        with self._pooled(state) as s:
+            r = self._request(
+                s,
+                "GET",
+                f"{self.BASE}/emails",
+                params={"email": email},
+                headers={"X-API-Timestamp": ts, "X-API-Signature": sig},
+                timeout=15,
+            )
+        return self._parse_inbox(r.json())
+
+    def message(self, state: dict[str, Any], msg_id: str) -> str:
+        with self._pooled(state) as s:
+            r = self._request(s, "GET", f"{self.BASE}/email/{msg_id}", timeout=15)
+        return self._parse_message(r)
+
+    @staticmethod
+    def _parse_inbox(data: Any) -> list[dict[str, str]]:
         if not isinstance(data, list):
             return []
         return [
@@ -98,9 +118,8 @@ class EmailMuxProvider(Provider):
             if m.get("uuid") != "WelcomeToEmailMux"
         ]
 
-    def message(self, state: dict[str, Any], msg_id: str) -> str:
-        s = self._restore(state)
-        r = s.get(f"{self.BASE}/email/{msg_id}", timeout=15)
+    @staticmethod
+    def _parse_message(r: Any) -> str:
         if r.status_code == 200:
             try:
                 data = r.json()
@@ -108,3 +127,30 @@ class EmailMuxProvider(Provider):
             except Exception:
                 return str(r.text)
         raise RuntimeError(f"EmailMux: message fetch failed ({r.status_code})")
+
+    def _restore_async(self, state: dict[str, Any]) -> Any:
+        s = _cf_async_session()
+        for k, v in state.get("cookies", {}).items():
+            s.cookies.set(k, v)
+        return s
+
+    async def inbox_async(self, state: dict[str, Any]) -> list[dict[str, str]]:
+        email = state["email"]
+        ts, sig = self._sign(email)
+        async with self._restore_async(state) as s:
+            r = await self._request_async(
+                s,
+                "GET",
+                f"{self.BASE}/emails",
+                params={"email": email},
+                headers={"X-API-Timestamp": ts, "X-API-Signature": sig},
+                timeout=15,
+            )
+        return self._parse_inbox(r.json())
+
+    async def message_async(self, state: dict[str, Any], msg_id: str) -> str:
+        async with self._restore_async(state) as s:
+            r = await self._request_async(
+                s, "GET", f"{self.BASE}/email/{msg_id}", timeout=15
+            )
+        return self._parse_message(r)
@@ -3,10 +3,11 @@
 from __future__ import annotations
 
 import urllib.parse
+from collections.abc import Iterator
 from typing import Any
 
 from tema.providers.base import Provider
-from tema.utils import _cf_session
+from tema.utils import _cf_async_session, _cf_session
 
 
 class EmailnatorProvider(Provider):
@@ -19,10 +20,12 @@ class EmailnatorProvider(Provider):
     domains = ["gmail", "googlemail"]
     requires_curl_cffi = True
     BASE = "https://www.emailnator.com"
+    clearance_cookies = ("XSRF-TOKEN",)
+    batch_size = 10
 
     def _init_session(self) -> Any:
         s = _cf_session()
-        r = s.get(self.BASE, timeout=20)
+        r = self._request(s, "GET", self.BASE, timeout=20)
         if r.status_code != 200:
             raise RuntimeError(f"Emailnator: page load failed ({r.status_code})")
         return s
@@ -32,37 +35,61 @@ class EmailnatorProvider(Provider):
         return urllib.parse.unquote(token)
 
     def create(self, domain: str) -> dict[str, Any]:
-        s = self._init_session()
+        return self.create_many(domain, 1)[0]
+
+    def create_many(self, domain: str, count: int) -> list[dict[str, Any]]:
+        """
+        Keep every address /generate-email returns, asking again on the
+        same session until `count` are collected. The mailboxes share the
+        session cookies and XSRF token.
+        """
+        return self._cleared(
+            self._init_session, lambda s: self._generate(s, domain, count)
+        )
+
+    def _generate(self, s: Any, domain: str, count: int) -> list[dict[str, Any]]:
         token = self._xsrf(s)
         # Email type: dotGmail, plusGmail, googleMail, domain
-        email_types = (
-            ["googleMail"] if domain == "googlemail" else ["dotGmail", "plusGmail"]
-        )
-        r = s.post(
-            f"{self.BASE}/generate-email",
-            json={"email": email_types},
-            headers={"X-XSRF-TOKEN": token},
-            timeout=15,
-        )
-        if r.status_code != 200:
-            raise RuntimeError(f"Emailnator: generate failed ({r.status_code})")
-        data = r.json()
-        email_list = data.get("email", [])
-        email = (
-            email_list[0]
-            if isinstance(email_list, list) and email_list
-            else data.get("email", "")
-        )
-        if not isinstance(email, str) or not email:
+        kinds = ["googleMail"] if domain == "googlemail" else ["dotGmail", "plusGmail"]
+        emails: list[str] = []
+        while len(emails) < count:
+            # One address per requested type, so ask for what is missing
+            want = min(max(count - len(emails), len(kinds)), self.batch_size)
+            r = self._request(
+                s,
+                "POST",
+                f"{self.BASE}/generate-email",
+                json={"email": [kinds[i % len(kinds)] for i in range(want)]},
+                headers={"X-XSRF-TOKEN": token},
+                timeout=15,
+            )
+            if r.status_code != 200:
+                if emails:
+                    break
+                raise RuntimeError(f"Emailnator: generate failed ({r.status_code})")
+            data = r.json()
+            got = data.get("email", [])
+            got = got if isinstance(got, list) else [got]
+            new = [e for e in got if isinstance(e, str) and e and e not in emails]
+            if not new:
+                break
+            emails.extend(new)
+        if not emails:
             raise RuntimeError(f"Emailnator: no email in response: {data}")
         cookies = {k: v for k, v in s.cookies.items()}
-        return {
-            "email": email,
-            "provider": self.name,
-            "domain": domain,
-            "cookies": cookies,
-            "metadata": {"xsrf": token},
-        }
+        states = [
+            {
+                "email": email,
+                "provider": self.name,
+                "domain": domain,
+                "cookies": dict(cookies),
+                "metadata": {"xsrf": token},
+            }
+            for email in emails[:count]
+        ]
+        # One live session can only be leased to one mailbox at a time
+        self._keep(states[0], s)
+        return states
 
     def _restore(self, state: dict[str, Any]) -> Any:
         s = _cf_session()
@@ -71,17 +98,53 @@ class EmailnatorProvider(Provider):
         return s
 
     def inbox(self, state: dict[str, Any]) -> list[dict[str, str]]:
-        s = self._restore(state)
-        token = state.get("metadata", {}).get("xsrf", self._xsrf(s))
-        r = s.post(
-            f"{self.BASE}/message-list",
-            json={"email": state["email"]},
-            headers={"X-XSRF-TOKEN": token},
-            timeout=15,
-        )
+        with self._pooled(state) as s:
+            token = state.get("metadata", {}).get("xsrf", self._xsrf(s))
+            r = self._request(
+                s,
+                "POST",
+                f"{self.BASE}/message-list",
+                json={"email": state["email"]},
+                headers={"X-XSRF-TOKEN": token},
+                timeout=15,
+            )
         if r.status_code != 200:
             return []
-        data = r.json()
+        return self._parse_inbox(r.json())
+
+    def message(self, state: dict[str, Any], msg_id: str) -> str:
+        with self._pooled(state) as s:
+            token = state.get("metadata", {}).get("xsrf", self._xsrf(s))
+            r = self._request(
+                s,
+                "POST",
+                f"{self.BASE}/message-list",
+                json={"email": state["email"], "messageID": msg_id},
+                headers={"X-XSRF-TOKEN": token},
+                timeout=15,
+            )
+        if r.status_code == 200:
+            return str(r.text)
+        raise RuntimeError(f"Emailnator: message fetch failed ({r.status_code})")
+
+    def message_stream(
+        self, state: dict[str, Any], msg_id: str, chunk_size: int = 16384
+    ) -> Iterator[str]:
+        with self._pooled(state) as s:
+            token = state.get("metadata", {}).get("xsrf", self._xsrf(s))
+            r = self._request(
+                s,
+                "POST",
+                f"{self.BASE}/message-list",
+                json={"email": state["email"], "messageID": msg_id},
+                headers={"X-XSRF-TOKEN": token},
+                timeout=15,
+                stream=True,
+            )
+            yield from self._stream_text(r, chunk_size)
+
+    @staticmethod
+    def _parse_inbox(data: Any) -> list[dict[str, str]]:
         messages = data.get("messageData", data if isinstance(data, list) else [])
         return [
             {
@@ -94,15 +157,38 @@ class EmailnatorProvider(Provider):
             if m.get("messageID", "") != "ADSVPN"
         ]
 
-    def message(self, state: dict[str, Any], msg_id: str) -> str:
-        s = self._restore(state)
-        token = state.get("metadata", {}).get("xsrf", self._xsrf(s))
-        r = s.post(
-            f"{self.BASE}/message-list",
-            json={"email": state["email"], "messageID": msg_id},
-            headers={"X-XSRF-TOKEN": token},
-            timeout=15,
-        )
+    def _restore_async(self, state: dict[str, Any]) -> Any:
+        s = _cf_async_session()
+        for k, v in state.get("cookies", {}).items():
+            s.cookies.set(k, v)
+        return s
+
+    async def inbox_async(self, state: dict[str, Any]) -> list[dict[str, str]]:
+        async with self._restore_async(state) as s:
+            token = state.get("metadata", {}).get("xsrf", self._xsrf(s))
+            r = await self._request_async(
+                s,
+                "POST",
+                f"{self.BASE}/message-list",
+                json={"email": state["email"]},
+                headers={"X-XSRF-TOKEN": token},
+                timeout=15,
+            )
+        if r.status_code != 200:
+            return []
+        return self._parse_inbox(r.json())
+
+    async def message_async(self, state: dict[str, Any], msg_id: str) -> str:
+        async with self._restore_async(state) as s:
+            token = state.get("metadata", {}).get("xsrf", self._xsrf(s))
+            r = await self._request_async(
+                s,
+                "POST",
+                f"{self.BASE}/message-list",
+                json={"email": state["email"], "messageID": msg_id},
+                headers={"X-XSRF-TOKEN": token},
+                timeout=15,
+            )
         if r.status_code == 200:
             return str(r.text)
         raise RuntimeError(f"Emailnator: message fetch failed ({r.status_code})")
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import hashlib
+from collections.abc import Iterator
 from typing import Any
 
 import requests
@@ -22,7 +23,7 @@ class EtempMailProvider(Provider):
 
     def create(self, domain: str) -> dict[str, Any]:
         s = requests.Session()
-        r = s.post(f"{self.BASE}/getEmailAddress", timeout=15)
+        r = self._request(s, "POST", f"{self.BASE}/getEmailAddress", timeout=15)
         if r.status_code != 200:
             raise RuntimeError(f"etempmail: create failed ({r.status_code})")
         data = r.json()
@@ -30,7 +31,7 @@ class EtempMailProvider(Provider):
         if not email:
             raise RuntimeError(f"etempmail: no address in response: {data}")
         cookies = {k: v for k, v in s.cookies.items()}
-        return {
+        state = {
             "email": email,
             "provider": self.name,
             "domain": domain,
@@ -40,6 +41,8 @@ class EtempMailProvider(Provider):
                 "recover_key": data.get("recover_key", ""),
             },
         }
+        self._keep(state, s)
+        return state
 
     def _restore(self, state: dict[str, Any]) -> requests.Session:
         s = requests.Session()
@@ -48,8 +51,8 @@ class EtempMailProvider(Provider):
         return s
 
     def inbox(self, state: dict[str, Any]) -> list[dict[str, str]]:
-        s = self._restore(state)
-        r = s.post(f"{self.BASE}/getInbox", timeout=15)
+        with self._pooled(state) as s:
+            r = self._request(s, "POST", f"{self.BASE}/getInbox", timeout=15)
         if r.status_code != 200:
             return []
         try:
@@ -81,8 +84,24 @@ class EtempMailProvider(Provider):
         return result
 
     def message(self, state: dict[str, Any], msg_id: str) -> str:
-        s = self._restore(state)
-        r = s.get(f"{self.BASE}/email", params={"id": msg_id}, timeout=15)
+        with self._pooled(state) as s:
+            r = self._request(
+                s, "GET", f"{self.BASE}/email", params={"id": msg_id}, timeout=15
+            )
         if r.status_code == 200:
             return str(r.text)
         raise RuntimeError(f"etempmail: message fetch failed ({r.status_code})")
+
+    def message_stream(
+        self, state: dict[str, Any], msg_id: str, chunk_size: int = 16384
+    ) -> Iterator[str]:
+        with self._pooled(state) as s:
+            r = self._request(
+                s,
+                "GET",
+                f"{self.BASE}/email",
+                params={"id": msg_id},
+                timeout=15,
+                stream=True,
+            )
+            yield from self._stream_text(r, chunk_size)
@@ -5,7 +5,7 @@ from __future__ import annotations
 from typing import Any
 
 from tema.providers.base import Provider
-from tema.utils import _cf_session
+from tema.utils import _cf_async_session, _cf_session
 
 
 class PrivatixProvider(Provider):
@@ -20,14 +20,14 @@ class PrivatixProvider(Provider):
     requires_curl_cffi = True
     BASE = "https://mob2.temp-mail.org"
 
-    def _session(self) -> Any:
+    def _restore(self, state: dict[str, Any]) -> Any:
         s = _cf_session()
         s.headers.update({"User-Agent": "3.49", "Accept": "application/json"})
         return s
 
     def create(self, domain: str) -> dict[str, Any]:
-        s = self._session()
-        r = s.post(f"{self.BASE}/mailbox", timeout=20)
+        s = self._restore({})
+        r = self._request(s, "POST", f"{self.BASE}/mailbox", timeout=20)
         if r.status_code != 200:
             raise RuntimeError(f"Privatix: create failed ({r.status_code})")
         data = r.json()
@@ -35,13 +35,15 @@ class PrivatixProvider(Provider):
         email = data.get("mailbox", "")
         if not email or not token:
             raise RuntimeError(f"Privatix: invalid response: {data}")
-        return {
+        state = {
             "email": email,
             "provider": self.name,
             "domain": domain,
             "cookies": {},
             "metadata": {"token": token},
         }
+        self._keep(state, s)
+        return state
 
     def _headers(self, state: dict[str, Any]) -> dict[str, str]:
         token = state.get("metadata", {}).get("token", "")
@@ -52,11 +54,31 @@ class PrivatixProvider(Provider):
         }
 
     def inbox(self, state: dict[str, Any]) -> list[dict[str, str]]:
-        s = self._session()
-        r = s.get(f"{self.BASE}/messages", headers=self._headers(state), timeout=15)
+        with self._pooled(state) as s:
+            r = self._request(
+                s,
+                "GET",
+                f"{self.BASE}/messages",
+                headers=self._headers(state),
+                timeout=15,
+            )
         if r.status_code != 200:
             return []
-        data = r.json()
+        return self._parse_inbox(r.json())
+
+    def message(self, state: dict[str, Any], msg_id: str) -> str:
+        with self._pooled(state) as s:
+            r = self._request(
+                s,
+                "GET",
+                f"{self.BASE}/messages/{msg_id}/",
+                headers=self._headers(state),
+                timeout=15,
+            )
+        return self._parse_message(r)
+
+    @staticmethod
+    def _parse_inbox(data: Any) -> list[dict[str, str]]:
         messages = data.get("messages", data if isinstance(data, list) else [])
         if not isinstance(messages, list):
             return []
@@ -75,12 +97,38 @@ class PrivatixProvider(Provider):
             )
         return result
 
-    def message(self, state: dict[str, Any], msg_id: str) -> str:
-        s = self._session()
-        r = s.get(
-            f"{self.BASE}/messages/{msg_id}/", headers=self._headers(state), timeout=15
-        )
+    @staticmethod
+    def _parse_message(r: Any) -> str:
         if r.status_code == 200:
             data = r.json()
             return str(data.get("bodyHtml", data.get("body", r.text)))
         raise RuntimeError(f"Privatix: message fetch failed ({r.status_code})")
+
+    def _restore_async(self, state: dict[str, Any]) -> Any:
+        s = _cf_async_session()
+        s.headers.update({"User-Agent": "3.49", "Accept": "application/json"})
+        return s
+
+    async def inbox_async(self, state: dict[str, Any]) -> list[dict[str, str]]:
+        async with self._restore_async(state) as s:
+            r = await self._request_async(
+                s,
+                "GET",
+                f"{self.BASE}/messages",
+                headers=self._headers(state),
+                timeout=15,
+            )
+        if r.status_code != 200:
+            return []
+        return self._parse_inbox(r.json())
+
+    async def message_async(self, state: dict[str, Any], msg_id: str) -> str:
+        async with self._restore_async(state) as s:
+            r = await self._request_async(
+                s,
+                "GET",
+                f"{self.BASE}/messages/{msg_id}/",
+                headers=self._headers(state),
+                timeout=15,
+            )
+        return self._parse_message(r)
@@ -2,12 +2,96 @@
 
 from __future__ import annotations
 
-from typing import Any
+import base64
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
 
 import requests
 
 from tema.providers.base import Provider
-from tema.utils import _cf_session
+from tema.utils import _cf_session, _log
+
+# Create payloads minted ahead of time; 0 mints one per create
+PREFETCH = int(os.environ.get("TEMA_SMAILPRO_PREFETCH", "2"))
+# Assumed lifetime of a payload whose JWT carries no readable "exp"
+_PAYLOAD_TTL = 120.0
+# Payloads this close to expiry are not handed out
+_EXPIRY_MARGIN = 15.0
+
+
+def _jwt_expiry(token: str) -> float:
+    """The JWT's "exp" claim, or _PAYLOAD_TTL from now if it has none."""
+    try:
+        part = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(part + "=" * (-len(part) % 4)))
+        return float(claims["exp"])
+    except (IndexError, ValueError, KeyError, TypeError):
+        return time.time() + _PAYLOAD_TTL
+
+
+class _PayloadQueue:
+    """
+    Bounded queue of unexpired create payloads, topped up by one
+    background thread whenever a payload is taken once `enabled`.
+    Payloads are tagged with the `origin()` they were minted for (the
+    site URL) and only handed out while it is unchanged.
+    """
+
+    def __init__(
+        self, mint: Callable[[], str], origin: Callable[[], str], size: int
+    ) -> None:
+        self.mint = mint
+        self.origin = origin
+        self.size = size
+        self._items: deque[tuple[str, float, str]] = deque()
+        self._lock = threading.Lock()
+        self._filling = False
+        # Off until a long-lived caller opts in (see Provider.prefetch)
+        self.enabled = False
+
+    def take(self) -> str | None:
+        """A fresh payload, or None if none is ready; starts a refill."""
+        if self.size <= 0 or not self.enabled:
+            return None
+        now, origin = time.time(), self.origin()
+        token = None
+        with self._lock:
+            while self._items:
+                jwt, expires_at, minted_for = self._items.popleft()
+                if minted_for == origin and expires_at - now > _EXPIRY_MARGIN:
+                    token = jwt
+                    break
+        self.refill()
+        return token
+
+    def refill(self) -> None:
+        with self._lock:
+            if self._filling or len(self._items) >= self.size:
+                return
+            self._filling = True
+        origin = self.origin()
+        threading.Thread(
+            target=self._fill, args=(origin,), name="tema-smailpro", daemon=True
+        ).start()
+
+    def _fill(self, origin: str) -> None:
+        try:
+            while self.origin() == origin:
+                with self._lock:
+                    if len(self._items) >= self.size:
+                        return
+                jwt = self.mint()
+                with self._lock:
+                    self._items.append((jwt, _jwt_expiry(jwt), origin))
+        except Exception as e:
+            _log(f"SmailPro: payload prefetch failed: {e}")
+        finally:
+            with self._lock:
+                self._filling = False
 
 
 class SmailProProvider(Provider):
@@ -22,19 +106,51 @@ class SmailProProvider(Provider):
     SMAILPRO = "https://smailpro.com"
     SONJJ = "https://api.sonjj.com"
 
-    def create(self, domain: str) -> dict[str, Any]:
+    def __init__(self) -> None:
+        self._payloads = _PayloadQueue(self._mint, lambda: self.SMAILPRO, PREFETCH)
+
+    def prefetch(self) -> None:
+        self._payloads.enabled = True
+
+    def _init_session(self) -> Any:
         s = _cf_session()
-        s.get(self.SMAILPRO, timeout=20)
-        r = s.get(
+        self._request(s, "GET", self.SMAILPRO, timeout=20)
+        return s
+
+    def _mint(self) -> str:
+        """Mint a create payload (JWT) through the Cloudflare-fronted site."""
+        return self._cleared(self._init_session, self._fetch_payload)
+
+    def _fetch_payload(self, s: Any) -> str:
+        r = self._request(
+            s,
+            "GET",
             f"{self.SMAILPRO}/app/payload",
             params={"url": f"{self.SONJJ}/v1/temp_email/create"},
             timeout=15,
         )
         if r.status_code != 200:
             raise RuntimeError(f"SmailPro: payload fetch failed ({r.status_code})")
-        jwt = r.text.strip()
-        r2 = requests.get(
-            f"{self.SONJJ}/v1/temp_email/create", params={"payload": jwt}, timeout=15
+        return str(r.text.strip())
+
+    def create(self, domain: str) -> dict[str, Any]:
+        # Hot path: a prefetched payload makes this one plain API call
+        jwt = self._payloads.take()
+        if jwt is not None:
+            try:
+                return self._generate(jwt)
+            except RuntimeError as e:
+                _log(f"SmailPro: prefetched payload rejected ({e}), minting")
+        return self._generate(self._mint())
+
+    def _generate(self, jwt: str) -> dict[str, Any]:
+        api = requests.Session()
+        r2 = self._request(
+            api,
+            "GET",
+            f"{self.SONJJ}/v1/temp_email/create",
+            params={"payload": jwt},
+            timeout=15,
         )
         if r2.status_code != 200:
             raise RuntimeError(f"SmailPro: create failed ({r2.status_code})")
@@ -42,19 +158,29 @@ class SmailProProvider(Provider):
         email = data.get("email", "")
         if not email:
             raise RuntimeError(f"SmailPro: no email in response: {data}")
-        return {
+        state = {
             "email": email,
             "provider": self.name,
             "domain": "edu",
             "cookies": {},
             "metadata": {"payload": jwt, "expired_at": data.get("expired_at", "")},
         }
+        self._keep(state, api)
+        return state
+
+    def _restore(self, state: dict[str, Any]) -> requests.Session:
+        return requests.Session()
 
     def inbox(self, state: dict[str, Any]) -> list[dict[str, str]]:
         payload = state.get("metadata", {}).get("payload", "")
-        r = requests.get(
-            f"{self.SONJJ}/v1/temp_email/inbox", params={"payload": payload}, timeout=15
-        )
+        with self._pooled(state) as s:
+            r = self._request(
+                s,
+                "GET",
+                f"{self.SONJJ}/v1/temp_email/inbox",
+                params={"payload": payload},
+                timeout=15,
+            )
         if r.status_code != 200:
             return []
         data = r.json()
@@ -71,11 +197,14 @@ class SmailProProvider(Provider):
 
     def message(self, state: dict[str, Any], msg_id: str) -> str:
         payload = state.get("metadata", {}).get("payload", "")
-        r = requests.get(
-            f"{self.SONJJ}/v1/temp_email/message",
-            params={"payload": payload, "mid": msg_id},
-            timeout=15,
-        )
+        with self._pooled(state) as s:
+            r = self._request(
+                s,
+                "GET",
+                f"{self.SONJJ}/v1/temp_email/message",
+                params={"payload": payload, "mid": msg_id},
+                timeout=15,
+            )
         if r.status_code == 200:
             data = r.json()
             return str(data.get("body", data.get("html", r.text)))
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import urllib.parse
+from collections.abc import Iterator
 from typing import Any
 
 import requests
@@ -23,14 +24,16 @@ class TempMailiProvider(Provider):
     def _init_session(self) -> tuple[requests.Session, str]:
         s = requests.Session()
         s.headers.update({"User-Agent": "Mozilla/5.0", "Accept": "application/json"})
-        s.get(self.BASE, timeout=15)
+        self._request(s, "GET", self.BASE, timeout=15)
         xsrf = s.cookies.get("XSRF-TOKEN", "")
         token = urllib.parse.unquote(xsrf)
         return s, token
 
     def create(self, domain: str) -> dict[str, Any]:
         s, token = self._init_session()
-        r = s.post(
+        r = self._request(
+            s,
+            "POST",
             f"{self.BASE}/get_messages",
             data={"_token": token},
             headers={"X-CSRF-TOKEN": token, "X-Requested-With": "XMLHttpRequest"},
@@ -43,31 +46,34 @@ class TempMailiProvider(Provider):
         if not email:
             raise RuntimeError(f"TempMaili: no mailbox in response: {data}")
         cookies = {k: v for k, v in s.cookies.items()}
-        return {
+        state = {
             "email": email,
             "provider": self.name,
             "domain": domain,
             "cookies": cookies,
             "metadata": {"email_token": data.get("email_token", "")},
         }
+        self._keep(state, s)
+        return state
 
-    def _restore(self, state: dict[str, Any]) -> tuple[requests.Session, str]:
+    def _restore(self, state: dict[str, Any]) -> requests.Session:
         s = requests.Session()
         s.headers.update({"User-Agent": "Mozilla/5.0", "Accept": "application/json"})
         for k, v in state.get("cookies", {}).items():
             s.cookies.set(k, v)
-        xsrf = s.cookies.get("XSRF-TOKEN", "")
-        token = urllib.parse.unquote(xsrf)
-        return s, token
+        return s
 
     def inbox(self, state: dict[str, Any]) -> list[dict[str, str]]:
-        s, token = self._restore(state)
-        r = s.post(
-            f"{self.BASE}/get_messages",
-            data={"_token": token},
-            headers={"X-CSRF-TOKEN": token, "X-Requested-With": "XMLHttpRequest"},
-            timeout=15,
-        )
+        with self._pooled(state) as s:
+            token = urllib.parse.unquote(s.cookies.get("XSRF-TOKEN", ""))
+            r = self._request(
+                s,
+                "POST",
+                f"{self.BASE}/get_messages",
+                data={"_token": token},
+                headers={"X-CSRF-TOKEN": token, "X-Requested-With": "XMLHttpRequest"},
+                timeout=15,
+            )
         if r.status_code != 200:
             return []
         try:
@@ -88,8 +94,17 @@ class TempMailiProvider(Provider):
         ]
 
     def message(self, state: dict[str, Any], msg_id: str) -> str:
-        s, _ = self._restore(state)
-        r = s.get(f"{self.BASE}/view/{msg_id}", timeout=15)
+        with self._pooled(state) as s:
+            r = self._request(s, "GET", f"{self.BASE}/view/{msg_id}", timeout=15)
         if r.status_code == 200:
             return str(r.text)
         raise RuntimeError(f"TempMaili: message fetch failed ({r.status_code})")
+
+    def message_stream(
+        self, state: dict[str, Any], msg_id: str, chunk_size: int = 16384
+    ) -> Iterator[str]:
+        with self._pooled(state) as s:
+            r = self._request(
+                s, "GET", f"{self.BASE}/view/{msg_id}", timeout=15, stream=True
+            )
+            yield from self._stream_text(r, chunk_size)
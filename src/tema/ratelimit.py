@@ -0,0 +1,159 @@
+"""Per-provider token buckets shared by every tema process on the host."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from tema.utils import _log
+
+__all__ = ["RATE_DB", "RATE_LIMITS", "RateLimiter", "get_limiter", "parse_limits"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    provider TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Requests per second and burst size for the Cloudflare-fronted providers;
+# the rest are unlimited unless configured
+_DEFAULT_LIMITS = "emailmux=2:10,emailnator=2:10,smailpro=2:10"
+
+
+def parse_limits(spec: str) -> dict[str, tuple[float, float]]:
+    """
+    Parse "provider=RATE[:BURST],..." (RATE per second, BURST defaults to
+    RATE, at least 1). A RATE of 0 leaves that provider unlimited.
+    """
+    limits: dict[str, tuple[float, float]] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, value = item.partition("=")
+        rate_s, _, burst_s = value.partition(":")
+        try:
+            rate = float(rate_s)
+            burst = float(burst_s) if burst_s else max(rate, 1.0)
+        except ValueError:
+            raise ValueError(f"Bad rate limit '{item}', expected provider=RATE[:BURST]")
+        if rate > 0:
+            limits[name.strip()] = (rate, max(burst, 1.0))
+    return limits
+
+
+def _resolve_rate_db() -> Path:
+    env = os.environ.get("TEMA_RATE_DB")
+    if env:
+        return Path(env)
+    # Host-wide by default, unlike the per-directory state store, but per
+    # user: another user's file in a shared /tmp would not be writable
+    # (Windows has no getuid, and per-user temp directories already)
+    uid = getattr(os, "getuid", None)
+    name = "tema_ratelimit.db" if uid is None else f"tema_ratelimit_{uid()}.db"
+    return Path(tempfile.gettempdir()) / name
+
+
+RATE_DB = _resolve_rate_db()
+RATE_LIMITS = parse_limits(os.environ.get("TEMA_RATE_LIMITS", _DEFAULT_LIMITS))
+
+
+class RateLimiter:
+    """
+    Token buckets in one SQLite file, so processes sharing it share the
+    budget. :meth:`reserve` takes a token in a single transaction, going
+    into debt when the bucket is empty; the debt is the caller's wait, so
+    concurrent callers queue up in order instead of retrying in a herd.
+    If the file cannot be used, requests go out unthrottled (fail open).
+    """
+
+    def __init__(
+        self, path: Path, limits: dict[str, tuple[float, float]] | None = None
+    ) -> None:
+        self.path = Path(path)
+        # None: follow the module-level RATE_LIMITS
+        self.limits = limits
+        self._local = threading.local()
+        self._failing = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def reserve(self, provider: str, max_wait: float | None = None) -> float:
+        """
+        Take a token for one request to `provider`; returns the seconds to
+        wait before sending it (0 when unlimited or a token is free). If
+        the wait would exceed `max_wait`, nothing is taken and the result
+        is infinite.
+        """
+        limit = (RATE_LIMITS if self.limits is None else self.limits).get(provider)
+        if limit is None:
+            return 0.0
+        try:
+            wait = self._take(provider, limit, max_wait)
+        except (sqlite3.Error, OSError) as e:
+            # Start over with a fresh connection next time; it may be stuck
+            # inside a transaction whose ROLLBACK failed
+            conn = getattr(self._local, "conn", None)
+            self._local.conn = None
+            if conn is not None:
+                conn.close()
+            if not self._failing:
+                self._failing = True
+                _log(f"rate limits off, cannot use {self.path}: {e}")
+            return 0.0
+        self._failing = False
+        return wait
+
+    def _take(
+        self, provider: str, limit: tuple[float, float], max_wait: float | None
+    ) -> float:
+        rate, burst = limit
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM buckets WHERE provider = ?",
+                (provider,),
+            ).fetchone()
+            tokens = burst if row is None else row[0] + (now - row[1]) * rate
+            tokens = min(tokens, burst) - 1
+            wait = max(-tokens / rate, 0.0)
+            if max_wait is not None and wait > max_wait:
+                conn.execute("ROLLBACK")
+                return float("inf")
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (provider, tokens, updated_at)"
+                " VALUES (?, ?, ?)",
+                (provider, tokens, now),
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return wait
+
+
+_limiters: dict[Path, RateLimiter] = {}
+
+
+def get_limiter() -> RateLimiter:
+    """Rate limiter on RATE_DB (one per path per process)."""
+    limiter = _limiters.get(RATE_DB)
+    if limiter is None:
+        limiter = _limiters[RATE_DB] = RateLimiter(RATE_DB)
+    return limiter
@@ -0,0 +1,89 @@
+"""Adaptive polling schedules learned from observed delivery latency."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterator
+
+from tema.state import get_store
+
+__all__ = ["poll_schedule", "record_arrival", "sender_domain"]
+
+MIN_SAMPLES = 5
+MIN_INTERVAL = 1.0
+MAX_INTERVAL = 15.0
+
+_DOMAIN_RE = re.compile(r"@([A-Za-z0-9.-]+)")
+_BARE_DOMAIN_RE = re.compile(r"[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)+\.?")
+
+
+def sender_domain(sender: str) -> str:
+    """
+    'Foo <no-reply@mail.foo.com>' or a bare 'mail.foo.com' ->
+    'mail.foo.com' ('' if none).
+    """
+    sender = (sender or "").strip()
+    m = _DOMAIN_RE.search(sender)
+    if m:
+        return m.group(1).lower().rstrip(".")
+    if _BARE_DOMAIN_RE.fullmatch(sender):
+        return sender.lower().rstrip(".")
+    return ""
+
+
+def record_arrival(provider: str, sender: str, seconds: float) -> None:
+    """Remember how long a message from `sender` took to show up."""
+    get_store().record_arrival(provider, sender_domain(sender), max(seconds, 0.0))
+
+
+def _quantile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def _backoff(interval: float, factor: float, cap: float) -> Iterator[float]:
+    while True:
+        yield interval
+        interval = min(interval * factor, cap)
+
+
+def poll_schedule(
+    provider: str,
+    sender: str | None = None,
+    poll_interval: float | None = None,
+) -> Iterator[float]:
+    """
+    Endless sequence of sleeps between polls.
+    With an explicit `poll_interval`, or too little history, this is the
+    classic backoff (x1.3 up to 15s). Otherwise it is shaped by past
+    arrivals for this provider (and sender domain when known): one long
+    sleep up to the 10th percentile, dense polling up to the 90th, then
+    a sparse tail.
+    """
+    if poll_interval is not None:
+        return _backoff(poll_interval, 1.3, MAX_INTERVAL)
+    store = get_store()
+    samples: list[float] = []
+    domain = sender_domain(sender) if sender else ""
+    if domain:  # unparsable senders are not a filter
+        samples = store.arrivals(provider, domain)
+    if len(samples) < MIN_SAMPLES:
+        samples = store.arrivals(provider)
+    if len(samples) < MIN_SAMPLES:
+        return _backoff(5, 1.3, MAX_INTERVAL)
+    return _shaped(_quantile(samples, 0.1), _quantile(samples, 0.9))
+
+
+def _shaped(lo: float, hi: float) -> Iterator[float]:
+    dense = min(max((hi - lo) / 8, MIN_INTERVAL), 5.0)
+    t = 0.0
+    while lo - t > MAX_INTERVAL:
+        yield MAX_INTERVAL
+        t += MAX_INTERVAL
+    first = max(lo - t, MIN_INTERVAL)
+    yield first
+    t += first
+    while t < hi:
+        yield dense
+        t += dense
+    yield from _backoff(min(dense * 1.5, MAX_INTERVAL), 1.5, MAX_INTERVAL)
@@ -0,0 +1,255 @@
+"""`tema serve`: a long-running daemon that runs CLI commands for thin clients."""
+
+from __future__ import annotations
+
+import contextvars
+import io
+import json
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from tema.client import SOCKET_PATH, _context
+from tema.policy import cancel_on
+from tema.providers import PROVIDERS
+from tema.utils import _log
+
+__all__ = ["run_command", "serve"]
+
+# Per-request output streams; a context variable rather than a thread-local
+# so worker threads started via copy_context() (hedged create) inherit it
+_output: contextvars.ContextVar[tuple[Any, Any] | None] = contextvars.ContextVar(
+    "tema_output", default=None
+)
+
+
+class _Router(io.TextIOBase):
+    """
+    sys.stdout/sys.stderr stand-in: writes go to the current request's
+    stream while a command is running, and to the real stream otherwise.
+    """
+
+    def __init__(self, index: int, default: Any) -> None:
+        self.index = index
+        self.default = default
+
+    def _target(self) -> Any:
+        output = _output.get()
+        return self.default if output is None else output[self.index]
+
+    def write(self, s: str) -> int:
+        return int(self._target().write(s) or 0)
+
+    def flush(self) -> None:
+        self._target().flush()
+
+
+class _FrameWriter(io.TextIOBase):
+    """Streams writes to a client as {"stdout": ...} / {"stderr": ...} lines."""
+
+    def __init__(self, out: io.BufferedIOBase, name: str, lock: threading.Lock) -> None:
+        self.out = out
+        self.name = name
+        self.lock = lock
+
+    def write(self, s: str) -> int:
+        if s:
+            with self.lock:
+                self.out.write(json.dumps({self.name: s}).encode() + b"\n")
+                self.out.flush()
+        return len(s)
+
+
+def _install_routers() -> None:
+    if not isinstance(sys.stdout, _Router):
+        sys.stdout = _Router(0, sys.stdout)
+        sys.stderr = _Router(1, sys.stderr)
+
+
+def run_command(
+    argv: list[str],
+    stdout: Any,
+    stderr: Any,
+    cancel: threading.Event | None = None,
+) -> int:
+    """
+    Run one CLI command with its output captured; returns the exit code.
+    Setting `cancel` stops long-running commands (`watch`, `wait`) early.
+    """
+    from tema.cli import main as cli_main
+
+    _install_routers()  # cheap; survives anyone swapping sys.stdout after startup
+    token = _output.set((stdout, stderr))
+    try:
+        with cancel_on(cancel or threading.Event()):
+            cli_main(argv)
+    except SystemExit as e:
+        code = e.code
+        if isinstance(code, str):
+            stderr.write(code + "\n")
+            return 1
+        return code or 0
+    except Exception as e:
+        stderr.write(json.dumps({"error": f"{type(e).__name__}: {e}"}) + "\n")
+        return 1
+    finally:
+        _output.reset(token)
+    return 0
+
+
+class _UnixHandler(socketserver.StreamRequestHandler):
+    server: _UnixServer
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+            argv = [str(a) for a in request["argv"]]
+        except (ValueError, KeyError, TypeError):
+            return
+        out = self.wfile
+        context = self.server.context
+        if {k: request.get(k) for k in context} != context:
+            # Another directory or TEMA_* settings would mean another state
+            # store, cache or limits: the client runs the command itself
+            out.write(json.dumps({"declined": "context differs"}).encode() + b"\n")
+            return
+        lock = threading.Lock()
+        # Clients send nothing after the request, so EOF means they are gone
+        # (e.g. Ctrl-C on `tema watch`): cancel the command instead of
+        # letting it run on with no one to write to
+        gone = threading.Event()
+        threading.Thread(
+            target=_await_hangup, args=(self.connection, gone), daemon=True
+        ).start()
+        try:
+            code = run_command(
+                argv,
+                _FrameWriter(out, "stdout", lock),
+                _FrameWriter(out, "stderr", lock),
+                gone,
+            )
+            with lock:
+                out.write(json.dumps({"exit": code}).encode() + b"\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            try:
+                self.connection.shutdown(socket.SHUT_RD)  # ends _await_hangup
+            except OSError:
+                pass
+
+
+def _await_hangup(conn: socket.socket, gone: threading.Event) -> None:
+    try:
+        while conn.recv(4096):
+            pass
+    except OSError:
+        pass
+    gone.set()
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    # The daemon's _context() at startup; requests must match it
+    context: dict[str, Any] = {}
+
+
+class _HTTPHandler(BaseHTTPRequestHandler):
+    server: ThreadingHTTPServer
+
+    def do_POST(self) -> None:  # noqa: N802
+        if self.path != "/run":
+            self.send_error(404)
+            return
+        # A web page can POST here too: a JSON content type cannot be sent
+        # cross-origin without a CORS preflight (which is never answered),
+        # and a loopback Host rules out DNS rebinding
+        port = self.server.server_port
+        if self.headers.get("Host") not in (f"127.0.0.1:{port}", f"localhost:{port}"):
+            self.send_error(403)
+            return
+        ctype = self.headers.get("Content-Type") or ""
+        if ctype.split(";")[0].strip().lower() != "application/json":
+            self.send_error(415)
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            argv = [str(a) for a in json.loads(self.rfile.read(length))["argv"]]
+        except (ValueError, KeyError, TypeError):
+            self.send_error(400)
+            return
+        stdout, stderr = io.StringIO(), io.StringIO()
+        code = run_command(argv, stdout, stderr)
+        body = json.dumps(
+            {"exit": code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def _claim_socket(path: Path) -> None:
+    """Remove a stale socket file; refuse if a daemon is already listening."""
+    if not path.exists():
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+    except OSError:
+        path.unlink()
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"tema daemon already running on {path}")
+
+
+def _terminate(signum: int, frame: Any) -> None:
+    raise KeyboardInterrupt
+
+
+def serve(socket_path: Path | None = None, http_port: int | None = None) -> None:
+    """
+    Serve CLI commands on a Unix socket (and optionally 127.0.0.1:`http_port`,
+    POST /run {"argv": [...]}) until interrupted. Sessions, the mailbox store
+    and provider modules stay warm between commands, and providers prefetch
+    what later creates need; each client runs on its own thread and sees
+    exactly what the CLI would print.
+    """
+    path = SOCKET_PATH if socket_path is None else Path(socket_path)
+    _claim_socket(path)
+    _install_routers()
+    for name in PROVIDERS:
+        PROVIDERS[name].prefetch()
+    unix = _UnixServer(str(path), _UnixHandler)
+    unix.context = _context()
+    servers: list[socketserver.BaseServer] = [unix]
+    if http_port is not None:
+        http = ThreadingHTTPServer(("127.0.0.1", http_port), _HTTPHandler)
+        http.daemon_threads = True
+        servers.append(http)
+        threading.Thread(target=http.serve_forever, daemon=True).start()
+        _log(f"tema daemon listening on http://127.0.0.1:{http.server_address[1]}")
+    _log(f"tema daemon listening on {path}")
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _terminate)
+    try:
+        unix.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for server in servers:
+            server.server_close()
+        try:
+            path.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,104 @@
+"""Pooled HTTP sessions reused across polls and commands."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Callable
+
+__all__ = ["SESSION_POOL", "SessionPool"]
+
+SessionKey = tuple[str, str]
+
+
+class SessionPool:
+    """
+    LRU pool of live HTTP sessions keyed by (provider, mailbox).
+    Sessions are leased to one caller at a time, returned on success and
+    dropped on error. Idle sessions expire after `idle_timeout` seconds and
+    the pool never holds more than `max_size` idle sessions.
+    """
+
+    def __init__(self, max_size: int = 32, idle_timeout: float = 300.0) -> None:
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._idle: OrderedDict[SessionKey, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    @contextmanager
+    def lease(self, key: SessionKey, factory: Callable[[], Any]) -> Iterator[Any]:
+        """Borrow the idle session for `key`, or build one with `factory`."""
+        s = self._checkout(key)
+        if s is None:
+            s = factory()
+        try:
+            yield s
+        except BaseException:
+            _close(s)
+            raise
+        self.put(key, s)
+
+    def put(self, key: SessionKey, session: Any) -> None:
+        """Return (or seed) an idle session for `key`."""
+        if self.max_size <= 0:
+            _close(session)
+            return
+        evicted = []
+        with self._lock:
+            old = self._idle.pop(key, None)
+            if old is not None and old[0] is not session:
+                evicted.append(old[0])
+            self._idle[key] = (session, time.monotonic())
+            while len(self._idle) > self.max_size:
+                evicted.append(self._idle.popitem(last=False)[1][0])
+        for s in evicted:
+            _close(s)
+
+    def discard(self, key: SessionKey) -> None:
+        """Drop the idle session for `key`, if any."""
+        with self._lock:
+            entry = self._idle.pop(key, None)
+        if entry is not None:
+            _close(entry[0])
+
+    def clear(self) -> None:
+        """Close every idle session."""
+        with self._lock:
+            entries = list(self._idle.values())
+            self._idle.clear()
+        for s, _ in entries:
+            _close(s)
+
+    def _checkout(self, key: SessionKey) -> Any:
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            for k, (s, last_used) in list(self._idle.items()):
+                if now - last_used > self.idle_timeout:
+                    del self._idle[k]
+                    expired.append(s)
+            entry = self._idle.pop(key, None)
+        for s in expired:
+            _close(s)
+        return entry[0] if entry is not None else None
+
+
+def _close(session: Any) -> None:
+    try:
+        session.close()
+    except Exception:
+        pass
+
+
+SESSION_POOL = SessionPool(
+    max_size=int(os.environ.get("TEMA_SESSION_POOL_SIZE", "32")),
+    idle_timeout=float(os.environ.get("TEMA_SESSION_IDLE_TIMEOUT", "300")),
+)
@@ -7,7 +7,17 @@ import os
 from pathlib import Path
 from typing import Any
 
-__all__ = ["STATE_FILE", "save_state", "load_state"]
+from tema.store import MailboxStore
+
+__all__ = [
+    "STATE_DB",
+    "STATE_FILE",
+    "save_state",
+    "load_state",
+    "list_states",
+    "use_state",
+    "get_store",
+]
 
 
 def _resolve_state_file() -> Path:
@@ -17,19 +27,63 @@ def _resolve_state_file() -> Path:
     return Path.cwd() / ".tema_state.json"
 
 
+def _resolve_state_db() -> Path:
+    env = os.environ.get("TEMA_STATE_DB")
+    if env:
+        return Path(env)
+    # Keep per-process TEMA_STATE_FILE setups isolated from each other
+    return _resolve_state_file().with_suffix(".db")
+
+
+# Legacy single-mailbox JSON file, imported into the store on first use
 STATE_FILE = _resolve_state_file()
+STATE_DB = _resolve_state_db()
+
+_stores: dict[Path, MailboxStore] = {}
+
+
+def get_store() -> MailboxStore:
+    """Mailbox store at STATE_DB (one per path per process)."""
+    store = _stores.get(STATE_DB)
+    if store is None:
+        store = _stores[STATE_DB] = MailboxStore(STATE_DB)
+        _migrate_legacy(store)
+    return store
+
+
+def _migrate_legacy(store: MailboxStore) -> None:
+    if not STATE_FILE.exists() or store.active() is not None:
+        return
+    with open(STATE_FILE) as f:
+        state = json.load(f)
+    if state and "email" in state and "provider" in state:
+        store.save(state)
 
 
 def save_state(state: dict[str, Any]) -> None:
-    """Persist account state to file."""
-    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(STATE_FILE, "w") as f:
-        json.dump(state, f, indent=2)
-
-
-def load_state() -> dict[str, Any] | None:
-    """Load persisted account state."""
-    if STATE_FILE.exists():
-        with open(STATE_FILE) as f:
-            return json.load(f)  # type: ignore[no-any-return]
-    return None
+    """Persist mailbox state and make it the active mailbox."""
+    get_store().save(state, active=True)
+
+
+def load_state(email: str | None = None) -> dict[str, Any] | None:
+    """Load the mailbox for `email`, or the active one."""
+    if email:
+        return get_store().get(email)
+    return get_store().active()
+
+
+def list_states(
+    provider: str | None = None, domain: str | None = None, limit: int | None = None
+) -> list[dict[str, Any]]:
+    """Stored mailboxes, newest first."""
+    return get_store().mailboxes(provider=provider, domain=domain, limit=limit)
+
+
+def use_state(email: str) -> dict[str, Any]:
+    """Make a stored mailbox the active one."""
+    store = get_store()
+    state = store.get(email)
+    if state is None:
+        raise ValueError(f"Unknown mailbox: {email}")
+    store.set_active(email)
+    return state
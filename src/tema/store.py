@@ -0,0 +1,413 @@
+"""SQLite mailbox store shared by concurrent processes."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+__all__ = ["MailboxStore"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mailboxes (
+    email TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    state TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS mailboxes_provider ON mailboxes (provider, created_at);
+CREATE INDEX IF NOT EXISTS mailboxes_created ON mailboxes (created_at);
+CREATE TABLE IF NOT EXISTS pool (
+    email TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    state TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pool_domain ON pool (domain, created_at);
+CREATE TABLE IF NOT EXISTS cursors (
+    email TEXT PRIMARY KEY,
+    updated_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS seen (
+    email TEXT NOT NULL,
+    msg_id TEXT NOT NULL,
+    PRIMARY KEY (email, msg_id)
+);
+CREATE TABLE IF NOT EXISTS arrivals (
+    provider TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    observed_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS arrivals_key ON arrivals (provider, sender, observed_at);
+CREATE TABLE IF NOT EXISTS health (
+    provider TEXT PRIMARY KEY,
+    successes INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0,
+    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+    success_rate REAL NOT NULL DEFAULT 1.0,
+    latency REAL,
+    opened_at REAL,
+    probing_at REAL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS clearance (
+    provider TEXT PRIMARY KEY,
+    cookies TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class MailboxStore:
+    """
+    Many mailboxes in one SQLite database (WAL mode).
+    Writers serialize on the database lock, readers never block, and every
+    method is a single transaction, so processes can share one file.
+    The "active" mailbox is tracked in the `meta` table.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            _migrate(conn)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in one write transaction (BEGIN IMMEDIATE)."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # --- mailboxes ---
+
+    def save(self, state: dict[str, Any], active: bool = True) -> None:
+        """Insert or update a mailbox, optionally making it the active one."""
+        with self.transaction() as conn:
+            _upsert(conn, "mailboxes", state)
+            if active:
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('active', ?)",
+                    (state["email"],),
+                )
+
+    def get(self, email: str) -> dict[str, Any] | None:
+        row = (
+            self._conn()
+            .execute("SELECT state FROM mailboxes WHERE email = ?", (email,))
+            .fetchone()
+        )
+        return json.loads(row[0]) if row else None
+
+    def active(self) -> dict[str, Any] | None:
+        row = (
+            self._conn()
+            .execute(
+                "SELECT m.state FROM meta JOIN mailboxes m ON m.email = meta.value"
+                " WHERE meta.key = 'active'"
+            )
+            .fetchone()
+        )
+        return json.loads(row[0]) if row else None
+
+    def set_active(self, email: str) -> None:
+        with self.transaction() as conn:
+            if not conn.execute(
+                "SELECT 1 FROM mailboxes WHERE email = ?", (email,)
+            ).fetchone():
+                raise ValueError(f"Unknown mailbox: {email}")
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('active', ?)",
+                (email,),
+            )
+
+    def mailboxes(
+        self,
+        provider: str | None = None,
+        domain: str | None = None,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Mailboxes, newest first."""
+        sql = "SELECT state FROM mailboxes WHERE 1=1"
+        params: list[Any] = []
+        if provider:
+            sql += " AND provider = ?"
+            params.append(provider)
+        if domain:
+            sql += " AND domain = ?"
+            params.append(domain)
+        sql += " ORDER BY created_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [json.loads(r[0]) for r in self._conn().execute(sql, params)]
+
+    def delete(self, email: str) -> None:
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM mailboxes WHERE email = ?", (email,))
+            conn.execute("DELETE FROM cursors WHERE email = ?", (email,))
+            conn.execute("DELETE FROM seen WHERE email = ?", (email,))
+
+    # --- watch cursors ---
+
+    def has_cursor(self, email: str) -> bool:
+        row = (
+            self._conn()
+            .execute("SELECT 1 FROM cursors WHERE email = ?", (email,))
+            .fetchone()
+        )
+        return row is not None
+
+    def seen_ids(self, email: str) -> set[str]:
+        rows = self._conn().execute("SELECT msg_id FROM seen WHERE email = ?", (email,))
+        return {r[0] for r in rows}
+
+    def mark_seen(self, email: str, msg_ids: Iterable[str]) -> None:
+        """Record message ids as delivered (creates the cursor if needed)."""
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO seen (email, msg_id) VALUES (?, ?)",
+                [(email, mid) for mid in msg_ids],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO cursors (email, updated_at) VALUES (?, ?)",
+                (email, int(time.time())),
+            )
+
+    # --- delivery latency history ---
+
+    def record_arrival(
+        self, provider: str, sender: str, seconds: float, keep: int = 500
+    ) -> None:
+        """Record a time-to-arrival sample, keeping the newest `keep` per key."""
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO arrivals (provider, sender, seconds, observed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (provider, sender, seconds, int(time.time())),
+            )
+            conn.execute(
+                "DELETE FROM arrivals WHERE rowid IN (SELECT rowid FROM arrivals"
+                " WHERE provider = ? AND sender = ?"
+                " ORDER BY observed_at DESC LIMIT -1 OFFSET ?)",
+                (provider, sender, keep),
+            )
+
+    def arrivals(
+        self, provider: str, sender: str | None = None, limit: int = 50
+    ) -> list[float]:
+        """Newest time-to-arrival samples for a provider (and sender domain)."""
+        sql = "SELECT seconds FROM arrivals WHERE provider = ?"
+        params: list[Any] = [provider]
+        if sender is not None:
+            sql += " AND sender = ?"
+            params.append(sender)
+        sql += " ORDER BY observed_at DESC LIMIT ?"
+        params.append(limit)
+        return [r[0] for r in self._conn().execute(sql, params)]
+
+    # --- provider health ---
+
+    def record_outcome(
+        self,
+        provider: str,
+        ok: bool,
+        latency: float,
+        alpha: float,
+        threshold: int,
+    ) -> None:
+        """
+        Fold one call outcome into the provider's moving averages and open
+        its breaker after `threshold` consecutive failures.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO health (provider, updated_at) VALUES (?, ?)",
+                (provider, now),
+            )
+            if ok:
+                conn.execute(
+                    "UPDATE health SET successes = successes + 1,"
+                    " consecutive_failures = 0, opened_at = NULL, probing_at = NULL,"
+                    " success_rate = success_rate * (1 - ?) + ?,"
+                    " latency = COALESCE(latency * (1 - ?) + ? * ?, ?),"
+                    " updated_at = ? WHERE provider = ?",
+                    (alpha, alpha, alpha, alpha, latency, latency, now, provider),
+                )
+            else:
+                conn.execute(
+                    "UPDATE health SET failures = failures + 1,"
+                    " consecutive_failures = consecutive_failures + 1,"
+                    " success_rate = success_rate * (1 - ?),"
+                    " opened_at = CASE WHEN consecutive_failures + 1 >= ?"
+                    " THEN ? ELSE opened_at END, probing_at = NULL,"
+                    " updated_at = ? WHERE provider = ?",
+                    (alpha, threshold, now, now, provider),
+                )
+
+    def claim_probe(self, provider: str, now: float, cooldown: float) -> bool:
+        """
+        Atomically claim the single half-open probe of `provider`'s breaker:
+        true for exactly one caller once the breaker has been open for
+        `cooldown` seconds. The claim lasts until an outcome is recorded,
+        or another `cooldown` if the prober never reports back.
+        """
+        with self.transaction() as conn:
+            cur = conn.execute(
+                "UPDATE health SET probing_at = ? WHERE provider = ?"
+                " AND opened_at IS NOT NULL AND opened_at <= ?"
+                " AND (probing_at IS NULL OR probing_at <= ?)",
+                (now, provider, now - cooldown, now - cooldown),
+            )
+            return cur.rowcount == 1
+
+    def health(self) -> dict[str, dict[str, Any]]:
+        cur = self._conn().execute(
+            "SELECT provider, successes, failures, consecutive_failures,"
+            " success_rate, latency, opened_at, probing_at, updated_at FROM health"
+        )
+        cols = [c[0] for c in cur.description]
+        return {row[0]: dict(zip(cols, row)) for row in cur}
+
+    # --- Cloudflare clearance ---
+
+    def clearance(self, provider: str, now: float) -> Any:
+        """Cached homepage cookies for `provider`, unless expired."""
+        row = (
+            self._conn()
+            .execute(
+                "SELECT cookies FROM clearance WHERE provider = ? AND expires_at > ?",
+                (provider, now),
+            )
+            .fetchone()
+        )
+        return None if row is None else json.loads(row[0])
+
+    def save_clearance(
+        self, provider: str, cookies: list[dict[str, str]], expires_at: float
+    ) -> None:
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO clearance (provider, cookies, expires_at)"
+                " VALUES (?, ?, ?)",
+                (provider, json.dumps(cookies), expires_at),
+            )
+
+    def drop_clearance(self, provider: str) -> None:
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM clearance WHERE provider = ?", (provider,))
+
+    # --- pre-warmed pool ---
+
+    def pool_add(self, state: dict[str, Any]) -> None:
+        with self.transaction() as conn:
+            _upsert(conn, "pool", state)
+
+    def pool_take(self, domain: str, min_created: int) -> dict[str, Any] | None:
+        """Atomically move the oldest fresh pooled mailbox to the active one."""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM pool WHERE created_at < ?", (min_created,))
+            row = conn.execute(
+                "SELECT email, state FROM pool WHERE domain = ?"
+                " ORDER BY created_at LIMIT 1",
+                (domain,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("DELETE FROM pool WHERE email = ?", (row[0],))
+            state: dict[str, Any] = json.loads(row[1])
+            _upsert(conn, "mailboxes", state)
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('active', ?)",
+                (state["email"],),
+            )
+            return state
+
+    def pool_entries(self) -> list[dict[str, Any]]:
+        rows = self._conn().execute("SELECT state FROM pool ORDER BY created_at")
+        return [json.loads(r[0]) for r in rows]
+
+    def pool_prune(self, min_created: int) -> int:
+        with self.transaction() as conn:
+            cur = conn.execute("DELETE FROM pool WHERE created_at < ?", (min_created,))
+            return cur.rowcount
+
+    def pool_claim_fill(self, domain: str, now: float, ttl: float) -> bool:
+        """
+        Atomically mark a fill of `domain` as running; false if another
+        one has held the mark for less than `ttl` seconds.
+        """
+        key = f"pool_fill:{domain}"
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - float(row[0]) < ttl:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, str(now)),
+            )
+            return True
+
+    def pool_release_fill(self, domain: str) -> None:
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM meta WHERE key = ?", (f"pool_fill:{domain}",))
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Add columns introduced after a table was first created."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(health)")}
+    if "probing_at" not in columns:
+        try:
+            conn.execute("ALTER TABLE health ADD COLUMN probing_at REAL")
+        except sqlite3.OperationalError:
+            pass  # another process added it first
+
+
+def _upsert(conn: sqlite3.Connection, table: str, state: dict[str, Any]) -> None:
+    conn.execute(
+        f"INSERT OR REPLACE INTO {table}"  # noqa: S608 — fixed table names
+        " (email, provider, domain, created_at, state) VALUES (?, ?, ?, ?, ?)",
+        (
+            state["email"],
+            state["provider"],
+            state.get("domain", ""),
+            int(state.get("created_at", 0)),
+            json.dumps(state),
+        ),
+    )
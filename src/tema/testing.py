@@ -0,0 +1,491 @@
+"""Fake provider server: every provider's HTTP API, in-process, for tests."""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Union
+
+from tema.providers import PROVIDERS
+
+__all__ = ["FakeProviderServer", "make_body", "make_inbox"]
+
+Response = tuple[int, list[tuple[str, str]], bytes]
+PerProvider = Union[float, dict[str, float]]
+
+
+def make_body(size: int, seed: int = 0) -> str:
+    """Newsletter-style HTML of roughly `size` bytes ending in a verify link."""
+    parts = ["<html><head><style>.a{color:#AABB11}</style></head><body>"]
+    i = 0
+    while sum(map(len, parts)) < size:
+        parts.append(
+            f'<p>Story {seed}-{i}: <a href="https://news.example.com/{seed}/{i}'
+            f'?utm_source=mail">Read more</a> about item {i}.</p>'
+        )
+        i += 1
+    parts.append(
+        f'<p><a href="https://example.com/verify?token={seed:06d}">Verify email</a>'
+        f" or enter code {100000 + seed}.</p>"
+        '<p><a href="https://example.com/unsubscribe">Unsubscribe</a></p>'
+        "</body></html>"
+    )
+    return "".join(parts)
+
+
+def make_inbox(count: int, body_size: int) -> list[dict[str, str]]:
+    """Canned messages, newest first."""
+    return [
+        {
+            "id": f"m{i}",
+            "from": f"news{i}@example.com",
+            "subject": f"Message {i}",
+            "date": "2024-01-01 00:00:00",
+            "html": make_body(body_size, i),
+        }
+        for i in reversed(range(count))
+    ]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without TCP_NODELAY the
+    # client's delayed ACK adds ~40ms to every keep-alive request
+    disable_nagle_algorithm = True
+    server: _Server
+
+    def do_GET(self) -> None:  # noqa: N802
+        self._serve("GET")
+
+    def do_POST(self) -> None:  # noqa: N802
+        self._serve("POST")
+
+    def _serve(self, method: str) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        status, headers, payload = self.server.fake.handle(
+            method, self.path, self.headers, body
+        )
+        self.send_response(status)
+        for k, v in headers:
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+    fake: FakeProviderServer
+
+
+class FakeProviderServer:
+    """
+    One in-process server emulating every provider's HTTP API, including
+    its auth (EmailMux signatures, XSRF/CSRF tokens, bearer tokens, URL
+    keys). Each provider is mounted under its own path prefix; use
+    :meth:`patched` to point the providers at it.
+
+    New mailboxes start with a copy of `inbox`; :meth:`inject` adds
+    messages later. `latency` (seconds) and `error_rate` (fraction of
+    requests answered with 503) are a float, or a dict keyed by provider
+    name ("sonjj" is SmailPro's API host). `requests` and `errors` count
+    handled and failed requests per provider.
+    """
+
+    def __init__(
+        self,
+        inbox: list[dict[str, str]] | None = None,
+        latency: PerProvider = 0.0,
+        error_rate: PerProvider = 0.0,
+        seed: int | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.inbox = inbox or []
+        self.latency = latency
+        self.error_rate = error_rate
+        self.mailboxes: dict[str, list[dict[str, str]]] = {}
+        self.pending: dict[str, list[tuple[int, dict[str, str]]]] = {}
+        self.polls: Counter[str] = Counter()
+        self.requests: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self._messages: dict[str, dict[str, str]] = {}
+        self._sessions: dict[str, str] = {}
+        self._ids = itertools.count()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = _Server((host, port), _Handler)
+        self._httpd.fake = self
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        if isinstance(host, bytes):  # typed for AF_UNIX; this is always TCP
+            host = host.decode()
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> FakeProviderServer:
+        self.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            args=(0.05,),  # shutdown() waits up to one poll interval
+            name="tema-fake-server",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    @contextmanager
+    def patched(self) -> Iterator[FakeProviderServer]:
+        """Point every provider's base URL(s) at this server, restoring on exit."""
+        saved: list[tuple[Any, str, str]] = []
+        for name, p in PROVIDERS.items():
+            attrs = {"SMAILPRO": "smailpro", "SONJJ": "sonjj"}
+            attrs = attrs if name == "smailpro" else {"BASE": name}
+            for attr, prefix in attrs.items():
+                if not hasattr(p, attr):  # e.g. a custom in-memory provider
+                    continue
+                saved.append((p, attr, getattr(p, attr)))
+                setattr(p, attr, f"{self.url}/{prefix}")
+        try:
+            yield self
+        finally:
+            for p, attr, value in saved:
+                setattr(p, attr, value)
+
+    def inject(
+        self,
+        email: str,
+        subject: str = "",
+        html: str = "",
+        sender: str = "sender@example.com",
+        after_polls: int = 0,
+    ) -> str:
+        """Deliver a new message to `email`; returns its id."""
+        msg = {
+            "id": f"x{next(self._ids)}",
+            "from": sender,
+            "subject": subject,
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "html": html,
+        }
+        self.deliver(email, msg, after_polls)
+        return msg["id"]
+
+    def deliver(self, email: str, msg: dict[str, str], after_polls: int = 0) -> None:
+        """Add a message once the mailbox has been polled `after_polls` more times."""
+        with self._lock:
+            self._messages[msg["id"]] = msg
+            self.pending.setdefault(email, []).append(
+                (self.polls[email] + after_polls, msg)
+            )
+
+    # --- request routing ---
+
+    def handle(self, method: str, path: str, headers: Any, body: bytes) -> Response:
+        url = urllib.parse.urlsplit(path)
+        prefix, _, rest = url.path.lstrip("/").partition("/")
+        query = dict(urllib.parse.parse_qsl(url.query))
+        latency = _per_provider(self.latency, prefix)
+        if latency:
+            time.sleep(latency)
+        with self._lock:
+            self.requests[prefix] += 1
+            failed = self._random.random() < _per_provider(self.error_rate, prefix)
+            if failed:
+                self.errors[prefix] += 1
+        if failed:
+            return 503, [], b"service unavailable"
+        route = getattr(self, f"_{prefix}", None)
+        if route is None:
+            return 404, [], b"unknown provider"
+        try:
+            data = json.loads(body) if body.startswith(b"{") else {}
+        except ValueError:
+            data = {}
+        result: Response | None = route(method, "/" + rest, query, data, headers)
+        return result or (404, [], b"not found")
+
+    def _new_mailbox(self, domain: str) -> str:
+        email = f"user{next(self._ids)}@{domain}"
+        with self._lock:
+            self.mailboxes[email] = list(self.inbox)
+            for m in self.inbox:
+                self._messages.setdefault(m["id"], m)
+        return email
+
+    def _poll(self, email: str) -> list[dict[str, str]]:
+        with self._lock:
+            self.polls[email] += 1
+            n = self.polls[email]
+            waiting = self.pending.get(email, [])
+            due = [m for after, m in waiting if after < n]
+            if due:
+                self.pending[email] = [(a, m) for a, m in waiting if a >= n]
+                self.mailboxes.setdefault(email, [])[:0] = reversed(due)
+            return list(self.mailboxes.get(email, []))
+
+    def _message(self, msg_id: str) -> dict[str, str] | None:
+        with self._lock:
+            return self._messages.get(msg_id)
+
+    def _session(self, headers: Any) -> tuple[str, list[tuple[str, str]]]:
+        sid = _cookies(headers).get("fake_session")
+        if sid:
+            return sid, []
+        sid = f"s{next(self._ids)}"
+        return sid, [("Set-Cookie", f"fake_session={sid}; Path=/")]
+
+    # --- providers ---
+
+    def _emailmux(self, method: str, path: str, q: Any, data: Any, h: Any) -> Any:
+        if path == "/":
+            return _html("<html>emailmux</html>")
+        if path == "/generate-email":
+            return _json({"status": "success", "email": self._new_mailbox("gmail.com")})
+        email = q.get("email", "")
+        if path in ("/use-email", "/emails"):
+            secret = PROVIDERS["emailmux"]._SECRET  # type: ignore[attr-defined]
+            ts = h.get("X-API-Timestamp", "")
+            sig = hashlib.md5((secret + email + ts).encode()).hexdigest()  # noqa: S324
+            if h.get("X-API-Signature") != sig:
+                return _json({"status": "error", "message": "bad signature"}, 403)
+        if path == "/use-email":
+            return _json({"status": "success"})
+        if path == "/emails":
+            return _json(
+                [
+                    {
+                        "uuid": m["id"],
+                        "sender": m["from"],
+                        "subject": m["subject"],
+                        "timestamp": m["date"],
+                    }
+                    for m in self._poll(email)
+                ]
+            )
+        if path.startswith("/email/"):
+            m = self._message(path.rsplit("/", 1)[1])
+            return _json({"body": m["html"]}) if m else None
+        return None
+
+    def _emailnator(self, method: str, path: str, q: Any, data: Any, h: Any) -> Any:
+        if path == "/":
+            token = f"t{next(self._ids)}="
+            self._sessions[token] = ""
+            xsrf = ("Set-Cookie", f"XSRF-TOKEN={urllib.parse.quote(token)}; Path=/")
+            return _html("<html>emailnator</html>", [xsrf])
+        token = urllib.parse.unquote(_cookies(h).get("XSRF-TOKEN", ""))
+        if token not in self._sessions or h.get("X-XSRF-TOKEN") != token:
+            return _json({"message": "CSRF token mismatch."}, 419)
+        if path == "/generate-email":
+            # One address per requested email type
+            kinds = data.get("email") or ["dotGmail"]
+            return _json({"email": [self._new_mailbox("gmail.com") for _ in kinds]})
+        if path == "/message-list":
+            email = data.get("email", "")
+            if "messageID" in data:
+                m = self._message(data["messageID"])
+                return _html(m["html"]) if m else None
+            return _json(
+                {
+                    "messageData": [
+                        {
+                            "messageID": m["id"],
+                            "from": m["from"],
+                            "subject": m["subject"],
+                            "time": m["date"],
+                        }
+                        for m in self._poll(email)
+                    ]
+                }
+            )
+        return None
+
+    def _privatix(self, method: str, path: str, q: Any, data: Any, h: Any) -> Any:
+        if path == "/mailbox":
+            mailbox = self._new_mailbox("privatix.test")
+            token = f"jwt{next(self._ids)}"
+            self._sessions[token] = mailbox
+            return _json({"token": token, "mailbox": mailbox})
+        email = self._sessions.get(h.get("Authorization", "").removeprefix("Bearer "))
+        if email is None:
+            return _json({"errorMessage": "unauthorized"}, 401)
+        if path == "/messages":
+            return _json(
+                {
+                    "messages": [
+                        {
+                            "_id": m["id"],
+                            "from": m["from"],
+                            "subject": m["subject"],
+                            "receivedAt": m["date"],
+                        }
+                        for m in self._poll(email)
+                    ]
+                }
+            )
+        m = self._message(path.strip("/").rsplit("/", 1)[1])
+        return _json({"bodyHtml": m["html"]}) if m else None
+
+    def _burner(self, method: str, path: str, q: Any, data: Any, h: Any) -> Any:
+        parts = path.strip("/").split("/")
+        key = PROVIDERS["burner"]._KEY  # type: ignore[attr-defined]
+        if len(parts) != 3 or parts[2] != key:
+            return _text("invalid key", 403)
+        if parts[0] == "email":
+            return _text(self._new_mailbox(parts[1]))
+        if parts[0] == "messages":
+            return _json(
+                [
+                    {
+                        "id": m["id"],
+                        "sender_email": m["from"],
+                        "subject": m["subject"],
+                        "date": m["date"],
+                        "content": m["html"],
+                    }
+                    for m in self._poll(parts[1])
+                ]
+            )
+        return None
+
+    def _tempmaili(self, method: str, path: str, q: Any, data: Any, h: Any) -> Any:
+        sid, set_cookie = self._session(h)
+        if path == "/":
+            xsrf = ("Set-Cookie", f"XSRF-TOKEN={sid}-csrf; Path=/")
+            return _html("<html>tempmaili</html>", [xsrf, *set_cookie])
+        if path == "/get_messages":
+            token = urllib.parse.unquote(_cookies(h).get("XSRF-TOKEN", ""))
+            if not token or h.get("X-CSRF-TOKEN") != token:
+                return _json({"message": "CSRF token mismatch."}, 419)
+            with self._lock:
+                email = self._sessions.get(sid)
+            if email is None:
+                email = self._sessions[sid] = self._new_mailbox("munik.edu.pl")
+            messages = [
+                {
+                    "id": m["id"],
+                    "from_email": m["from"],
+                    "subject": m["subject"],
+                    "receivedAt": m["date"],
+                }
+                for m in self._poll(email)
+            ]
+            return _json({"mailbox": email, "email_token": sid, "messages": messages})
+        if path.startswith("/view/"):
+            m = self._message(path.rsplit("/", 1)[1])
+            return _html(m["html"]) if m else None
+        return None
+
+    def _etempmail(self, method: str, path: str, q: Any, data: Any, h: Any) -> Any:
+        sid, set_cookie = self._session(h)
+        if path == "/getEmailAddress":
+            mailbox = self._sessions[sid] = self._new_mailbox("ohm.edu.pl")
+            address = {"address": mailbox, "id": sid, "recover_key": "rk"}
+            return _json(address, headers=set_cookie)
+        email = self._sessions.get(sid)
+        if email is None:
+            return _json({"error": "no mailbox"}, 401)
+        if path == "/getInbox":
+            return _json(
+                [
+                    {
+                        "id": m["id"],
+                        "from": m["from"],
+                        "subject": m["subject"],
+                        "date": m["date"],
+                    }
+                    for m in self._poll(email)
+                ]
+            )
+        if path == "/email":
+            m = self._message(q.get("id", ""))
+            return _html(m["html"]) if m else None
+        return None
+
+    def _smailpro(self, method: str, path: str, q: Any, data: Any, h: Any) -> Any:
+        if path == "/":
+            return _html("<html>smailpro</html>")
+        if path == "/app/payload":
+            payload = f"jwt{next(self._ids)}"
+            self._sessions[payload] = ""
+            return _text(payload)
+        return None
+
+    def _sonjj(self, method: str, path: str, q: Any, data: Any, h: Any) -> Any:
+        payload = q.get("payload", "")
+        if payload not in self._sessions:
+            return _json({"message": "invalid payload"}, 401)
+        if path == "/v1/temp_email/create":
+            email = self._sessions[payload] = self._new_mailbox("edu.pl")
+            return _json({"email": email, "expired_at": ""})
+        email = self._sessions[payload]
+        if path == "/v1/temp_email/inbox":
+            return _json(
+                {
+                    "messages": [
+                        {
+                            "mid": m["id"],
+                            "textFrom": m["from"],
+                            "textSubject": m["subject"],
+                            "textDate": m["date"],
+                        }
+                        for m in self._poll(email)
+                    ]
+                }
+            )
+        if path == "/v1/temp_email/message":
+            m = self._message(q.get("mid", ""))
+            return _json({"body": m["html"]}) if m else None
+        return None
+
+
+def _per_provider(value: PerProvider, prefix: str) -> float:
+    return value.get(prefix, 0.0) if isinstance(value, dict) else value
+
+
+def _cookies(headers: Any) -> dict[str, str]:
+    header = headers.get("Cookie", "")
+    pairs = (p.strip().partition("=") for p in header.split(";") if "=" in p)
+    return {k: v for k, _, v in pairs}
+
+
+def _json(
+    data: Any, status: int = 200, headers: list[tuple[str, str]] | None = None
+) -> Response:
+    content = [("Content-Type", "application/json"), *(headers or [])]
+    return status, content, json.dumps(data).encode()
+
+
+def _html(text: str, headers: list[tuple[str, str]] | None = None) -> Response:
+    content = [("Content-Type", "text/html; charset=utf-8"), *(headers or [])]
+    return 200, content, text.encode()
+
+
+def _text(text: str, status: int = 200) -> Response:
+    return status, [("Content-Type", "text/plain; charset=utf-8")], text.encode()
@@ -1,33 +1,36 @@
-"""Shared utilities: HTTP sessions, HTML parsing, link extraction."""
+"""Shared utilities: HTTP sessions, HTML parsing, link and code extraction."""
 
 from __future__ import annotations
 
+import functools
+import html
+import importlib.util
 import re
 import secrets
 import string
 import sys
+from collections.abc import Iterable, Iterator
 from html.parser import HTMLParser
 from typing import Any
 
-try:
-    import requests  # noqa: F401 — re-exported for providers
-except ImportError as _e:
-    raise ImportError("requests is required. Install: pip install tema") from _e
-
-try:
-    from curl_cffi import requests as cf_requests  # noqa: F401
-
-    HAS_CURL_CFFI = True
-except ImportError:
-    HAS_CURL_CFFI = False
+# curl_cffi itself is imported on first use: it is slow to load and most
+# commands never need it
+HAS_CURL_CFFI = importlib.util.find_spec("curl_cffi") is not None
 
 __all__ = [
     "HAS_CURL_CFFI",
     "IMPERSONATE",
     "LinkExtractor",
     "extract_links",
+    "find_code",
+    "find_codes",
     "find_verification_link",
+    "html_to_text",
+    "iter_links",
+    "rank_codes",
+    "rank_verification_links",
     "gmail_alias",
+    "_cf_async_session",
     "_cf_session",
     "_log",
     "_random_username",
@@ -36,18 +39,89 @@ __all__ = [
 IMPERSONATE: Any = "chrome131"
 
 
+_TEXT_URL_RE = re.compile(r"https?://[^\s<>\"')\]]+")
+# Longest chunk tail that may begin a URL without matching yet ("https://")
+_URL_PREFIX_LEN = len("https://")
+
+
 class LinkExtractor(HTMLParser):
-    """Extract href links from HTML."""
+    """
+    Extract links from HTML fed in chunks: `a` hrefs with their anchor
+    text, plus every http(s) URL written anywhere in the source (text or
+    attributes such as `img src`). :meth:`pop` returns the (href, text)
+    anchors completed since the last call; :meth:`pop_urls` the URLs first
+    seen since the last call, each once.
+    """
 
     def __init__(self) -> None:
         super().__init__()
         self.links: list[str] = []
+        self.anchors: list[tuple[str, str]] = []
+        self._href: str | None = None
+        self._text: list[str] = []
+        self._raw = ""
+        self._seen: set[str] = set()
+        self._urls: list[str] = []
+        self._ready: list[tuple[str, str]] = []
+
+    def feed(self, data: str) -> None:
+        self._scan(self._raw + data, final=False)
+        super().feed(data)
 
     def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
         if tag == "a":
+            self._close_anchor()
             for name, value in attrs:
                 if name == "href" and value:
                     self.links.append(value)
+                    self._add_url(value)
+                    self._href = value
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "a":
+            self._close_anchor()
+
+    def handle_data(self, data: str) -> None:
+        if self._href is not None:
+            self._text.append(data)
+
+    def close(self) -> None:
+        super().close()
+        self._close_anchor()
+        self._scan(self._raw, final=True)
+
+    def pop(self) -> list[tuple[str, str]]:
+        ready, self._ready = self._ready, []
+        return ready
+
+    def pop_urls(self) -> list[str]:
+        urls, self._urls = self._urls, []
+        return urls
+
+    def _add_url(self, url: str) -> None:
+        if url not in self._seen:
+            self._seen.add(url)
+            self._urls.append(url)
+
+    def _close_anchor(self) -> None:
+        if self._href is not None:
+            anchor = (self._href, " ".join("".join(self._text).split()))
+            self.anchors.append(anchor)
+            self._ready.append(anchor)
+        self._href = None
+        self._text = []
+
+    def _scan(self, raw: str, final: bool) -> None:
+        # A URL running into the end of the chunk may continue in the next
+        # one, so it (or a tail that may begin one) is held back until then
+        keep = len(raw) if final else max(len(raw) - _URL_PREFIX_LEN, 0)
+        for m in _TEXT_URL_RE.finditer(raw):
+            if m.end() == len(raw) and not final:
+                keep = m.start()
+                break
+            self._add_url(m.group())
+            keep = max(keep, m.end())
+        self._raw = raw[keep:]
 
 
 def extract_links(html_content: str) -> list[str]:
@@ -57,51 +131,231 @@ def extract_links(html_content: str) -> list[str]:
     return parser.links
 
 
-def find_verification_link(html_content: str) -> str | None:
-    """Find verification/confirmation link in email HTML."""
-    links = extract_links(html_content)
-    verify_patterns = [
-        r"verif",
-        r"confirm",
-        r"activate",
-        r"validate",
-        r"registration",
-        r"auth",
-        r"token=",
-        r"code=",
-        r"key=",
-        r"click.here",
-        r"email.confirm",
-        r"signup",
-        r"register",
-    ]
-    skip_patterns = [
-        r"unsubscribe",
-        r"privacy",
-        r"terms",
-        r"mailto:",
-        r"facebook\.com",
-        r"twitter\.com",
-        r"instagram\.com",
-        r"linkedin\.com",
-        r"youtube\.com",
-    ]
+def _chunks_of(html: str | Iterable[str]) -> Iterable[str]:
+    return (html,) if isinstance(html, str) else html
 
-    def _should_skip(url: str) -> bool:
-        return any(re.search(sp, url, re.IGNORECASE) for sp in skip_patterns)
 
-    for link in links:
-        if _should_skip(link):
-            continue
-        for pattern in verify_patterns:
-            if re.search(pattern, link, re.IGNORECASE):
-                return link
-    for link in links:
-        if not link.startswith("http"):
+def _iter_anchors(html: str | Iterable[str]) -> Iterator[tuple[str, str]]:
+    parser = LinkExtractor()
+    for chunk in _chunks_of(html):
+        parser.feed(chunk)
+        yield from parser.pop()
+    parser.close()
+    yield from parser.pop()
+
+
+def iter_links(html: str | Iterable[str]) -> Iterator[str]:
+    """
+    Yield each link in HTML (href or URL anywhere in the source) once, in
+    one pass. `html` may be a string or an iterable of chunks, e.g. from
+    :func:`tema.core.message_stream`; links are yielded as soon as they are
+    complete, so stopping early skips the rest of the document.
+    """
+    parser = LinkExtractor()
+    for chunk in _chunks_of(html):
+        parser.feed(chunk)
+        yield from parser.pop_urls()
+    parser.close()
+    yield from parser.pop_urls()
+
+
+# (pattern, weight) over lowercased text; weight None marks a link to skip.
+# One plain alternation scans each link once (IGNORECASE and named groups
+# both slow the scan several-fold); the rare hits are classified afterwards.
+_LINK_TERMS: list[tuple[str, float | None]] = [
+    (r"email.confirm", 4.0),
+    (r"verif", 3.0),
+    (r"confirm", 3.0),
+    (r"activat", 3.0),
+    (r"validat", 3.0),
+    (r"token=", 2.0),
+    (r"code=", 2.0),
+    (r"key=", 1.5),
+    (r"registration", 1.5),
+    (r"register", 1.0),
+    (r"sign.?up", 1.0),
+    (r"auth", 1.0),
+    (r"click.here", 1.0),
+    (r"unsubscribe", None),
+    (r"privacy", None),
+    (r"terms", None),
+    (r"mailto:", None),
+    (r"(?:facebook|twitter|instagram|linkedin|youtube)\.com", None),
+]
+_LINK_RE = re.compile("|".join(pattern for pattern, _ in _LINK_TERMS))
+_TERM_RES = [(re.compile(pattern), weight) for pattern, weight in _LINK_TERMS]
+# Anchor text is a stronger signal than URL tokens ("Verify email" vs /t/abc)
+_ANCHOR_FACTOR = 1.5
+# One strong URL term ("verify", "confirm", ...) or anchor text saying so
+_CONFIDENT = 3.0
+
+
+@functools.lru_cache(maxsize=256)
+def _term_weight(hit: str) -> float | None:
+    for term, weight in _TERM_RES:
+        if term.fullmatch(hit):
+            return weight
+    return 0.0
+
+
+def _term_score(text: str) -> float | None:
+    """Sum of distinct term weights in `text`, or None if a skip term matched."""
+    score = 0.0
+    for hit in set(_LINK_RE.findall(text.lower())):
+        weight = _term_weight(hit)
+        if weight is None:
+            return None
+        score += weight
+    return score
+
+
+def rank_verification_links(
+    html_content: str | Iterable[str],
+) -> list[tuple[str, float]]:
+    """
+    Score every link in `html_content` (a string or chunks) as a likely
+    verification link. Scores combine URL path/query tokens, anchor text
+    (of every anchor pointing at the URL), and position (earlier links win
+    ties). Unsubscribe, legal, social and mailto links are dropped.
+    Returns (url, score) pairs, best first.
+    """
+    anchors: dict[str, str] = {}
+    for href, text in _iter_anchors(html_content):
+        _merge_anchor(anchors, href, text)
+    return _ranked(anchors)
+
+
+def _merge_anchor(anchors: dict[str, str], href: str, text: str) -> str:
+    """Add an anchor's text to those already seen for `href`; returns them all."""
+    anchors[href] = f"{anchors[href]} {text}" if href in anchors else text
+    return anchors[href]
+
+
+def _link_score(url: str, text: str) -> float | None:
+    url_score = _term_score(url)
+    text_score = _term_score(text)
+    if url_score is None or (text_score is None and not url_score):
+        return None
+    score = url_score + _ANCHOR_FACTOR * (text_score or 0.0)
+    if not url.startswith("http"):
+        score -= 1.0
+    return score
+
+
+def _ranked(anchors: dict[str, str]) -> list[tuple[str, float]]:
+    n = len(anchors)
+    ranked = []
+    for i, (url, text) in enumerate(anchors.items()):
+        score = _link_score(url, text)
+        if score is not None:
+            ranked.append((url, round(score + 0.5 * (1 - i / n), 3)))
+    ranked.sort(key=lambda r: -r[1])
+    return ranked
+
+
+def find_verification_link(html_content: str | Iterable[str]) -> str | None:
+    """
+    Find verification/confirmation link in email HTML (a string or chunks).
+    Stops reading at the first high-confidence link; otherwise returns the
+    best ranked one, else the first http link, else the first href.
+    """
+    anchors: dict[str, str] = {}
+    for href, text in _iter_anchors(html_content):
+        score = _link_score(href, _merge_anchor(anchors, href, text))
+        if score is not None and score >= _CONFIDENT:
+            return href
+    ranked = _ranked(anchors)
+    if ranked and ranked[0][1] >= 1.0:
+        return ranked[0][0]
+    for url, _ in ranked:
+        if url.startswith("http"):
+            return url
+    return next(iter(anchors), None)
+
+
+_SCRIPT_RE = re.compile(r"<(script|style|head)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]*>")
+_SPACE_RE = re.compile(r"\s+")
+# 4-8 digit or upper-case alphanumeric tokens, or "123 456" / "123-456";
+# the lookarounds keep prices, decimals, dates, paths and hex colours out
+_CODE_RE = re.compile(
+    r"(?<![\w#$/.:@-])(\d{3}[ -]\d{3}|[A-Z0-9]{4,8})(?![\w%/:@-]|[.,]\d)"
+)
+_CODE_KEYWORD_RE = re.compile(
+    r"code|otp|passcode|pin\b|verif|one.time|security|2fa|login|sign.in|confirm"
+)
+_CODE_YEAR_RE = re.compile(r"(?:19|20)\d\d")
+# Keywords usually precede the code ("Your code is 123456") but some
+# services put it first ("123456 is your code")
+_CODE_BEFORE = 60
+_CODE_AFTER = 40
+_CODE_MIN_SCORE = 3.0
+
+
+def html_to_text(html_content: str) -> str:
+    """Strip markup (and script/style/head blocks) down to plain text."""
+    text = _SCRIPT_RE.sub(" ", html_content)
+    text = html.unescape(_TAG_RE.sub(" ", text))
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def rank_codes(html_content: str, subject: str = "") -> list[tuple[str, float]]:
+    """
+    Score candidate one-time codes in an email (HTML body plus subject).
+    Six-digit numbers score highest on their own; any candidate near a
+    keyword ("code", "OTP", "verification", ...) gains, and year-like
+    numbers lose. Returns (code, score) pairs, best first.
+    """
+    text = f"{subject} \n {html_to_text(html_content)}"
+    lowered = text.lower()
+    keywords = [(m.start(), m.end()) for m in _CODE_KEYWORD_RE.finditer(lowered)]
+    found: dict[str, float] = {}
+    matches = list(_CODE_RE.finditer(text))
+    for i, m in enumerate(matches):
+        raw = m.group(1)
+        if not any(c.isdigit() for c in raw):
             continue
-        if not _should_skip(link):
-            return link
-    return links[0] if links else None
+        code = raw.replace(" ", "").replace("-", "")
+        if code.isdigit():
+            score = 3.0 if len(code) == 6 else 2.0
+            if len(code) == 4 and _CODE_YEAR_RE.fullmatch(code):
+                score -= 3.0
+        else:
+            score = 1.0
+        start, end = m.span()
+        # Nearest preceding keyword, closer is better; else one just after
+        before = [start - k_end for _, k_end in keywords if 0 <= start - k_end]
+        if before and min(before) <= _CODE_BEFORE:
+            score += 3.0 - min(before) / _CODE_BEFORE
+        elif any(0 <= k_start - end <= _CODE_AFTER for k_start, _ in keywords):
+            score += 1.5
+        score += 0.5 * (1 - i / len(matches))
+        if score > found.get(code, 0.0):
+            found[code] = round(score, 3)
+    return sorted(found.items(), key=lambda r: -r[1])
+
+
+def find_code(html_content: str, subject: str = "") -> str | None:
+    """Most likely verification code in an email, or None if none is convincing."""
+    ranked = rank_codes(html_content, subject)
+    if ranked and ranked[0][1] >= _CODE_MIN_SCORE:
+        return ranked[0][0]
+    return None
+
+
+def find_codes(
+    messages: Iterable[str | dict[str, str]],
+) -> list[str | None]:
+    """
+    :func:`find_code` over many bodies, or message dicts with "html" and
+    "subject"; results follow input order.
+    """
+    return [
+        find_code(m)
+        if isinstance(m, str)
+        else find_code(m.get("html", ""), m.get("subject", ""))
+        for m in messages
+    ]
 
 
 def gmail_alias(base_email: str) -> str:
@@ -125,8 +379,21 @@ def _cf_session() -> Any:
         raise RuntimeError(
             "curl_cffi required for this provider. Install: pip install curl_cffi"
         )
+    from curl_cffi import requests as cf_requests
+
     return cf_requests.Session(impersonate=IMPERSONATE)
 
 
+def _cf_async_session() -> Any:
+    """Create a curl_cffi AsyncSession with Chrome impersonation."""
+    if not HAS_CURL_CFFI:
+        raise RuntimeError(
+            "curl_cffi required for this provider. Install: pip install curl_cffi"
+        )
+    from curl_cffi import requests as cf_requests
+
+    return cf_requests.AsyncSession(impersonate=IMPERSONATE)
+
+
 def _log(msg: str) -> None:
     print(msg, file=sys.stderr)
@@ -0,0 +1,67 @@
+"""Shared fixtures: an in-memory provider registered for the test."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from tema.providers import PROVIDERS, Provider
+
+
+class MemoryProvider(Provider):
+    """Provider whose mailboxes live in a dict; messages appear after N polls."""
+
+    name = "memory"
+    domains = ["temp"]
+
+    def __init__(self, arrive_after: int = 1) -> None:
+        self.arrive_after = arrive_after
+        self.polls: dict[str, int] = {}
+        self.fetches = 0
+        self.delivered: dict[str, list[str]] = {}
+        self.bodies: dict[str, str] = {}  # msg_id -> body, else a generic one
+
+    def deliver(self, email: str, msg_id: str) -> None:
+        self.delivered.setdefault(email, []).append(msg_id)
+
+    def create(self, domain: str) -> dict[str, Any]:
+        email = f"user{len(self.polls)}@memory.test"
+        self.polls[email] = 0
+        return {
+            "email": email,
+            "provider": self.name,
+            "domain": domain,
+            "cookies": {},
+            "metadata": {},
+        }
+
+    def inbox(self, state: dict[str, Any]) -> list[dict[str, str]]:
+        email = state["email"]
+        self.polls[email] = self.polls.get(email, 0) + 1
+        ids = list(self.delivered.get(email, []))
+        if self.polls[email] > self.arrive_after:
+            ids.insert(0, "1")
+        # Newest first, like the real providers
+        return [
+            {"id": mid, "from": "a@b.c", "subject": "hi", "date": ""}
+            for mid in reversed(ids)
+        ]
+
+    def message(self, state: dict[str, Any], msg_id: str) -> str:
+        self.fetches += 1
+        return self.bodies.get(msg_id) or f"<p>body {msg_id} for {state['email']}</p>"
+
+    def _restore(self, state: dict[str, Any]) -> None:
+        return None  # no HTTP session to pool
+
+
+@pytest.fixture
+def memory(monkeypatch: pytest.MonkeyPatch, tmp_path: Any) -> MemoryProvider:
+    p = MemoryProvider()
+    monkeypatch.setitem(PROVIDERS, "memory", p)
+    monkeypatch.setattr("tema.state.STATE_FILE", tmp_path / "state.json")
+    monkeypatch.setattr("tema.state.STATE_DB", tmp_path / "state.db")
+    monkeypatch.setattr("tema.cache.CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr("tema.ratelimit.RATE_DB", tmp_path / "rate.db")
+    return p
@@ -0,0 +1,24 @@
+"""Smoke tests for the benchmark harness."""
+
+from __future__ import annotations
+
+from benchmarks.run import compare, run_suite
+
+
+def test_suite_runs_against_fake_server() -> None:
+    results = run_suite(["burner", "etempmail"], rounds=1)
+    assert results["create_email[burner]"]["requests"] == 1
+    # Burner's listing carries bodies: one request per wait poll, no fetch
+    assert results["wait_for_message[burner]"]["requests"] == 2
+    assert results["get_message_body[etempmail,small]"]["requests"] == 1
+    assert results["get_message_body[cached]"]["requests"] == 0
+
+    report = {"results": results}
+    slower = {
+        "results": {
+            name: {**r, "median_ms": r["median_ms"] * 2 + 1, "requests": r["requests"]}
+            for name, r in results.items()
+        }
+    }
+    assert compare(report, report) == []
+    assert len(compare(report, slower)) == len(results)
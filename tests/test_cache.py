@@ -0,0 +1,60 @@
+"""Body cache tests."""
+
+from __future__ import annotations
+
+import os
+from typing import Any
+
+import pytest
+
+from tema.cache import BodyCache
+
+
+def test_roundtrip_compressed_and_raw(tmp_path: Any) -> None:
+    for compress in (True, False):
+        cache = BodyCache(tmp_path / str(compress), compress=compress)
+        assert cache.get("p", "a@x", "1") is None
+        cache.put("p", "a@x", "1", "<p>héllo</p>")
+        assert cache.get("p", "a@x", "1") == "<p>héllo</p>"
+        assert cache.get("p", "b@x", "1") is None
+
+
+def test_lru_eviction(tmp_path: Any) -> None:
+    cache = BodyCache(tmp_path, max_bytes=310, compress=False)
+    for i in range(3):
+        cache.put("p", "a@x", str(i), "x" * 100)
+        path = cache._path("p", "a@x", str(i))
+        os.utime(path, (i, i))
+    cache.get("p", "a@x", "0")  # touch: 0 becomes most recent
+    cache.put("p", "a@x", "3", "x" * 10)
+    assert cache.get("p", "a@x", "1") is None
+    assert cache.get("p", "a@x", "0") is not None
+
+
+def test_corrupt_entries_are_misses(tmp_path: Any) -> None:
+    cache = BodyCache(tmp_path)
+    cache.put("p", "a@x", "1", "<p>hello</p>" * 100)
+    path = cache._path("p", "a@x", "1")
+    path.write_bytes(path.read_bytes()[:20])  # cut short mid-write
+    assert cache.get("p", "a@x", "1") is None
+    assert not path.exists()
+    path.write_bytes(b"?junk")
+    assert cache.get("p", "a@x", "1") is None
+    cache.put("p", "a@x", "1", "<p>again</p>")
+    assert cache.get("p", "a@x", "1") == "<p>again</p>"
+
+
+def test_put_scans_directory_only_when_needed(
+    tmp_path: Any, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = BodyCache(tmp_path, max_bytes=1000, compress=False)
+    scans = []
+    evict = cache.evict
+    monkeypatch.setattr(cache, "evict", lambda: scans.append(1) or evict())
+    for i in range(5):
+        cache.put("p", "a@x", str(i), "x" * 100)
+    assert len(scans) == 1  # first put learns the directory size
+    for i in range(5, 10):
+        cache.put("p", "a@x", str(i), "x" * 100)
+    assert len(scans) == 2  # crossed max_bytes
+    assert len(list(tmp_path.glob("*/*"))) == 9
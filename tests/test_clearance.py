@@ -0,0 +1,68 @@
+"""Clearance cache: homepage cookies reused across creates."""
+
+from __future__ import annotations
+
+import pytest
+
+from tema import core
+from tema.clearance import load_clearance, restore_clearance, save_clearance
+from tema.hooks import Profile
+from tema.state import get_store
+from tema.testing import FakeProviderServer
+
+from .conftest import MemoryProvider
+
+pytest.importorskip("curl_cffi")
+
+
+def _homepage_loads(prof: Profile, fake: FakeProviderServer) -> int:
+    return sum(1 for e in prof.events if e.get("url") == f"{fake.url}/emailnator")
+
+
+def test_homepage_loaded_once(memory: MemoryProvider) -> None:
+    with FakeProviderServer() as fake, fake.patched(), Profile() as prof:
+        for _ in range(3):
+            core.create_email("gmail", provider_name="emailnator")
+    assert _homepage_loads(prof, fake) == 1
+    assert load_clearance("emailnator", ["XSRF-TOKEN"])
+
+
+def _cookie(name: str, value: str, domain: str = "127.0.0.1") -> dict[str, str]:
+    return {"name": name, "value": value, "domain": domain, "path": "/"}
+
+
+def test_rejected_clearance_is_reloaded(memory: MemoryProvider) -> None:
+    forged = [_cookie("XSRF-TOKEN", "forged")]
+    get_store().save_clearance("emailnator", forged, 2e9)
+    with FakeProviderServer() as fake, fake.patched(), Profile() as prof:
+        state = core.create_email("gmail", provider_name="emailnator")
+    assert state["email"]
+    assert _homepage_loads(prof, fake) == 1
+    assert load_clearance("emailnator") != forged
+
+
+def test_incomplete_or_expired_clearance_is_ignored(memory: MemoryProvider) -> None:
+    get_store().save_clearance("emailnator", [_cookie("other", "x")], 2e9)
+    assert load_clearance("emailnator", ["XSRF-TOKEN"]) is None
+    get_store().save_clearance("emailnator", [_cookie("XSRF-TOKEN", "t")], 1.0)
+    assert load_clearance("emailnator") is None
+    # name -> value dicts cached by older versions are a miss
+    get_store().save_clearance("emailnator", {"XSRF-TOKEN": "t"}, 2e9)  # type: ignore[arg-type]
+    assert load_clearance("emailnator") is None
+
+
+def test_clearance_keeps_cookie_domains(memory: MemoryProvider) -> None:
+    from curl_cffi import requests as cf
+
+    s = cf.Session()
+    s.cookies.set("sid", "site", domain="smailpro.com", path="/")
+    s.cookies.set("sid", "api", domain="api.sonjj.com", path="/v1")
+    save_clearance("smailpro", s)
+    cookies = load_clearance("smailpro", ["sid"])
+    assert cookies is not None
+    restored = cf.Session()
+    restore_clearance(restored, cookies)
+    assert sorted((c.domain, c.path, c.value) for c in restored.cookies.jar) == [
+        ("api.sonjj.com", "/v1", "api"),
+        ("smailpro.com", "/", "site"),
+    ]
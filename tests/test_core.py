@@ -0,0 +1,302 @@
+"""Core API tests against an in-memory provider."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from tema import cli, core, health
+from tema.cache import get_cache
+from tema.providers import DOMAIN_PROVIDERS, PROVIDERS
+from tema.state import list_states, load_state
+from tests.conftest import MemoryProvider
+
+
+def test_create_email_forced_provider(memory: MemoryProvider) -> None:
+    state = core.create_email(domain="temp", provider_name="memory")
+    assert state["provider"] == "memory"
+    assert core.get_inbox()[1]["email"] == state["email"]
+
+
+def test_wait_for_messages_async(memory: MemoryProvider) -> None:
+    states = [memory.create("temp") for _ in range(5)]
+    results = asyncio.run(
+        core.wait_for_messages_async(states, timeout=5, poll_interval=0.01)
+    )
+    assert [r and r["id"] for r in results] == ["1"] * 5
+    assert results[0] is not None
+    assert states[0]["email"] in results[0]["html"]
+
+
+class FlakyProvider(MemoryProvider):
+    """Inbox calls fail for one mailbox."""
+
+    def inbox(self, state: dict[str, Any]) -> list[dict[str, str]]:
+        if state["email"] == "user1@memory.test":
+            raise RuntimeError("inbox down")
+        return super().inbox(state)
+
+
+def test_wait_for_messages_async_isolates_failures(
+    memory: MemoryProvider, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setitem(PROVIDERS, "memory", FlakyProvider())
+    flaky = PROVIDERS["memory"]
+    states = [flaky.create("temp") for _ in range(3)]
+    results = asyncio.run(
+        core.wait_for_messages_async(states, timeout=5, poll_interval=0.01)
+    )
+    assert [r and r["id"] for r in results] == ["1", None, "1"]
+
+
+class BrokenProvider(MemoryProvider):
+    name = "broken"
+
+    def create(self, domain: str) -> dict[str, Any]:
+        raise RuntimeError("create down")
+
+
+def test_create_email_async_falls_back(
+    memory: MemoryProvider, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setitem(DOMAIN_PROVIDERS, "temp", ["broken", "memory"])
+    monkeypatch.setitem(PROVIDERS, "broken", BrokenProvider())
+    state = asyncio.run(core.create_email_async(domain="temp"))
+    assert state["provider"] == "memory"
+    assert load_state()["email"] == state["email"]
+    with pytest.raises(RuntimeError, match="create down"):
+        asyncio.run(core.create_email_async(domain="temp", provider_name="broken"))
+
+
+class RecoveredProvider(MemoryProvider):
+    name = "recovered"
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_half_open_primary_gets_its_probe(
+    memory: MemoryProvider, monkeypatch: pytest.MonkeyPatch, bulk: bool
+) -> None:
+    monkeypatch.setitem(DOMAIN_PROVIDERS, "temp", ["recovered", "memory"])
+    monkeypatch.setitem(PROVIDERS, "recovered", RecoveredProvider())
+    for _ in range(health.BREAKER_THRESHOLD):
+        health.record_failure("recovered", 1.0)
+    monkeypatch.setattr(health, "BREAKER_COOLDOWN", 0.2)
+    time.sleep(0.25)
+    if bulk:
+        (state,) = core.create_emails(1, domain="temp")
+    else:
+        state = core.create_email(domain="temp")
+    assert state["provider"] == "recovered"
+    assert health.provider_health()["recovered"]["state"] == "closed"
+
+
+class SlowProvider(MemoryProvider):
+    name = "slow"
+
+    def create(self, domain: str) -> dict[str, Any]:
+        time.sleep(2)
+        return super().create(domain)
+
+
+def test_create_email_hedged(
+    memory: MemoryProvider, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setitem(PROVIDERS, "slow", SlowProvider())
+    monkeypatch.setitem(DOMAIN_PROVIDERS, "temp", ["slow", "memory"])
+    start = time.monotonic()
+    state = core.create_email(domain="temp", hedge=0.05)
+    assert state["provider"] == "memory"
+    assert time.monotonic() - start < 1
+    with pytest.raises(ValueError, match="hedge"):
+        core.create_email(domain="temp", hedge=-1)
+
+
+def test_message_body_is_cached(memory: MemoryProvider) -> None:
+    core.create_email(domain="temp", provider_name="memory")
+    first = core.get_message_body("1")
+    assert core.get_message_body("1") == first
+    assert memory.fetches == 1
+
+
+def test_message_stream_caches_only_complete_bodies(memory: MemoryProvider) -> None:
+    core.create_email(domain="temp", provider_name="memory")
+    stream = core.message_stream("1")
+    next(stream)
+    stream.close()
+    assert core.get_message_body("1") == "".join(core.message_stream("1"))
+    assert memory.fetches == 2
+
+
+def test_wait_extracts_code(memory: MemoryProvider) -> None:
+    memory.bodies["1"] = (
+        "<p>Your code is 482913</p>"
+        '<a href="https://example.com/verify?t=9">Confirm your email</a>'
+    )
+    core.create_email(domain="temp", provider_name="memory")
+    msg = core.wait_for_message(timeout=5, poll_interval=0.01, extract="code")
+    assert msg is not None and msg["code"] == "482913"
+    core.create_email(domain="temp", provider_name="memory")
+    msg = core.wait_for_message(timeout=5, poll_interval=0.01, extract="link")
+    assert msg is not None and msg["link"] == "https://example.com/verify?t=9"
+    with pytest.raises(ValueError):
+        core.wait_for_message(timeout=1, extract="otp")
+
+
+class BulkProvider(MemoryProvider):
+    name = "bulk"
+    bulk_bodies = True
+
+    def inbox_with_bodies(self, state: dict[str, Any]) -> list[dict[str, str]]:
+        messages = self.inbox(state)
+        for m in messages:
+            m["html"] = f"<p>bulk {m['id']}</p>"
+        return messages
+
+
+def test_bulk_bodies_skip_message_calls(
+    memory: MemoryProvider, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    bulk = BulkProvider(arrive_after=0)
+    monkeypatch.setitem(PROVIDERS, "bulk", bulk)
+    core.create_email(domain="temp", provider_name="bulk")
+    messages, state = core.get_inbox()
+    assert "html" not in messages[0]
+    assert core.get_message_body(messages[0]["id"], state) == "<p>bulk 1</p>"
+    assert bulk.fetches == 0
+
+
+def test_bulk_bodies_are_cached_once(
+    memory: MemoryProvider, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setitem(PROVIDERS, "bulk", BulkProvider(arrive_after=0))
+    core.create_email(domain="temp", provider_name="bulk")
+    puts = []
+    cache = get_cache()
+    assert cache is not None
+    put = cache.put
+    monkeypatch.setattr(cache, "put", lambda *a: puts.append(a[2]) or put(*a))
+    for _ in range(3):
+        core.get_inbox()
+    assert puts == ["1"]
+
+
+def test_watch_yields_each_message_once(memory: MemoryProvider) -> None:
+    memory.arrive_after = 0
+    state = core.create_email(domain="temp", provider_name="memory")
+    assert list(core.watch(timeout=0)) == []  # existing "1" is skipped
+    memory.deliver(state["email"], "2")
+    memory.deliver(state["email"], "3")
+    assert [m["id"] for m in core.watch(timeout=0)] == ["2", "3"]
+    assert list(core.watch(timeout=0)) == []
+
+
+def test_watch_redelivers_message_the_consumer_failed_on(
+    memory: MemoryProvider,
+) -> None:
+    state = core.create_email(domain="temp", provider_name="memory")
+    list(core.watch(timeout=0))
+    memory.deliver(state["email"], "2")
+    for _ in core.watch(timeout=0):
+        break  # e.g. the write to a disconnected client failed
+    assert [m["id"] for m in core.watch(timeout=0)] == ["2"]
+
+
+class PacedProvider(MemoryProvider):
+    """Takes `delay` per create and tracks how many run at once."""
+
+    def __init__(self, name: str, delay: float = 0.05, fail: bool = False) -> None:
+        super().__init__()
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.created = 0
+        self.running = self.peak = 0
+        self.lock = threading.Lock()
+
+    def create(self, domain: str) -> dict[str, Any]:
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+            if self.fail:
+                raise RuntimeError("down")
+            self.created += 1
+            email = f"{self.name}{self.created}@memory.test"
+        return {"email": email, "provider": self.name, "domain": domain}
+
+
+def test_create_emails_spreads_across_chain(
+    memory: MemoryProvider, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    broken, a, b = (
+        PacedProvider("broken", fail=True),
+        PacedProvider("a"),
+        PacedProvider("b"),
+    )
+    for p in (broken, a, b):
+        monkeypatch.setitem(PROVIDERS, p.name, p)
+    monkeypatch.setitem(DOMAIN_PROVIDERS, "temp", ["broken", "a", "b"])
+    states = list(
+        core.create_emails(12, domain="temp", concurrency=6, max_per_provider=2)
+    )
+    assert len({s["email"] for s in states}) == 12
+    assert a.created and b.created
+    assert max(a.peak, b.peak, broken.peak) <= 2
+    assert len(list_states(domain="temp")) == 12
+    assert load_state() is None  # bulk mailboxes never become active
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"count": 0},
+        {"count": -2},
+        {"concurrency": 0},
+        {"max_per_provider": 0},
+        {"max_per_provider": {"memory": 0}},
+    ],
+)
+def test_create_emails_rejects_limits_that_would_hang(
+    memory: MemoryProvider, kwargs: dict[str, Any]
+) -> None:
+    args = {"count": 2, "domain": "temp", **kwargs}
+    with pytest.raises(ValueError):
+        core.create_emails(**args)
+
+
+def test_cli_rejects_hedge_with_bulk_create(
+    memory: MemoryProvider, capsys: pytest.CaptureFixture[str]
+) -> None:
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["create", "-d", "gmail", "-n", "3", "--hedge", "1"])
+    assert exc.value.code == 2
+    assert "--hedge cannot be combined with -n" in capsys.readouterr().err
+
+
+class BatchProvider(PacedProvider):
+    batch_size = 5
+
+    def __init__(self) -> None:
+        super().__init__("batch", delay=0.01)
+        self.calls = 0
+
+    def create_many(self, domain: str, count: int) -> list[dict[str, Any]]:
+        self.calls += 1
+        return [self.create(domain) for _ in range(min(count, 3))]
+
+
+def test_create_emails_harvests_batches(
+    memory: MemoryProvider, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    batch = BatchProvider()
+    monkeypatch.setitem(PROVIDERS, "batch", batch)
+    monkeypatch.setitem(DOMAIN_PROVIDERS, "temp", ["batch"])
+    states = list(core.create_emails(10, domain="temp", concurrency=2))
+    assert len({s["email"] for s in states}) == 10
+    assert batch.calls == 4  # 3 per call, whatever it falls short is re-queued
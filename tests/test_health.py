@@ -0,0 +1,71 @@
+"""Provider health and circuit breaker tests."""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pytest
+
+from tema import health
+
+
+@pytest.fixture(autouse=True)
+def store_path(monkeypatch: pytest.MonkeyPatch, tmp_path: Any) -> None:
+    monkeypatch.setattr("tema.state.STATE_DB", tmp_path / "state.db")
+
+
+def test_breaker_opens_after_repeated_failures(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    for _ in range(health.BREAKER_THRESHOLD):
+        health.record_failure("emailnator", 20.0)
+    assert health.provider_health()["emailnator"]["state"] == "open"
+    assert health.order_providers(["emailnator", "emailmux"]) == ["emailmux"]
+    # Every provider open: fall back to the static chain
+    assert health.order_providers(["emailnator"]) == ["emailnator"]
+
+    monkeypatch.setattr(health, "BREAKER_COOLDOWN", -1)
+    assert health.provider_health()["emailnator"]["state"] == "half-open"
+    assert "emailnator" in health.order_providers(["emailnator", "emailmux"])
+    health.record_success("emailnator", 1.0)
+    assert health.provider_health()["emailnator"]["state"] == "closed"
+
+
+def test_order_prefers_healthy_providers() -> None:
+    chain = ["emailnator", "emailmux"]
+    assert "emailnator" in health.order_providers(chain)
+    health.record_success("emailmux", 1.0)
+    health.record_failure("emailnator", 20.0)
+    assert health.order_providers(chain) == ["emailmux", "emailnator"]
+
+
+def test_half_open_admits_one_probe(monkeypatch: pytest.MonkeyPatch) -> None:
+    chain = ["emailnator", "emailmux"]
+    for _ in range(health.BREAKER_THRESHOLD):
+        health.record_failure("emailnator", 1.0)
+    monkeypatch.setattr(health, "BREAKER_COOLDOWN", 0.3)
+    time.sleep(0.35)
+    # Half-open goes first, so its probe is sent before any fallback
+    assert health.order_providers(chain) == chain
+    barrier = threading.Barrier(8)
+
+    def admit() -> bool:
+        barrier.wait()
+        return health.admit("emailnator")
+
+    with ThreadPoolExecutor(8) as ex:
+        admitted = list(ex.map(lambda _: admit(), range(8)))
+    assert admitted.count(True) == 1
+    assert health.provider_health()["emailnator"]["state"] == "open"
+    assert health.order_providers(chain) == ["emailmux"]
+    # A failed probe reopens the breaker for another cooldown
+    health.record_failure("emailnator", 1.0)
+    assert health.order_providers(chain) == ["emailmux"]
+    time.sleep(0.35)
+    assert health.admit("emailnator")
+    health.record_success("emailnator", 1.0)
+    assert all(health.admit("emailnator") for _ in range(3))
+    assert "emailnator" in health.order_providers(chain)
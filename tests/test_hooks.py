@@ -0,0 +1,65 @@
+"""Instrumentation hook tests."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import requests
+
+from tema import core, hooks
+from tema.testing import FakeProviderServer, make_inbox
+
+from .conftest import MemoryProvider
+
+
+def test_profile_attributes_http_calls_to_ops(memory: MemoryProvider) -> None:
+    with FakeProviderServer(make_inbox(1, 256)) as fake, fake.patched():
+        with hooks.Profile() as prof:
+            st = core.create_email("edu", provider_name="etempmail")
+            core.get_inbox(st["email"])
+    summary = prof.summary()
+    ops = [(op["name"], op["parent"]) for op in summary["ops"]]
+    assert ops == [
+        ("provider_create", "create_email"),
+        ("create_email", None),
+        ("get_inbox", None),
+    ]
+    calls = [(h["op"], h["method"], h["phase"], h["status"]) for h in summary["http"]]
+    assert calls == [
+        ("provider_create", "POST", "/etempmail/getEmailAddress", 200),
+        ("get_inbox", "POST", "/etempmail/getInbox", 200),
+    ]
+    assert summary["http"][1]["bytes"] > 0
+    assert summary["phases"]["etempmail POST /etempmail/getInbox"]["count"] == 1
+
+
+def test_failing_hook_does_not_break_calls(memory: MemoryProvider) -> None:
+    seen: list[dict[str, Any]] = []
+
+    def broken(event: dict[str, Any]) -> None:
+        seen.append(event)
+        raise RuntimeError("tracer down")
+
+    hooks.add_hook(broken)
+    try:
+        core.create_email("temp", provider_name="memory")
+    finally:
+        hooks.remove_hook(broken)
+    assert [e["name"] for e in seen] == ["provider_create", "create_email"]
+    assert seen[0]["provider"] == "memory"
+
+
+def test_http_event_leaves_streamed_bodies_alone() -> None:
+    class Unread:
+        def read(self, *args: Any, **kwargs: Any) -> bytes:
+            raise AssertionError("streamed body was downloaded")
+
+        stream = read
+
+    r = requests.Response()
+    r.status_code = 200
+    r.raw = Unread()  # _content stays False until someone reads .content
+    event = hooks._http_event("p", "GET", "http://x/y", 0.0, r, None, 1)
+    assert event["bytes"] is None
+    r._content = b"abc"
+    assert hooks._http_event("p", "GET", "http://x/y", 0.0, r, None, 1)["bytes"] == 3
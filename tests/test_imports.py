@@ -0,0 +1,42 @@
+"""Import-cost tests: the CLI must not pull in HTTP stacks at startup."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = str(Path(__file__).resolve().parents[1] / "src")
+HEAVY = ("requests", "curl_cffi", "asyncio", "tema.providers.emailnator")
+
+
+def _probe(code: str) -> dict[str, bool]:
+    env = {**os.environ, "PYTHONPATH": SRC}
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=env
+    )
+    assert out.returncode == 0, out.stderr
+    return json.loads(out.stdout)
+
+
+def test_cli_import_is_lazy() -> None:
+    loaded = _probe(
+        "import json, sys, tema.cli\n"
+        f"print(json.dumps({{m: m in sys.modules for m in {HEAVY!r}}}))"
+    )
+    assert not any(loaded.values()), loaded
+
+
+def test_registry_loads_provider_on_first_access() -> None:
+    loaded = _probe(
+        "import json, sys\n"
+        "from tema import PROVIDERS\n"
+        "before = 'tema.providers.emailnator' in sys.modules\n"
+        "name = PROVIDERS['emailnator'].name\n"
+        "after = 'tema.providers.emailnator' in sys.modules\n"
+        "others = 'tema.providers.burner' in sys.modules\n"
+        "print(json.dumps({'before': before, 'after': after, 'others': others}))"
+    )
+    assert loaded == {"before": False, "after": True, "others": False}
@@ -0,0 +1,53 @@
+"""Deadlines and retries for provider calls, against the fake server."""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from tema import core
+from tema.hooks import Profile
+from tema.policy import DeadlineExceeded, Policy, apply_policy, remaining
+from tema.testing import FakeProviderServer, make_inbox
+
+from .conftest import MemoryProvider
+
+
+def test_retries_ride_out_server_errors(memory: MemoryProvider) -> None:
+    policy = Policy(retries=8, backoff=0.001)
+    with FakeProviderServer(make_inbox(2, 64), error_rate=0.5, seed=3) as fake:
+        with fake.patched(), Profile() as prof:
+            core.create_email("temp", provider_name="burner", policy=policy)
+            messages, state = core.get_inbox(policy=policy)
+            body = core.get_message_body(messages[0]["id"], state, policy=policy)
+    assert fake.errors["burner"] > 0
+    assert body
+    assert max(e["attempt"] for e in prof.events if e["type"] == "http") > 1
+
+
+def test_deadline_bounds_slow_provider(memory: MemoryProvider) -> None:
+    with FakeProviderServer(latency=1.0) as fake, fake.patched():
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            core.create_email(
+                "temp", provider_name="burner", policy=Policy(deadline=0.2)
+            )
+        assert time.monotonic() - start < 0.8
+
+
+def test_deadline_shortens_wait(memory: MemoryProvider) -> None:
+    memory.arrive_after = 1000
+    core.create_email("temp", provider_name="memory")
+    start = time.monotonic()
+    msg = core.wait_for_message(60, 0.01, policy=Policy(deadline=0.2))
+    assert msg is None
+    assert time.monotonic() - start < 1
+
+
+def test_nested_policy_keeps_outer_deadline() -> None:
+    assert remaining() is None
+    with apply_policy(Policy(deadline=1)):
+        with apply_policy(Policy(deadline=60, retries=2)):
+            left = remaining()
+            assert left is not None and left <= 1
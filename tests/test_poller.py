@@ -0,0 +1,79 @@
+"""Multiplexed poller tests."""
+
+from __future__ import annotations
+
+import heapq
+import time
+from typing import Any
+
+import pytest
+
+from tema import poller
+from tema.poller import Poller, wait_for_messages
+from tema.providers import PROVIDERS
+from tests.conftest import MemoryProvider
+
+
+def test_wait_for_many_mailboxes(memory: MemoryProvider) -> None:
+    memory.arrive_after = 2
+    states = [memory.create("temp") for _ in range(20)]
+    results = wait_for_messages(
+        states, timeout=5, poll_interval=0.01, max_per_provider=2
+    )
+    assert all(r is not None and r["id"] == "1" for r in results)
+    assert results[3] is not None
+    assert states[3]["email"] in results[3]["html"]
+
+
+def test_predicate_and_deadline(memory: MemoryProvider) -> None:
+    memory.arrive_after = 1
+    state = memory.create("temp")
+    got = []
+    with Poller(poll_interval=0.01) as poller:
+        fut = poller.register(
+            state,
+            timeout=0.2,
+            predicate=lambda m: m["subject"] == "never",
+            callback=got.append,
+        )
+        assert fut.result(timeout=5) is None
+    assert got == [None]
+
+
+class SlowInbox(MemoryProvider):
+    """Each inbox call takes a while, keeping the provider saturated."""
+
+    def inbox(self, state: dict[str, Any]) -> list[dict[str, str]]:
+        time.sleep(0.3)
+        return super().inbox(state)
+
+
+def test_saturated_provider_does_not_spin(
+    memory: MemoryProvider, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    slow = SlowInbox(arrive_after=1)
+    monkeypatch.setitem(PROVIDERS, "memory", slow)
+    pushes = []
+    push = heapq.heappush
+    monkeypatch.setattr(
+        poller.heapq, "heappush", lambda h, e: pushes.append(e) or push(h, e)
+    )
+    states = [slow.create("temp") for _ in range(2)]
+    results = wait_for_messages(
+        states, timeout=5, poll_interval=0.01, max_per_provider=1
+    )
+    assert all(r is not None for r in results)
+    # Four polls, each scheduled once; the waiting mailbox is requeued at
+    # most once per finished poll instead of every 0.1s
+    assert len(pushes) <= 4 + 4
+
+
+def test_cancelled_registration_skips_callback(
+    memory: MemoryProvider, caplog: pytest.LogCaptureFixture
+) -> None:
+    got = []
+    with Poller(poll_interval=10) as p:
+        fut = p.register(memory.create("temp"), timeout=10, callback=got.append)
+        assert fut.cancel()
+    assert got == []
+    assert not caplog.records
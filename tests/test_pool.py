@@ -0,0 +1,74 @@
+"""Mailbox pool tests."""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from tema import cli, pool
+from tema.hooks import Profile
+from tema.state import get_store, load_state
+from tema.testing import FakeProviderServer
+from tests.conftest import MemoryProvider
+
+
+def test_fill_take_stats(memory: MemoryProvider) -> None:
+    assert pool.fill_pool(domain="temp", count=3, provider_name="memory") == 3
+    assert pool.pool_stats()["domains"]["temp"]["ready"] == 3
+
+    state = pool.take_from_pool(domain="temp")
+    assert state is not None
+    assert load_state() == state
+    assert pool.pool_stats()["domains"]["temp"]["ready"] == 2
+    assert pool.take_from_pool(domain="gmail") is None
+
+
+def test_stale_entries_expire(memory: MemoryProvider) -> None:
+    pool.fill_pool(domain="temp", count=2, provider_name="memory")
+    assert pool.pool_stats(max_age=-1)["domains"]["temp"]["expired"] == 2
+    assert pool.take_from_pool(domain="temp", max_age=-1) is None
+    assert pool.pool_stats()["total"] == 0
+
+
+def test_fill_harvests_emailnator_batches(memory: MemoryProvider) -> None:
+    pytest.importorskip("curl_cffi")
+    with FakeProviderServer() as fake, fake.patched(), Profile() as prof:
+        assert (
+            pool.fill_pool(domain="gmail", count=12, provider_name="emailnator") == 12
+        )
+    generates = [
+        e for e in prof.events if e.get("phase") == "/emailnator/generate-email"
+    ]
+    assert len(generates) == 2  # batches of 10 + 2, one homepage load
+    emails = {m["email"] for m in get_store().pool_entries()}
+    assert len(emails) == 12
+
+
+def test_exclusive_fills_do_not_overlap(memory: MemoryProvider) -> None:
+    store = get_store()
+    assert store.pool_claim_fill("temp", time.time(), 600)  # a running refill
+    assert pool.fill_pool("temp", 3, "memory", exclusive=True) == 0
+    assert pool.fill_pool("temp", 1, "memory") == 1  # explicit fills still run
+    store.pool_release_fill("temp")
+    assert pool.fill_pool("temp", 2, "memory", exclusive=True) == 2
+    assert pool.pool_stats()["domains"]["temp"]["ready"] == 3
+    # A refill that died without releasing stops blocking after the lease
+    assert store.pool_claim_fill("temp", time.time() - 601, 600)
+    assert pool.fill_pool("temp", 1, "memory", exclusive=True) == 1
+
+
+def test_take_below_low_starts_an_exclusive_refill(
+    memory: MemoryProvider, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    spawned: list[list[str]] = []
+    monkeypatch.setattr(
+        "tema.cli.subprocess.Popen", lambda argv, **kw: spawned.append(argv)
+    )
+    pool.fill_pool(domain="temp", count=2, provider_name="memory")
+    for _ in range(2):
+        cli.main(["pool", "take", "-d", "temp", "--low", "3", "--target", "5"])
+    assert [argv[3:] for argv in spawned] == [
+        ["pool", "fill", "--exclusive", "-d", "temp", "-n", "4"],
+        ["pool", "fill", "--exclusive", "-d", "temp", "-n", "5"],
+    ]
@@ -0,0 +1,66 @@
+"""Shared token-bucket rate limits."""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from tema import core
+from tema.policy import DeadlineExceeded, Policy
+from tema.ratelimit import RateLimiter, _resolve_rate_db, parse_limits
+from tema.testing import FakeProviderServer
+
+from .conftest import MemoryProvider
+
+
+def test_parse_limits() -> None:
+    assert parse_limits("a=2:10, b=0.5,c=0") == {"a": (2.0, 10.0), "b": (0.5, 1.0)}
+    with pytest.raises(ValueError):
+        parse_limits("a=fast")
+
+
+def test_bucket_is_shared_through_the_file(tmp_path: Path) -> None:
+    limits = {"p": (10.0, 2.0)}
+    one = RateLimiter(tmp_path / "rate.db", limits)
+    other = RateLimiter(tmp_path / "rate.db", limits)  # e.g. another process
+    assert one.reserve("p") == 0
+    assert other.reserve("p") == 0
+    assert one.reserve("p") == pytest.approx(0.1, abs=0.02)
+    assert other.reserve("p") == pytest.approx(0.2, abs=0.02)
+    assert one.reserve("p", max_wait=0.1) == float("inf")  # nothing taken
+    assert one.reserve("unlimited") == 0
+
+
+def test_rate_db_is_per_user(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("TEMA_RATE_DB", raising=False)
+    if hasattr(os, "getuid"):
+        assert _resolve_rate_db().name == f"tema_ratelimit_{os.getuid()}.db"
+    monkeypatch.setenv("TEMA_RATE_DB", "/elsewhere/rate.db")
+    assert _resolve_rate_db() == Path("/elsewhere/rate.db")
+
+
+def test_unusable_rate_db_fails_open(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    (tmp_path / "rate.db").mkdir()  # a directory where the file should be
+    limiter = RateLimiter(tmp_path / "rate.db", {"p": (0.1, 1.0)})
+    assert [limiter.reserve("p") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert capsys.readouterr().err.count("rate limits off") == 1
+    (tmp_path / "rate.db").rmdir()
+    assert limiter.reserve("p") == 0.0  # recovers once the file is usable
+    assert limiter.reserve("p") > 1
+
+
+def test_rate_wait_counts_against_deadline(
+    memory: MemoryProvider, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("tema.ratelimit.RATE_LIMITS", {"burner": (0.2, 1.0)})
+    with FakeProviderServer() as fake, fake.patched():
+        core.create_email("temp", provider_name="burner")
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            core.get_inbox(policy=Policy(deadline=1))
+        assert time.monotonic() - start < 0.5
@@ -0,0 +1,48 @@
+"""Adaptive poll schedule tests."""
+
+from __future__ import annotations
+
+import itertools
+from typing import Any
+
+import pytest
+
+from tema import schedule
+
+
+@pytest.fixture(autouse=True)
+def store_path(monkeypatch: pytest.MonkeyPatch, tmp_path: Any) -> None:
+    monkeypatch.setattr("tema.state.STATE_DB", tmp_path / "state.db")
+
+
+def test_sender_domain() -> None:
+    assert schedule.sender_domain("Foo <No-Reply@Mail.Foo.com>") == "mail.foo.com"
+    assert schedule.sender_domain("nobody") == ""
+    assert schedule.sender_domain("Mail.Foo.com.") == "mail.foo.com"
+
+
+def test_domain_only_sender_uses_its_history() -> None:
+    for s in (40, 42, 44, 46, 48, 50):
+        schedule.record_arrival("burner", "x@slow.example", s)
+    for s in (1, 1, 1, 1, 1, 1):
+        schedule.record_arrival("burner", "Mailer Daemon", s)  # no domain
+    first = [next(schedule.poll_schedule("burner", s)) for s in ("slow.example", "?")]
+    assert first[0] == next(schedule.poll_schedule("burner", "y@slow.example"))
+    assert first[0] == 15  # the slow sender's history, not the fast unparsed one
+    # An unparsable sender is no filter: all of the provider's history
+    assert first[1] == next(schedule.poll_schedule("burner"))
+
+
+def test_fixed_interval_is_classic_backoff() -> None:
+    delays = list(itertools.islice(schedule.poll_schedule("burner", None, 5), 3))
+    assert delays == pytest.approx([5, 6.5, 8.45])
+
+
+def test_schedule_follows_history() -> None:
+    for s in (40, 42, 44, 46, 48, 50):
+        schedule.record_arrival("burner", "x@slow.example", s)
+    delays = schedule.poll_schedule("burner", "y@slow.example")
+    times = list(itertools.accumulate(itertools.islice(delays, 10)))
+    # Sparse (15s steps) before the earliest observed arrival, dense around it
+    assert times[:3] == pytest.approx([15, 30, 40])
+    assert sum(1 for t in times if 40 <= t <= 50) >= 4
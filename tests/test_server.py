@@ -0,0 +1,186 @@
+"""`tema serve` daemon and the thin client, over a real Unix socket."""
+
+from __future__ import annotations
+
+import functools
+import json
+import socket
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from tema import client, core, server
+from tema.providers import DOMAIN_PROVIDERS
+from tests.conftest import MemoryProvider
+
+
+@pytest.fixture
+def daemon(
+    memory: MemoryProvider, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> Path:
+    monkeypatch.setitem(DOMAIN_PROVIDERS, "temp", ["memory"])
+    # serve() swaps in its output routers; put pytest's streams back afterwards
+    monkeypatch.setattr(sys, "stdout", sys.stdout)
+    monkeypatch.setattr(sys, "stderr", sys.stderr)
+    path = tmp_path / "tema.sock"
+    threading.Thread(target=server.serve, args=(path,), daemon=True).start()
+    deadline = time.monotonic() + 5
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return path
+
+
+def _run(path: Path, *argv: str) -> tuple[int, str, str]:
+    out = {"stdout": "", "stderr": ""}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(path))
+        f = sock.makefile("rwb")
+        f.write(json.dumps({"argv": list(argv), **client._context()}).encode() + b"\n")
+        f.flush()
+        for line in f:
+            frame: dict[str, Any] = json.loads(line)
+            if "exit" in frame:
+                return frame["exit"], out["stdout"], out["stderr"]
+            for k, v in frame.items():
+                out[k] += v
+    raise AssertionError("no exit frame")
+
+
+def test_daemon_runs_cli_commands(daemon: Path) -> None:
+    code, out, _ = _run(daemon, "create", "-d", "temp", "-p", "memory")
+    assert code == 0
+    assert json.loads(out)["provider"] == "memory"
+    code, out, _ = _run(daemon, "wait", "--timeout", "5", "--interval", "0.01")
+    assert code == 0
+    assert json.loads(out)["id"] == "1"
+    code, _, err = _run(daemon, "create", "-d", "nope")
+    assert code == 2
+    assert "invalid choice" in err
+
+
+def test_daemon_serves_clients_concurrently(daemon: Path) -> None:
+    _run(daemon, "create", "-d", "temp", "-p", "memory")
+    with ThreadPoolExecutor(4) as ex:
+        waits = [
+            ex.submit(_run, daemon, "wait", "--timeout", "1", "--interval", "0.05")
+            for _ in range(3)
+        ]
+        start = time.monotonic()
+        code, out, _ = ex.submit(_run, daemon, "domains").result()
+        assert time.monotonic() - start < 0.5
+        assert code == 0
+        assert "temp" in json.loads(out)
+        assert all(w.result()[0] in (0, 1) for w in waits)
+
+
+def test_disconnect_stops_watch_without_losing_messages(
+    daemon: Path, memory: MemoryProvider, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(
+        "tema.cli.watch", functools.partial(core.watch, poll_interval=0.02)
+    )
+    _, out, _ = _run(daemon, "create", "-d", "temp", "-p", "memory")
+    email = json.loads(out)["email"]
+    memory.arrive_after = 10**6  # only delivered messages show up
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(daemon))
+        request = {"argv": ["watch"], **client._context()}
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        deadline = time.monotonic() + 5
+        while memory.polls[email] < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert memory.polls[email] >= 3
+    time.sleep(0.2)  # let the daemon notice the hangup
+    polls = memory.polls[email]
+    memory.deliver(email, "2")
+    time.sleep(0.2)
+    assert memory.polls[email] == polls  # the orphaned watch stopped
+    code, out, _ = _run(daemon, "watch", "--timeout", "1")
+    assert code == 0
+    assert [json.loads(line)["id"] for line in out.splitlines()] == ["2"]
+
+
+def test_daemon_declines_other_settings(
+    daemon: Path, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    assert client.run_remote(["domains"], daemon) == 0
+    monkeypatch.setenv("TEMA_STATE_DB", str(tmp_path / "other.db"))
+    assert client.run_remote(["mailboxes"], daemon) is None
+    monkeypatch.delenv("TEMA_STATE_DB")
+    monkeypatch.chdir(tmp_path)
+    assert client.run_remote(["mailboxes"], daemon) is None
+
+
+def test_http_endpoint_rejects_cross_site_requests(
+    memory: MemoryProvider, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(sys, "stdout", sys.stdout)
+    monkeypatch.setattr(sys, "stderr", sys.stderr)
+    with socket.socket() as probe:  # a free port
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    threading.Thread(
+        target=server.serve, args=(tmp_path / "tema.sock", port), daemon=True
+    ).start()
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            break
+        except OSError:
+            time.sleep(0.01)
+
+    def post(headers: dict[str, str]) -> int:
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{port}/run",
+            data=json.dumps({"argv": ["domains"]}).encode(),
+            headers=headers,
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=5) as r:
+                return int(r.status)
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    assert post({"Content-Type": "application/json"}) == 200
+    assert post({"Content-Type": "text/plain"}) == 415  # a form or fetch()
+    assert post({"Content-Type": "application/json", "Host": "evil.test"}) == 403
+
+
+@pytest.mark.parametrize(
+    ("argv", "code"),
+    [(["watch"], 0), (["-e", "watch", "--deadline", "5", "watch"], 0), (["wait"], 130)],
+)
+def test_client_ctrl_c_exits_quietly(
+    argv: list[str],
+    code: int,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    def interrupted(argv: list[str]) -> int:
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(client, "run_remote", interrupted)
+    monkeypatch.setattr(sys, "argv", ["tema", *argv])
+    with pytest.raises(SystemExit) as exit:
+        client.main()
+    assert exit.value.code == code
+    assert capsys.readouterr().err == ""
+
+
+def test_client_falls_back_without_daemon(tmp_path: Path) -> None:
+    assert client.run_remote(["domains"], tmp_path / "missing.sock") is None
+    (tmp_path / "stale.sock").touch()
+    assert client.run_remote(["domains"], tmp_path / "stale.sock") is None
+
+
+def test_second_daemon_refuses(daemon: Path) -> None:
+    with pytest.raises(RuntimeError, match="already running"):
+        server.serve(daemon)
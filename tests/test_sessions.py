@@ -0,0 +1,53 @@
+"""Session pool tests."""
+
+from __future__ import annotations
+
+from tema.sessions import SessionPool
+
+
+class _FakeSession:
+    def __init__(self) -> None:
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_lease_reuses_session() -> None:
+    pool = SessionPool()
+    with pool.lease(("p", "a@x"), _FakeSession) as s1:
+        pass
+    with pool.lease(("p", "a@x"), _FakeSession) as s2:
+        pass
+    assert s1 is s2
+    assert not s1.closed
+
+
+def test_lease_drops_session_on_error() -> None:
+    pool = SessionPool()
+    try:
+        with pool.lease(("p", "a@x"), _FakeSession) as s1:
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert s1.closed
+    assert len(pool) == 0
+
+
+def test_size_cap_evicts_least_recent() -> None:
+    pool = SessionPool(max_size=2)
+    sessions = [_FakeSession() for _ in range(3)]
+    for i, s in enumerate(sessions):
+        pool.put(("p", str(i)), s)
+    assert len(pool) == 2
+    assert sessions[0].closed
+    assert not sessions[2].closed
+
+
+def test_idle_timeout_expires_sessions() -> None:
+    pool = SessionPool(idle_timeout=-1)
+    old = _FakeSession()
+    pool.put(("p", "a@x"), old)
+    with pool.lease(("p", "a@x"), _FakeSession) as s:
+        assert s is not old
+    assert old.closed
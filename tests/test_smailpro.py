@@ -0,0 +1,68 @@
+"""SmailPro create payload prefetching."""
+
+from __future__ import annotations
+
+import base64
+import json
+import time
+from typing import Any
+
+import pytest
+
+from tema import core
+from tema.hooks import Profile
+from tema.providers import PROVIDERS
+from tema.providers.smailpro import PREFETCH, _jwt_expiry, _PayloadQueue
+from tema.testing import FakeProviderServer
+
+from .conftest import MemoryProvider
+
+pytest.importorskip("curl_cffi")
+
+
+@pytest.fixture
+def smailpro(monkeypatch: pytest.MonkeyPatch) -> Any:
+    """The smailpro provider with an empty payload queue, as after startup."""
+    p = PROVIDERS["smailpro"]
+    queue = _PayloadQueue(p._mint, lambda: p.SMAILPRO, PREFETCH)  # type: ignore[attr-defined]
+    monkeypatch.setattr(p, "_payloads", queue)
+    return p
+
+
+def test_jwt_expiry() -> None:
+    claims = base64.urlsafe_b64encode(json.dumps({"exp": 1900000000}).encode())
+    assert _jwt_expiry(f"h.{claims.decode().rstrip('=')}.s") == 1900000000
+    assert _jwt_expiry("opaque") > time.time()
+
+
+def test_prefetched_payload_skips_cloudflare(
+    memory: MemoryProvider, smailpro: Any
+) -> None:
+    smailpro.prefetch()
+    with FakeProviderServer() as fake, fake.patched():
+        core.create_email("edu", provider_name="smailpro")  # cold: mints, then refills
+        deadline = time.monotonic() + 5
+        while smailpro._payloads.take() is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.2)  # let the refill started by take() finish
+        with Profile() as prof:
+            state = core.create_email("edu", provider_name="smailpro")
+    assert state["email"].endswith("edu.pl")
+    phases = [e["phase"] for e in prof.events if e["type"] == "http" and e["op"]]
+    assert phases == ["/sonjj/v1/temp_email/create"]
+
+
+def test_one_shot_create_mints_one_payload(
+    memory: MemoryProvider, smailpro: Any
+) -> None:
+    with FakeProviderServer() as fake, fake.patched():
+        core.create_email("edu", provider_name="smailpro")
+        time.sleep(0.2)  # a stray refill would have minted by now
+    assert [k for k in fake._sessions if k.startswith("jwt")] == ["jwt0"]
+
+
+def test_bulk_create_prefetches(memory: MemoryProvider, smailpro: Any) -> None:
+    with FakeProviderServer() as fake, fake.patched():
+        states = list(core.create_emails(2, "edu", provider_name="smailpro"))
+    assert len(states) == 2
+    assert smailpro._payloads.enabled
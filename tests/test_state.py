@@ -0,0 +1,51 @@
+"""Mailbox store tests."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import pytest
+
+from tema import state as state_mod
+
+
+@pytest.fixture(autouse=True)
+def store_paths(monkeypatch: pytest.MonkeyPatch, tmp_path: Any) -> None:
+    monkeypatch.setattr(state_mod, "STATE_FILE", tmp_path / "state.json")
+    monkeypatch.setattr(state_mod, "STATE_DB", tmp_path / "state.db")
+
+
+def _mailbox(email: str, provider: str = "burner", created_at: int = 0) -> dict:
+    return {
+        "email": email,
+        "provider": provider,
+        "domain": "temp",
+        "cookies": {"sid": "1"},
+        "metadata": {},
+        "created_at": created_at,
+    }
+
+
+def test_save_and_load_active() -> None:
+    assert state_mod.load_state() is None
+    state_mod.save_state(_mailbox("a@x", created_at=1))
+    state_mod.save_state(_mailbox("b@x", created_at=2))
+    assert state_mod.load_state()["email"] == "b@x"
+    assert state_mod.load_state("a@x")["cookies"] == {"sid": "1"}
+
+
+def test_list_and_use() -> None:
+    state_mod.save_state(_mailbox("a@x", "burner", 1))
+    state_mod.save_state(_mailbox("b@x", "privatix", 2))
+    assert [s["email"] for s in state_mod.list_states()] == ["b@x", "a@x"]
+    assert [s["email"] for s in state_mod.list_states(provider="burner")] == ["a@x"]
+    state_mod.use_state("a@x")
+    assert state_mod.load_state()["email"] == "a@x"
+    with pytest.raises(ValueError):
+        state_mod.use_state("missing@x")
+
+
+def test_legacy_json_is_imported() -> None:
+    state_mod.STATE_FILE.write_text(json.dumps(_mailbox("old@x")))
+    assert state_mod.load_state()["email"] == "old@x"
@@ -0,0 +1,55 @@
+"""Fake provider server tests: API shapes, auth, latency and errors."""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+import requests
+
+from tema import core
+from tema.providers import PROVIDERS
+from tema.testing import FakeProviderServer, make_inbox
+
+from .conftest import MemoryProvider
+
+PLAIN = ["burner", "tempmaili", "etempmail"]
+
+
+@pytest.mark.parametrize("name", PLAIN)
+def test_core_roundtrip(memory: MemoryProvider, name: str) -> None:
+    with FakeProviderServer(make_inbox(2, 512)) as fake, fake.patched():
+        st = core.create_email(PROVIDERS[name].domains[0], provider_name=name)
+        messages, _ = core.get_inbox(st["email"])
+        assert [m["id"] for m in messages] == ["m1", "m0"]
+        # Lands after wait_for_message has taken its baseline snapshot
+        msg_id = fake.inject(
+            st["email"], "Your code", "<p>code 424242</p>", after_polls=1
+        )
+        msg = core.wait_for_message(5, 0.01, st["email"], extract="code")
+        assert msg is not None and msg["id"] == msg_id
+        assert msg["code"] == "424242"
+    assert PROVIDERS[name].BASE.startswith("https://")  # type: ignore[attr-defined]
+
+
+def test_auth_is_enforced() -> None:
+    with FakeProviderServer() as fake:
+        assert requests.get(f"{fake.url}/burner/email/x.com/wrong").status_code == 403
+        r = requests.get(f"{fake.url}/privatix/messages")
+        assert r.status_code == 401
+        r = requests.post(f"{fake.url}/emailnator/message-list", json={})
+        assert r.status_code == 419
+
+
+def test_latency_and_error_rate() -> None:
+    latency = {"etempmail": 0.02}
+    with FakeProviderServer(latency=latency, error_rate=0.5, seed=1) as fake:
+        s = requests.Session()
+        start = time.monotonic()
+        statuses = [
+            s.post(f"{fake.url}/etempmail/getEmailAddress").status_code
+            for _ in range(10)
+        ]
+        assert time.monotonic() - start >= 0.2
+        assert 0 < statuses.count(503) < 10
+        assert fake.errors["etempmail"] == statuses.count(503)
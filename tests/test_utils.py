@@ -0,0 +1,144 @@
+"""Link extraction and verification-link ranking tests."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterator
+
+import pytest
+
+from tema.utils import (
+    extract_links,
+    find_code,
+    find_codes,
+    find_verification_link,
+    iter_links,
+    rank_codes,
+    rank_verification_links,
+)
+
+NEWSLETTER = """
+<p>Hi! <a href="https://example.com/blog">Read our blog</a></p>
+<p><a href="https://example.com/t/8f2a">Verify your email address</a></p>
+<p><a href="https://example.com/account?token=abc">here</a></p>
+<p><a href="https://example.com/unsubscribe?u=1">Unsubscribe</a>
+<a href="https://facebook.com/example">Facebook</a>
+<a href="mailto:help@example.com">Contact</a></p>
+"""
+
+
+def test_rank_scores_anchor_text_and_url_tokens() -> None:
+    ranked = rank_verification_links(NEWSLETTER)
+    urls = [url for url, _ in ranked]
+    assert urls == [
+        "https://example.com/t/8f2a",
+        "https://example.com/account?token=abc",
+        "https://example.com/blog",
+    ]
+    scores = [score for _, score in ranked]
+    assert scores == sorted(scores, reverse=True)
+    assert find_verification_link(NEWSLETTER) == "https://example.com/t/8f2a"
+
+
+def test_find_falls_back_to_first_plain_link() -> None:
+    html = (
+        '<a href="/relative">x</a><a href="https://example.com/a">a</a>'
+        '<a href="https://example.com/b">b</a>'
+    )
+    assert find_verification_link(html) == "https://example.com/a"
+    assert find_verification_link('<a href="mailto:a@b.c">m</a>') == "mailto:a@b.c"
+    assert find_verification_link("no links") is None
+
+
+def _chunks(html: str, size: int, read: list[int]) -> Iterator[str]:
+    for i in range(0, len(html), size):
+        read.append(i)
+        yield html[i : i + size]
+
+
+def test_iter_links_streams_hrefs_and_text_urls_once() -> None:
+    html = (
+        '<p>See https://example.com/plain.</p><a href="https://example.com/a">'
+        "https://example.com/a</a>"
+    )
+    assert list(iter_links(_chunks(html, 7, []))) == [
+        "https://example.com/plain.",
+        "https://example.com/a",
+    ]
+
+
+# Outputs of the two-pass implementation the streaming one replaced
+REGRESSIONS = {
+    "text_then_anchor": (
+        "<p>Open https://example.com/t/9c1 to continue.</p>"
+        '<p><a href="https://example.com/blog">Blog</a> '
+        '<a href="https://example.com/t/9c1">Verify your email</a></p>',
+        "https://example.com/t/9c1",
+        [("https://example.com/t/9c1", 4.75), ("https://example.com/blog", 0.5)],
+    ),
+    "repeated_anchor": (
+        '<a href="https://example.com/x">Click</a>'
+        '<a href="https://example.com/news">News</a>'
+        '<a href="https://example.com/x">here to confirm</a>',
+        "https://example.com/x",
+        [("https://example.com/x", 6.5), ("https://example.com/news", 0.25)],
+    ),
+    "image_and_text_only": (
+        '<img src="https://cdn.example.com/logo.png">'
+        "<p>Visit https://example.com/plain today</p>"
+        '<a href="/relative">x</a>',
+        "/relative",
+        [("/relative", -0.5)],
+    ),
+    "entities": (
+        '<a href="https://example.com/v?a=1&amp;b=2">go</a>'
+        "<p>https://example.com/y?x=1&amp;z=2</p>",
+        "https://example.com/v?a=1&b=2",
+        [("https://example.com/v?a=1&b=2", 0.5)],
+    ),
+}
+
+
+@pytest.mark.parametrize("name", list(REGRESSIONS))
+def test_streaming_matches_two_pass_outputs(name: str) -> None:
+    html, verify, ranked = REGRESSIONS[name]
+    # `tema links` used to print hrefs plus a regex over the raw source
+    two_pass = set(extract_links(html)) | set(
+        re.findall(r"https?://[^\s<>\"')\]]+", html)
+    )
+    for size in (1, 8, 9, len(html)):
+        links = list(iter_links(_chunks(html, size, [])))
+        assert len(links) == len(set(links))
+        assert set(links) == two_pass
+        assert find_verification_link(_chunks(html, size, [])) == verify
+        assert rank_verification_links(_chunks(html, size, [])) == ranked
+
+
+def test_find_stops_reading_at_confident_link() -> None:
+    html = '<a href="https://example.com/verify?t=1">Confirm</a>' + "<p>x</p>" * 5000
+    read: list[int] = []
+    link = find_verification_link(_chunks(html, 1024, read))
+    assert link == "https://example.com/verify?t=1"
+    assert len(read) == 1
+
+
+def test_code_near_keyword_beats_other_numbers() -> None:
+    html = (
+        "<html><head><style>.x{color:#AABB11}</style></head><body>"
+        "<p>Order #998877 on 2024-05-01, total $1999.00</p>"
+        "<p>Your verification code is <b>482913</b>.</p>"
+        "<p>&copy; 2024 ACME, call 555-123-4567</p></body></html>"
+    )
+    assert find_code(html) == "482913"
+    assert [code for code, _ in rank_codes(html)][0] == "482913"
+    assert "998877" not in dict(rank_codes(html))
+
+
+def test_code_formats_and_batches() -> None:
+    assert find_code("<p>Use 7F3KQ2 to sign in</p>") == "7F3KQ2"
+    assert find_code("<p>Thanks for registering</p>", "Your code: 123-456") == "123456"
+    assert find_code("<p>Your OTP 1234</p>") == "1234"
+    assert find_code("<p>See you in 2025 at booth 1234</p>") is None
+    assert find_codes(
+        ["<p>code 111222</p>", {"html": "<p>nothing</p>", "subject": "PIN 9876"}]
+    ) == ["111222", "9876"]